@@ -0,0 +1,144 @@
+"""
+PT: Cliente HTTP assíncrono (com pool de conexões) para a API school-rest.
+EN: Pooled asynchronous HTTP client for the school-rest API.
+
+- Usa `httpx.AsyncClient` (keep-alive, um pool por event loop) quando instalado;
+  sem `httpx`, recorre às funções síncronas de `views` numa thread.
+- Mantém o mesmo contrato de `_fetch_json`: retorna `(payload, erro)`.
+"""
+
+import asyncio
+import weakref
+from urllib.parse import urlparse
+
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpRequest
+
+try:
+    import httpx  # type: ignore
+except Exception:  # PT/EN: Modo degradado quando httpx não está instalado
+    httpx = None
+
+from . import fases, resiliencia, views
+
+# PT: Um AsyncClient pertence a um event loop; guardamos um por loop
+# EN: An AsyncClient belongs to one event loop; keep one per loop
+_clientes: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, object]' = weakref.WeakKeyDictionary()
+
+
+def cliente():
+    """Retorna o `httpx.AsyncClient` compartilhado do event loop atual.
+
+    Returns:
+        httpx.AsyncClient: cliente com pool limitado por `API_MAX_CONNECTIONS`.
+    """
+    loop = asyncio.get_running_loop()
+    atual = _clientes.get(loop)
+    if atual is None:
+        atual = httpx.AsyncClient(
+            timeout=10,
+            limits=httpx.Limits(
+                max_connections=settings.API_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.API_MAX_CONNECTIONS,
+            ),
+        )
+        _clientes[loop] = atual
+    return atual
+
+
+async def api_headers(request: HttpRequest | None = None):
+    """Versão assíncrona de `_api_headers` (lê o token com `session.aget`)."""
+    session_token = None
+    if request is not None:
+        session_token = await request.session.aget('api_token')
+    token = session_token or settings.API_TOKEN
+    headers = {'Accept': 'application/json'}
+    if token:
+        headers['Authorization'] = f'Token {token}'
+    return headers
+
+
+async def has_token(request: HttpRequest) -> bool:
+    """Indica se há token na sessão ou no settings (para o template base)."""
+    return bool(await request.session.aget('api_token') or settings.API_TOKEN)
+
+
+async def resolve_api_base() -> str:
+    """Resolve a base da API sem bloquear o event loop (sondagens rodam numa thread)."""
+    return await sync_to_async(views._resolve_api_base, thread_sensitive=False)()
+
+
+def _erro_http(resp) -> str:
+    """Monta a mensagem de erro amigável igual à de `_fetch_json`."""
+    try:
+        payload = resp.json()
+    except Exception:
+        payload = {}
+    detail = payload.get('detail') if isinstance(payload, dict) else None
+    detail = detail or payload or resp.text
+    if resp.status_code in (401, 403):
+        hint = ' Endpoint requer autenticação. Defina API_TOKEN no .env do client.'
+    else:
+        hint = ''
+    return f"HTTP {resp.status_code}: {detail}.{hint}"
+
+
+async def _requisitar(url: str, params, headers: dict, timeout: float):
+    """GET assíncrono bruto; devolve `(payload, erro, falhou)` como `views._requisitar`."""
+    try:
+        with fases.medir('rede'):
+            resp = await cliente().get(url, params=params or {}, headers=headers, timeout=timeout)
+        if resp.is_error:
+            return None, _erro_http(resp), resp.status_code >= 500
+        with fases.medir('json'):
+            return resp.json(), None, False
+    except httpx.TransportError as exc:
+        return None, f"Erro ao consultar API: {exc}", True
+    except Exception as exc:
+        return None, f"Erro ao consultar API: {exc}", False
+
+
+async def fetch_json(url: str, params=None, request: HttpRequest | None = None):
+    """Equivalente assíncrono de `_fetch_json` (com a mesma camada de `resiliencia`).
+
+    Returns:
+        tuple[dict|list|None, str|None]: (payload, erro). `erro` é None se sucesso.
+    """
+    headers = await api_headers(request)
+    if httpx is None:
+        return await sync_to_async(views._get_json, thread_sensitive=False)(url, params, headers)
+    return await resiliencia.aget_json(url, params, headers, _requisitar)
+
+
+async def fetch_json_batch(items, request: HttpRequest | None = None):
+    """Equivalente assíncrono de `views._fetch_json_batch` (`POST /batch/` com fallback)."""
+    if httpx is None:
+        return await sync_to_async(views._fetch_json_batch, thread_sensitive=False)(items, request)
+    headers = await api_headers(request)
+    if len(items) > 1 and resiliencia.lote_disponivel(items[0][0]):
+        parsed = urlparse(items[0][0])
+        try:
+            with fases.medir('rede'):
+                resp = await cliente().post(f"{parsed.scheme}://{parsed.netloc}/batch/", json=views._batch_body(items),
+                                            headers=headers, timeout=resiliencia.medidor(items[0][0]).timeout())
+            if not resp.is_error:
+                with fases.medir('json'):
+                    respostas = resp.json()['responses']
+                return views._batch_results(items, headers, respostas)
+        except Exception:
+            pass  # PT/EN: segue para as chamadas individuais | fall through to individual calls
+    return await asyncio.gather(*(resiliencia.aget_json(url, params, headers, _requisitar) for url, params in items))
+
+
+async def send_json(method: str, url: str, payload: dict, request: HttpRequest):
+    """Envia POST/PUT JSON e devolve `(status, corpo)`; levanta exceção em falha de rede."""
+    headers = await api_headers(request)
+    if httpx is None:
+        def enviar():
+            resp = requests.request(method, url, json=payload, headers=headers, timeout=10)
+            return resp.status_code, resp.json()
+        return await sync_to_async(enviar, thread_sensitive=False)()
+    resp = await cliente().request(method, url, json=payload, headers=headers)
+    return resp.status_code, resp.json()
@@ -0,0 +1,139 @@
+"""
+PT: Tempo de cada fase de uma página do frontend, exposto no cabeçalho `Server-Timing`.
+- `rede`: chamadas HTTP à API (soma; chamadas em paralelo podem passar do total).
+- `json`: decodificação das respostas da API.
+- `template`: renderização dos templates (backend `TemplatesCronometrados`).
+- `app`: o resto (middlewares, sessão, montagem do contexto, resiliência).
+O DevTools do navegador mostra o cabeçalho na aba de rede e o comando
+`bench_frontend` o usa para separar as fases. Ative com `FRONTEND_SERVER_TIMING`
+(padrão: igual a `DEBUG`).
+
+EN: Per-phase timing of a frontend page, exposed in the `Server-Timing` header.
+- `rede`: HTTP calls to the API (summed; parallel calls may exceed the total).
+- `json`: decoding the API responses.
+- `template`: template rendering (`TemplatesCronometrados` backend).
+- `app`: everything else (middlewares, session, context building, resilience).
+The browser DevTools show the header in the network tab and the `bench_frontend`
+command uses it to split the phases. Enable with `FRONTEND_SERVER_TIMING`
+(default: same as `DEBUG`).
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+FASES = ('rede', 'json', 'template')
+
+# PT: Fase -> [segundos, ocorrências] da requisição atual (None fora de uma requisição medida)
+# EN: Phase -> [seconds, occurrences] for the current request (None outside a measured request)
+_fases: ContextVar[dict | None] = ContextVar('frontend_fases', default=None)
+
+
+@contextmanager
+def medir(fase: str):
+    """PT: Soma o tempo do bloco na fase `fase` da requisição atual (sem efeito fora dela).
+    EN: Adds the block's time to phase `fase` of the current request (no effect outside one).
+    """
+    atuais = _fases.get()
+    if atuais is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registro = atuais.setdefault(fase, [0.0, 0])
+        registro[0] += time.perf_counter() - inicio
+        registro[1] += 1
+
+
+def server_timing(fases: dict, total: float) -> str:
+    """PT: Monta o valor do cabeçalho `Server-Timing` (durações em ms).
+    EN: Builds the `Server-Timing` header value (durations in ms).
+
+    Returns:
+        str: ex./e.g. `rede;dur=12.1;desc="2x", json;dur=0.4, template;dur=3.2, app;dur=1.0, total;dur=16.7`.
+    """
+    partes, medido = [], 0.0
+    for fase in FASES:
+        segundos, vezes = fases.get(fase, (0.0, 0))
+        medido += segundos
+        desc = f';desc="{vezes}x"' if vezes > 1 else ''
+        partes.append(f'{fase};dur={segundos * 1000:.1f}{desc}')
+    partes.append(f'app;dur={max(0.0, total - medido) * 1000:.1f}')
+    partes.append(f'total;dur={total * 1000:.1f}')
+    return ', '.join(partes)
+
+
+class FasesMiddleware:
+    """PT: Mede as fases de cada requisição e acrescenta `Server-Timing` à resposta.
+    EN: Times each request's phases and adds `Server-Timing` to the response.
+
+    PT: Funciona com views síncronas (WSGI) e assíncronas (ASGI): o dicionário de
+    fases vive num `ContextVar`, herdado por `sync_to_async` e por tarefas do
+    `asyncio.gather`.
+    EN: Works with sync (WSGI) and async (ASGI) views: the phase dict lives in a
+    `ContextVar`, inherited by `sync_to_async` and by `asyncio.gather` tasks.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.FRONTEND_SERVER_TIMING:
+            return self.get_response(request)
+        marca, inicio = _fases.set({}), time.perf_counter()
+        try:
+            response = self.get_response(request)
+            response['Server-Timing'] = server_timing(_fases.get(), time.perf_counter() - inicio)
+            return response
+        finally:
+            _fases.reset(marca)
+
+    async def __acall__(self, request):
+        if not settings.FRONTEND_SERVER_TIMING:
+            return await self.get_response(request)
+        marca, inicio = _fases.set({}), time.perf_counter()
+        try:
+            response = await self.get_response(request)
+            response['Server-Timing'] = server_timing(_fases.get(), time.perf_counter() - inicio)
+            return response
+        finally:
+            _fases.reset(marca)
+
+
+class TemplateCronometrado(Template):
+    """PT: Template do backend Django que conta o próprio `render` na fase `template`.
+    EN: Django backend template that counts its own `render` in the `template` phase.
+    """
+
+    def render(self, context=None, request=None):
+        with medir('template'):
+            return super().render(context, request)
+
+
+class TemplatesCronometrados(DjangoTemplates):
+    """PT: Backend `DjangoTemplates` cujos templates medem a renderização (includes/extends inclusos).
+    EN: `DjangoTemplates` backend whose templates time their rendering (includes/extends included).
+    """
+
+    def from_string(self, template_code):
+        return TemplateCronometrado(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TemplateCronometrado(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
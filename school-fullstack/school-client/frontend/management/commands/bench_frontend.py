@@ -0,0 +1,219 @@
+"""
+PT: Benchmark das páginas do frontend contra uma API falsa local (latência e tamanho controlados).
+EN: Frontend page benchmark against a local stub API (controlled latency and payload size).
+
+Sobe um servidor HTTP de mentira que responde às rotas usadas pelo client com
+`--itens` linhas depois de `--latencia` ms, aponta `API_BASE_URL` para ele e
+renderiza cada página com o test client do Django. O tempo de cada página é
+dividido em rede / json / template / app a partir do cabeçalho `Server-Timing`
+(ver `frontend.fases`). Com `FRONTEND_ASYNC=True` mede as views assíncronas.
+
+    python manage.py bench_frontend --latencia 20 --itens 100
+    FRONTEND_ASYNC=True python manage.py bench_frontend --latencia 20 --itens 100 --json
+"""
+
+import asyncio
+import json
+import re
+import statistics
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from frontend import views
+from frontend.medicao import percentil
+
+PAGINAS = (
+    ('home', 'home', {}),
+    ('students_list', 'students_list', {}),
+    ('courses_list', 'courses_list', {}),
+    ('professors_list', 'professors_list', {}),
+    ('student_enrollments', 'student_enrollments', {'pk': 1}),
+    ('student_grades', 'student_grades', {'pk': 1}),
+    ('course_grades', 'course_grades', {'pk': 1}),
+)
+
+_DURACAO = re.compile(r'(\w+);(?:desc="[^"]*";)?dur=([\d.]+)')
+
+
+def _payloads(itens: int) -> dict:
+    """Respostas da API falsa (mesmo formato dos serializers do school-rest), já codificadas."""
+    inicio = date(2024, 1, 1)
+    cursos = [{'id': i, 'codigo': f'C{i:03d}', 'descricao': f'Curso {i}', 'nivel': 'B'} for i in range(1, itens + 1)]
+    estudantes = [
+        {'id': i, 'nome': f'Estudante {i:04d}', 'email': f'e{i}@example.com', 'cpf': f'{i:011d}',
+         'data_nascimento': '2000-01-01', 'celular': '+351900000000'}
+        for i in range(1, itens + 1)
+    ]
+    professores = [{'id': i, 'nome': f'Professor {i}', 'email': f'p{i}@example.com', 'celular': '', 'cursos': [1, 2]}
+                   for i in range(1, itens + 1)]
+    notas = [
+        {'id': i, 'estudante': i, 'estudante_nome': f'Estudante {i:04d}', 'curso': 1, 'curso_codigo': 'C001',
+         'valor': f'{i % 1000 / 100:.2f}', 'avaliacao': 'Prova 1', 'data': (inicio + timedelta(days=i % 365)).isoformat()}
+        for i in range(1, itens + 1)
+    ]
+    perfil = {
+        'estudante': estudantes[0],
+        'matriculas': [{'id': c['id'], 'periodo': 'M', 'periodo_nome': 'Matutino', 'curso': c} for c in cursos[:5]],
+        'notas_por_curso': [
+            {'curso_id': c['id'], 'curso_codigo': c['codigo'], 'media': '5.00',
+             'notas': [{k: n[k] for k in ('id', 'avaliacao', 'data', 'valor')} for n in notas[j::5]]}
+            for j, c in enumerate(cursos[:5])
+        ],
+    }
+
+    def pagina(linhas):
+        return {'count': len(linhas) * 10, 'next': None, 'previous': None, 'results': linhas}
+
+    return {
+        re.compile(r'/estudantes/'): pagina(estudantes),
+        re.compile(r'/cursos/'): pagina(cursos),
+        re.compile(r'/professores/'): pagina(professores),
+        re.compile(r'/estudantes/\d+/perfil/'): perfil,
+        re.compile(r'/cursos/\d+/notas/'): pagina(notas),
+    }
+
+
+def _api_falsa(latencia: float, itens: int) -> ThreadingHTTPServer:
+    rotas = _payloads(itens)
+    codificadas = [(padrao, json.dumps(corpo).encode()) for padrao, corpo in rotas.items()]
+
+    def procurar(caminho):
+        for padrao, corpo in codificadas:
+            if padrao.fullmatch(caminho):
+                return corpo
+        return None
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Cabeçalhos e corpo saem em escritas separadas; sem isto o keep-alive esbarra no ACK atrasado (~40 ms)
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _responder(self, status, corpo: bytes):
+            time.sleep(latencia)
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def do_GET(self):
+            corpo = procurar(urlparse(self.path).path)
+            self._responder(200 if corpo else 404, corpo or b'{"detail": "Not found."}')
+
+        def do_POST(self):
+            if urlparse(self.path).path != '/batch/':
+                return self._responder(405, b'{}')
+            pedido = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            respostas = []
+            for item in pedido['requests']:
+                corpo = procurar(item['path'])
+                respostas.append({'status': 200 if corpo else 404, 'body': json.loads(corpo) if corpo else {}})
+            self._responder(200, json.dumps({'responses': respostas}).encode())
+
+    servidor = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+def _fases(cabecalho: str) -> dict:
+    return {nome: float(ms) for nome, ms in _DURACAO.findall(cabecalho or '')}
+
+
+class Command(BaseCommand):
+    help = "Mede as páginas do frontend contra uma API falsa e separa rede/json/template/app."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--latencia', type=float, default=20.0, help='Latência da API falsa em ms.')
+        parser.add_argument('--itens', type=int, default=50, help='Linhas por lista/perfil da API falsa.')
+        parser.add_argument('--repeticoes', type=int, default=30, help='Requisições medidas por página.')
+        parser.add_argument('--aquecimento', type=int, default=3, help='Requisições descartadas por página.')
+        parser.add_argument('--pagina', action='append', help='Só estas páginas (nome da rota; pode repetir).')
+        parser.add_argument('--saida', help='Grava o resultado em JSON neste arquivo.')
+        parser.add_argument('--json', action='store_true', help='Saída em JSON.')
+
+    def _medir_sync(self, url, opcoes):
+        cliente = Client()
+        for _ in range(opcoes['aquecimento']):
+            cliente.get(url)
+        amostras = []
+        for _ in range(opcoes['repeticoes']):
+            inicio = time.perf_counter()
+            resp = cliente.get(url)
+            amostras.append((time.perf_counter() - inicio, resp.status_code, resp.get('Server-Timing')))
+        return amostras
+
+    async def _medir_async(self, url, opcoes):
+        cliente = AsyncClient()
+        for _ in range(opcoes['aquecimento']):
+            await cliente.get(url)
+        amostras = []
+        for _ in range(opcoes['repeticoes']):
+            inicio = time.perf_counter()
+            resp = await cliente.get(url)
+            amostras.append((time.perf_counter() - inicio, resp.status_code, resp.get('Server-Timing')))
+        return amostras
+
+    def _resumo(self, nome, amostras) -> dict:
+        tempos = sorted(t for t, _, _ in amostras)
+        fases = [_fases(c) for _, _, c in amostras]
+        resumo = {
+            'pagina': nome,
+            'erros': sum(status >= 400 for _, status, _ in amostras),
+            'p50_ms': round(percentil(tempos, 50) * 1000, 2),
+            'p95_ms': round(percentil(tempos, 95) * 1000, 2),
+        }
+        for fase in ('rede', 'json', 'template', 'app'):
+            resumo[f'{fase}_ms'] = round(statistics.fmean(f.get(fase, 0.0) for f in fases), 2)
+        return resumo
+
+    def handle(self, *args, **options):
+        api = _api_falsa(options['latencia'] / 1000, options['itens'])
+        base = f'http://127.0.0.1:{api.server_port}'
+        paginas = [p for p in PAGINAS if not options['pagina'] or p[0] in options['pagina']]
+        cache_anterior, views._api_base_cache = views._api_base_cache, (0.0, None)
+        resultados = []
+        try:
+            with override_settings(API_BASE_URL=base, API_TOKEN='', FRONTEND_SERVER_TIMING=True, ALLOWED_HOSTS=['*']):
+                for nome, rota, kwargs in paginas:
+                    url = reverse(rota, kwargs=kwargs)
+                    if settings.FRONTEND_ASYNC:
+                        amostras = asyncio.run(self._medir_async(url, options))
+                    else:
+                        amostras = self._medir_sync(url, options)
+                    resultados.append(self._resumo(nome, amostras))
+        finally:
+            views._api_base_cache = cache_anterior
+            api.shutdown()
+            api.server_close()
+
+        relatorio = {
+            'modo': 'async' if settings.FRONTEND_ASYNC else 'sync',
+            'latencia_ms': options['latencia'],
+            'itens': options['itens'],
+            'repeticoes': options['repeticoes'],
+            'resultados': resultados,
+        }
+        if options['saida']:
+            with open(options['saida'], 'w', encoding='utf-8') as arquivo:
+                json.dump(relatorio, arquivo, indent=2)
+        if options['json']:
+            self.stdout.write(json.dumps(relatorio))
+            return
+        self.stdout.write(f"modo {relatorio['modo']}, API falsa {options['latencia']} ms, {options['itens']} itens")
+        self.stdout.write(f"{'página':<22}{'p50':>8}{'p95':>8}{'rede':>8}{'json':>7}{'template':>10}{'app':>7}{'erros':>7}")
+        for r in resultados:
+            self.stdout.write(f"{r['pagina']:<22}{r['p50_ms']:>8}{r['p95_ms']:>8}{r['rede_ms']:>8}{r['json_ms']:>7}"
+                              f"{r['template_ms']:>10}{r['app_ms']:>7}{r['erros']:>7}")
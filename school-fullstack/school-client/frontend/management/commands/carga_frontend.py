@@ -0,0 +1,81 @@
+"""
+PT: Teste de carga simples do frontend (usuários concorrentes em laço fechado).
+EN: Simple frontend load test (closed-loop concurrent users).
+
+Compare um único processo WSGI com um ASGI, com a API respondendo devagar:
+
+    # WSGI (views síncronas; uma thread presa por requisição)
+    gunicorn school_client.wsgi -w 1 --threads 8 -b 127.0.0.1:8002
+    # ASGI (views assíncronas)
+    FRONTEND_ASYNC=True uvicorn school_client.asgi:application --port 8002
+
+    python manage.py carga_frontend http://127.0.0.1:8002/estudantes/ --usuarios 200 --duracao 20
+"""
+
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand
+
+from frontend.medicao import percentil
+
+
+class Command(BaseCommand):
+    help = "Dispara N usuários concorrentes contra uma URL e reporta vazão e latências."
+
+    def add_arguments(self, parser):
+        parser.add_argument('url')
+        parser.add_argument('--usuarios', type=int, default=50, help='Usuários concorrentes.')
+        parser.add_argument('--duracao', type=float, default=10.0, help='Duração em segundos.')
+        parser.add_argument('--timeout', type=float, default=30.0)
+        parser.add_argument('--json', action='store_true', help='Saída em JSON.')
+
+    def handle(self, *args, **options):
+        url, usuarios = options['url'], options['usuarios']
+        fim = time.monotonic() + options['duracao']
+        latencias, erros = [], [0]
+        trava = threading.Lock()
+
+        def usuario():
+            sessao = requests.Session()
+            locais, falhas = [], 0
+            while time.monotonic() < fim:
+                inicio = time.perf_counter()
+                try:
+                    resp = sessao.get(url, timeout=options['timeout'])
+                    if resp.status_code >= 400:
+                        falhas += 1
+                except requests.RequestException:
+                    falhas += 1
+                locais.append(time.perf_counter() - inicio)
+            with trava:
+                latencias.extend(locais)
+                erros[0] += falhas
+
+        inicio = time.monotonic()
+        with ThreadPoolExecutor(max_workers=usuarios) as pool:
+            for _ in range(usuarios):
+                pool.submit(usuario)
+        decorrido = time.monotonic() - inicio
+
+        latencias.sort()
+        resultado = {
+            'url': url,
+            'usuarios': usuarios,
+            'requisicoes': len(latencias),
+            'erros': erros[0],
+            'rps': round(len(latencias) / decorrido, 1) if decorrido else 0,
+            'p50_ms': round(percentil(latencias, 50) * 1000, 1),
+            'p95_ms': round(percentil(latencias, 95) * 1000, 1),
+            'p99_ms': round(percentil(latencias, 99) * 1000, 1),
+            'media_ms': round(statistics.fmean(latencias) * 1000, 1) if latencias else 0,
+        }
+        if options['json']:
+            self.stdout.write(json.dumps(resultado))
+            return
+        for chave, valor in resultado.items():
+            self.stdout.write(f'{chave:>12}: {valor}')
@@ -0,0 +1,14 @@
+"""
+PT: Estatística comum aos comandos de benchmark e carga.
+EN: Statistics shared by the benchmark and load commands.
+"""
+
+
+def percentil(valores, p: float) -> float:
+    """PT: Percentil por vizinho mais próximo; `valores` já ordenados (0.0 se vazio).
+    EN: Nearest-rank percentile; `valores` already sorted (0.0 when empty).
+    """
+    if not valores:
+        return 0.0
+    indice = min(len(valores) - 1, max(0, round(p / 100 * len(valores)) - 1))
+    return valores[indice]
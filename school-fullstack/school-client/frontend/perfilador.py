@@ -0,0 +1,116 @@
+"""
+PT: Profiling sob demanda de uma página, só para usuários staff.
+Acrescente `?_perfil=cprofile` (ou `?_perfil=pyinstrument`, se instalado) a
+qualquer URL do client logado como staff no admin do client: em vez da página,
+a resposta é o relatório do profiler para aquela requisição. Sem o parâmetro
+(ou sem staff) o middleware não faz nada. O nome do parâmetro vem de
+`FRONTEND_PERFIL_PARAM`.
+
+Em views assíncronas o cProfile mede a thread do event loop inteira enquanto a
+view roda (inclui outras requisições simultâneas); o pyinstrument separa as
+tarefas (`async_mode`).
+
+EN: On-demand profiling of a page, staff users only.
+Append `?_perfil=cprofile` (or `?_perfil=pyinstrument`, if installed) to any
+client URL while logged in as staff in the client's admin: instead of the page,
+the response is the profiler report for that request. Without the parameter
+(or without staff) the middleware does nothing. The parameter name comes from
+`FRONTEND_PERFIL_PARAM`.
+In async views cProfile measures the whole event loop thread while the view
+runs (including other concurrent requests); pyinstrument separates the tasks
+(`async_mode`).
+"""
+
+import cProfile
+import io
+import pstats
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+
+try:
+    from pyinstrument import Profiler  # type: ignore
+except Exception:  # PT/EN: pyinstrument é opcional | pyinstrument is optional
+    Profiler = None
+
+MODOS = ('cprofile', 'pyinstrument')
+LINHAS = 60
+# PT/EN: Ordens aceitas em `?_ordem=` | sort orders accepted in `?_ordem=`
+ORDENS = frozenset(chave.value for chave in pstats.SortKey)
+
+
+def _modo(request) -> str | None:
+    """PT: Profiler pedido na query string (cai para cProfile sem pyinstrument).
+    EN: Profiler requested in the query string (falls back to cProfile without pyinstrument).
+    """
+    modo = request.GET.get(settings.FRONTEND_PERFIL_PARAM)
+    if modo not in MODOS:
+        return None
+    return modo if modo == 'cprofile' or Profiler is not None else 'cprofile'
+
+
+def _relatorio_cprofile(perfil: cProfile.Profile, request) -> HttpResponse:
+    """PT: Relatório texto do cProfile (ordem via `?_ordem=`). EN: cProfile text report (order via `?_ordem=`)."""
+    saida = io.StringIO()
+    ordem = request.GET.get('_ordem')
+    if ordem not in ORDENS:
+        ordem = 'cumulative'
+    pstats.Stats(perfil, stream=saida).strip_dirs().sort_stats(ordem).print_stats(LINHAS)
+    aviso = '' if request.GET[settings.FRONTEND_PERFIL_PARAM] == 'cprofile' else '(pyinstrument não instalado)\n'
+    return HttpResponse(f'{request.get_full_path()}\n{aviso}\n{saida.getvalue()}', content_type='text/plain; charset=utf-8')
+
+
+class PerfilMiddleware:
+    """PT: Roda a requisição sob cProfile/pyinstrument quando um staff pede via query string.
+    EN: Runs the request under cProfile/pyinstrument when a staff user asks via the query string.
+
+    PT: Deve vir depois de `AuthenticationMiddleware` (usa `request.user`).
+    EN: Must come after `AuthenticationMiddleware` (uses `request.user`).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        modo = _modo(request)
+        if modo is None or not request.user.is_staff:
+            return self.get_response(request)
+        if modo == 'pyinstrument':
+            profiler = Profiler()
+            profiler.start()
+            try:
+                self.get_response(request)
+            finally:
+                profiler.stop()
+            return HttpResponse(profiler.output_html())
+        perfil = cProfile.Profile()
+        perfil.runcall(self.get_response, request)
+        return _relatorio_cprofile(perfil, request)
+
+    async def __acall__(self, request):
+        modo = _modo(request)
+        if modo is None or not (await request.auser()).is_staff:
+            return await self.get_response(request)
+        if modo == 'pyinstrument':
+            profiler = Profiler(async_mode='enabled')
+            profiler.start()
+            try:
+                await self.get_response(request)
+            finally:
+                profiler.stop()
+            return HttpResponse(profiler.output_html())
+        perfil = cProfile.Profile()
+        perfil.enable()
+        try:
+            await self.get_response(request)
+        finally:
+            perfil.disable()
+        return _relatorio_cprofile(perfil, request)
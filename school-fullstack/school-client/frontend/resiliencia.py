@@ -0,0 +1,224 @@
+"""
+PT: Camada de resiliência para as chamadas GET do client à API school-rest.
+EN: Resilience layer for the client's GET calls to the school-rest API.
+
+- Singleflight: GETs idênticos em andamento (mesma URL, parâmetros e token)
+  compartilham uma única requisição à API.
+- Circuit breaker por origem: após `API_BREAKER_FALHAS` falhas seguidas
+  (conexão, timeout ou 5xx) o circuito abre e as chamadas falham na hora;
+  depois de `API_BREAKER_RESET` segundos uma única sondagem é liberada.
+- Último payload válido: cada sucesso fica no cache do Django e é servido
+  (com aviso) quando a API falha ou o circuito está aberto.
+- Timeout adaptativo: p99 das latências recentes × fator, limitado entre
+  `API_TIMEOUT_MIN` e `API_TIMEOUT_MAX`.
+
+As funções de requisição recebem `timeout` e devolvem `(payload, erro, falhou)`,
+onde `falhou` indica falha de infraestrutura (conta para o circuito).
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .medicao import percentil
+
+AVISO_CACHE = 'API indisponível; exibindo os últimos dados conhecidos.'
+
+
+class MedidorLatencia:
+    """Janela deslizante de latências de sucesso para calcular o timeout."""
+
+    def __init__(self, janela: int = 200):
+        self._amostras = deque(maxlen=janela)
+        self._trava = threading.Lock()
+
+    def registrar(self, segundos: float):
+        with self._trava:
+            self._amostras.append(segundos)
+
+    def percentil(self, p: float) -> float:
+        """Percentil das amostras pelo mesmo critério dos benchmarks (0.0 sem amostras)."""
+        with self._trava:
+            amostras = sorted(self._amostras)
+        return percentil(amostras, p)
+
+    def timeout(self) -> float:
+        """Timeout atual; usa o máximo até haver amostras suficientes."""
+        minimo, maximo = settings.API_TIMEOUT_MIN, settings.API_TIMEOUT_MAX
+        with self._trava:
+            poucas = len(self._amostras) < settings.API_TIMEOUT_AMOSTRAS
+        if poucas:
+            return maximo
+        return min(maximo, max(minimo, self.percentil(99) * settings.API_TIMEOUT_FATOR))
+
+
+class CircuitBreaker:
+    """Disjuntor fechado → aberto → meio-aberto (uma sondagem por vez)."""
+
+    FECHADO, ABERTO, MEIO_ABERTO = 'fechado', 'aberto', 'meio-aberto'
+
+    def __init__(self):
+        self.estado = self.FECHADO
+        self.falhas = 0
+        self.aberto_em = 0.0
+        self._trava = threading.Lock()
+
+    def permitir(self) -> bool:
+        with self._trava:
+            if self.estado == self.FECHADO:
+                return True
+            if self.estado == self.ABERTO and time.monotonic() - self.aberto_em >= settings.API_BREAKER_RESET:
+                self.estado = self.MEIO_ABERTO  # PT/EN: libera uma sondagem | let one probe through
+                return True
+            return False
+
+    def sucesso(self):
+        with self._trava:
+            self.estado, self.falhas = self.FECHADO, 0
+
+    def falha(self):
+        with self._trava:
+            self.falhas += 1
+            if self.estado == self.MEIO_ABERTO or self.falhas >= settings.API_BREAKER_FALHAS:
+                self.estado, self.aberto_em = self.ABERTO, time.monotonic()
+
+
+class _Voo:
+    """Chamada em andamento compartilhada entre threads."""
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+
+
+_trava = threading.Lock()
+_voos: dict[str, _Voo] = {}
+_voos_async: dict[tuple[int, str], asyncio.Future] = {}
+_disjuntores: dict[str, CircuitBreaker] = {}
+_medidores: dict[str, MedidorLatencia] = {}
+
+
+def _origem(url: str) -> str:
+    parsed = urlparse(url)
+    return f'{parsed.scheme}://{parsed.netloc}'
+
+
+def disjuntor(url: str) -> CircuitBreaker:
+    """Disjuntor da origem (esquema + host + porta) da URL."""
+    with _trava:
+        return _disjuntores.setdefault(_origem(url), CircuitBreaker())
+
+
+def medidor(url: str) -> MedidorLatencia:
+    """Medidor de latência da origem da URL."""
+    with _trava:
+        return _medidores.setdefault(_origem(url), MedidorLatencia())
+
+
+def _chave(url: str, params, headers: dict) -> str:
+    """Identifica GETs idênticos; o token entra no hash para isolar usuários."""
+    bruto = json.dumps([url, sorted((params or {}).items()), headers.get('Authorization', '')], default=str)
+    return hashlib.sha256(bruto.encode()).hexdigest()
+
+
+def _ultimo_valido(chave: str, erro: str):
+    payload = cache.get(f'frontend:lkg:{chave}')
+    if payload is not None:
+        return payload, AVISO_CACHE
+    return None, erro
+
+
+def _registrar(url, chave, inicio, resultado):
+    """Atualiza disjuntor, medidor e cache conforme o resultado da chamada."""
+    payload, erro, falhou = resultado
+    if falhou:
+        disjuntor(url).falha()
+        return _ultimo_valido(chave, erro)
+    disjuntor(url).sucesso()
+    if erro is None:
+        medidor(url).registrar(time.monotonic() - inicio)
+        cache.set(f'frontend:lkg:{chave}', payload, settings.API_LKG_TTL)
+    return payload, erro
+
+
+def lote_disponivel(url: str) -> bool:
+    """Indica se vale tentar `/batch/` na origem (circuito fechado)."""
+    return disjuntor(url).estado == CircuitBreaker.FECHADO
+
+
+def guardar_ultimo_valido(url: str, params, headers: dict, payload):
+    """Guarda um payload obtido por outro caminho (ex.: lote) como último válido do GET."""
+    cache.set(f'frontend:lkg:{_chave(url, params, headers)}', payload, settings.API_LKG_TTL)
+
+
+def get_json(url: str, params, headers: dict, requisitar):
+    """Executa `requisitar(url, params, headers, timeout)` com toda a proteção.
+
+    Returns:
+        tuple[dict|list|None, str|None]: mesmo contrato de `_fetch_json`.
+    """
+    chave = _chave(url, params, headers)
+    if not disjuntor(url).permitir():
+        return _ultimo_valido(chave, 'API indisponível (circuito aberto).')
+
+    with _trava:
+        voo = _voos.get(chave)
+        lider = voo is None
+        if lider:
+            voo = _voos[chave] = _Voo()
+    if not lider:
+        voo.evento.wait()
+        return voo.resultado
+
+    try:
+        inicio = time.monotonic()
+        resultado = requisitar(url, params, headers, medidor(url).timeout())
+        voo.resultado = _registrar(url, chave, inicio, resultado)
+    except Exception as exc:
+        disjuntor(url).falha()
+        voo.resultado = (None, f"Erro ao consultar API: {exc}")
+    finally:
+        with _trava:
+            _voos.pop(chave, None)
+        voo.evento.set()
+    return voo.resultado
+
+
+async def aget_json(url: str, params, headers: dict, requisitar):
+    """Versão assíncrona de `get_json` (`requisitar` é uma corrotina)."""
+    chave = _chave(url, params, headers)
+    if not disjuntor(url).permitir():
+        return _ultimo_valido(chave, 'API indisponível (circuito aberto).')
+
+    loop = asyncio.get_running_loop()
+    indice = (id(loop), chave)
+    futuro = _voos_async.get(indice)
+    if futuro is not None:
+        return await asyncio.shield(futuro)
+
+    futuro = _voos_async[indice] = loop.create_future()
+    try:
+        inicio = time.monotonic()
+        resultado = await requisitar(url, params, headers, medidor(url).timeout())
+        resultado = _registrar(url, chave, inicio, resultado)
+    except Exception as exc:
+        disjuntor(url).falha()
+        resultado = (None, f"Erro ao consultar API: {exc}")
+    except BaseException:
+        # PT: O líder foi cancelado (cliente desconectou); os seguidores não foram, então
+        # recebem o último válido em vez de CancelledError. Não conta como falha da API.
+        # EN: The leader was cancelled (client went away); followers were not, so they
+        # get the last good payload instead of CancelledError. Not an API failure.
+        futuro.set_result(_ultimo_valido(chave, 'Requisição à API cancelada.'))
+        raise
+    finally:
+        _voos_async.pop(indice, None)
+    futuro.set_result(resultado)
+    return resultado
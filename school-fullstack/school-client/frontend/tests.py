@@ -0,0 +1,237 @@
+import asyncio
+import threading
+from importlib import import_module
+from itertools import count
+from unittest import mock
+
+import httpx
+from django.conf import settings
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, override_settings
+
+from frontend import cliente_async, perfilador, resiliencia, views, views_async
+
+_urls = count()
+
+
+@override_settings(API_BREAKER_FALHAS=2, API_BREAKER_RESET=60, API_TIMEOUT_AMOSTRAS=20)
+class ResilienciaTests(SimpleTestCase):
+    """PT: Singleflight, circuit breaker e último válido de `frontend.resiliencia`.
+    EN: Singleflight, circuit breaker and last known good in `frontend.resiliencia`.
+    """
+
+    def setUp(self):
+        # PT/EN: Origem nova por teste (disjuntor e medidor isolados) | fresh origin per test
+        self.url = f'http://api-{next(_urls)}.test/estudantes/'
+        self.addCleanup(cache.clear)
+
+    def test_singleflight_sincrono(self):
+        liberar, chamadas, resultados = threading.Event(), [], []
+
+        def requisitar(url, params, headers, timeout):
+            chamadas.append(url)
+            liberar.wait(5)
+            return [{'id': 1}], None, False
+
+        threads = [threading.Thread(target=lambda: resultados.append(
+            resiliencia.get_json(self.url, {'page': 1}, {}, requisitar))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        while not chamadas:
+            threading.Event().wait(0.01)
+        threading.Event().wait(0.05)
+        liberar.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(chamadas), 1)
+        self.assertEqual(resultados, [([{'id': 1}], None)] * 5)
+
+    def test_singleflight_assincrono(self):
+        chamadas = []
+
+        async def requisitar(url, params, headers, timeout):
+            chamadas.append(url)
+            await asyncio.sleep(0.01)
+            return [{'id': 1}], None, False
+
+        async def varias():
+            return await asyncio.gather(*(resiliencia.aget_json(self.url, None, {}, requisitar) for _ in range(5)))
+
+        self.assertEqual(asyncio.run(varias()), [([{'id': 1}], None)] * 5)
+        self.assertEqual(len(chamadas), 1)
+
+    def test_cancelar_o_lider_nao_cancela_os_seguidores(self):
+        resiliencia.guardar_ultimo_valido(self.url, None, {}, [{'id': 7}])
+
+        async def requisitar(url, params, headers, timeout):
+            await asyncio.sleep(10)
+
+        async def cenario():
+            lider = asyncio.create_task(resiliencia.aget_json(self.url, None, {}, requisitar))
+            await asyncio.sleep(0)
+            seguidor = asyncio.create_task(resiliencia.aget_json(self.url, None, {}, requisitar))
+            await asyncio.sleep(0)
+            lider.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await lider
+            return await seguidor
+
+        self.assertEqual(asyncio.run(cenario()), ([{'id': 7}], resiliencia.AVISO_CACHE))
+        self.assertEqual(resiliencia.disjuntor(self.url).estado, resiliencia.CircuitBreaker.FECHADO)
+
+    def test_circuito_abre_e_serve_o_ultimo_valido(self):
+        chamadas = []
+
+        def ok(url, params, headers, timeout):
+            chamadas.append('ok')
+            return {'id': 1}, None, False
+
+        def falha(url, params, headers, timeout):
+            chamadas.append('falha')
+            return None, 'timeout', True
+
+        self.assertEqual(resiliencia.get_json(self.url, None, {}, ok), ({'id': 1}, None))
+        self.assertEqual(resiliencia.get_json(self.url, None, {}, falha), ({'id': 1}, resiliencia.AVISO_CACHE))
+        resiliencia.get_json(self.url, None, {}, falha)
+        self.assertEqual(resiliencia.disjuntor(self.url).estado, resiliencia.CircuitBreaker.ABERTO)
+
+        # PT/EN: Circuito aberto: nenhuma chamada à API | open circuit: no API call at all
+        self.assertEqual(resiliencia.get_json(self.url, None, {}, ok), ({'id': 1}, resiliencia.AVISO_CACHE))
+        self.assertEqual(chamadas, ['ok', 'falha', 'falha'])
+        # PT/EN: Mesma origem sem último válido | same origin with no last known good
+        self.assertEqual(resiliencia.get_json(self.url, {'page': 2}, {}, ok),
+                         (None, 'API indisponível (circuito aberto).'))
+
+    def test_meio_aberto_libera_uma_sondagem(self):
+        def falha(url, params, headers, timeout):
+            return None, 'erro 503', True
+
+        for _ in range(2):
+            resiliencia.get_json(self.url, None, {}, falha)
+        breaker = resiliencia.disjuntor(self.url)
+        breaker.aberto_em -= 60
+
+        def sondagem(url, params, headers, timeout):
+            # PT/EN: Durante a sondagem ninguém mais passa | nobody else gets through during the probe
+            self.assertEqual(breaker.estado, resiliencia.CircuitBreaker.MEIO_ABERTO)
+            self.assertFalse(breaker.permitir())
+            return {'id': 1}, None, False
+
+        self.assertEqual(resiliencia.get_json(self.url, None, {}, sondagem), ({'id': 1}, None))
+        self.assertEqual(breaker.estado, resiliencia.CircuitBreaker.FECHADO)
+
+    def test_timeout_adaptativo(self):
+        medidor = resiliencia.MedidorLatencia()
+        with override_settings(API_TIMEOUT_MIN=0.5, API_TIMEOUT_MAX=10, API_TIMEOUT_FATOR=3, API_TIMEOUT_AMOSTRAS=3):
+            self.assertEqual(medidor.timeout(), 10)
+            for segundos in (0.1, 0.2, 1.0):
+                medidor.registrar(segundos)
+            self.assertEqual(medidor.timeout(), 3.0)
+
+
+@override_settings(API_TOKEN='segredo', API_BREAKER_FALHAS=2)
+class ClienteAsyncTests(SimpleTestCase):
+    """PT: Views async e `cliente_async` sobre um transporte HTTP simulado.
+    EN: Async views and `cliente_async` over a mocked HTTP transport.
+    """
+
+    def setUp(self):
+        self.base = f'http://api-{next(_urls)}.test'
+        self.addCleanup(cache.clear)
+        self.recebidas, self.clientes = [], []
+        self.responder = lambda requisicao: httpx.Response(200, json={})
+
+        def tratar(requisicao):
+            self.recebidas.append(requisicao)
+            return self.responder(requisicao)
+
+        transporte, original = httpx.MockTransport(tratar), httpx.AsyncClient
+
+        def construir(**kwargs):
+            self.clientes.append(kwargs)
+            return original(transport=transporte, **kwargs)
+
+        cliente_async._clientes.clear()
+        for alvo in (mock.patch.object(httpx, 'AsyncClient', construir),
+                     mock.patch.object(views, '_resolve_api_base', return_value=self.base)):
+            alvo.start()
+            self.addCleanup(alvo.stop)
+
+    def _get(self, caminho, **params):
+        requisicao = AsyncRequestFactory().get(caminho, params)
+        requisicao.session = import_module(settings.SESSION_ENGINE).SessionStore()
+        return requisicao
+
+    async def test_lista_reusa_o_cliente_do_loop(self):
+        self.responder = lambda requisicao: httpx.Response(200, json={'count': 1, 'results': [{'id': 1, 'nome': 'Ana'}]})
+        for pagina in ('1', '2'):
+            resposta = await views_async.students_list(self._get('/estudantes/', page=pagina))
+            self.assertContains(resposta, 'Ana')
+        self.assertEqual([str(r.url) for r in self.recebidas],
+                         [f'{self.base}/estudantes/?page=1', f'{self.base}/estudantes/?page=2'])
+        self.assertEqual(self.recebidas[0].headers['Authorization'], 'Token segredo')
+        self.assertEqual(len(self.clientes), 1)
+
+    async def test_erro_5xx_conta_para_o_circuito(self):
+        self.responder = lambda requisicao: httpx.Response(500, json={'detail': 'quebrou'})
+        resposta = await views_async.courses_list(self._get('/cursos/'))
+        self.assertContains(resposta, 'HTTP 500: quebrou.')
+        self.assertEqual(resiliencia.disjuntor(self.base).falhas, 1)
+
+    async def test_401_mostra_a_dica_do_token(self):
+        self.responder = lambda requisicao: httpx.Response(401, json={'detail': 'sem token'})
+        resposta = await views_async.professors_list(self._get('/professores/'))
+        self.assertContains(resposta, 'HTTP 401: sem token. Endpoint requer autenticação.')
+        self.assertEqual(resiliencia.disjuntor(self.base).falhas, 0)
+
+    async def test_falha_de_rede_serve_o_ultimo_valido(self):
+        self.responder = lambda requisicao: httpx.Response(200, json={'count': 1, 'results': [{'id': 1, 'nome': 'Ana'}]})
+        await views_async.students_list(self._get('/estudantes/'))
+
+        def recusar(requisicao):
+            raise httpx.ConnectError('recusada', request=requisicao)
+
+        self.responder = recusar
+        resposta = await views_async.students_list(self._get('/estudantes/'))
+        self.assertContains(resposta, 'Ana')
+        self.assertContains(resposta, resiliencia.AVISO_CACHE)
+        resposta = await views_async.students_list(self._get('/estudantes/', page='9'))
+        self.assertContains(resposta, 'Erro ao consultar API: recusada')
+
+    async def test_home_cai_do_lote_para_gets_individuais(self):
+        def responder(requisicao):
+            if requisicao.url.path == '/batch/':
+                return httpx.Response(404, json={'detail': 'Não encontrado.'})
+            return httpx.Response(200, json={'count': 3 if 'estudantes' in requisicao.url.path else 2, 'results': []})
+
+        self.responder = responder
+        resposta = await views_async.home(self._get('/'))
+        self.assertEqual(sorted(r.url.path for r in self.recebidas), ['/batch/', '/cursos/', '/estudantes/'])
+        self.assertContains(resposta, '<p class="display-6">3</p>', html=True)
+        self.assertContains(resposta, '<p class="display-6">2</p>', html=True)
+        self.assertEqual(len(self.clientes), 1)
+
+    def test_um_cliente_por_event_loop(self):
+        async def dois():
+            return cliente_async.cliente(), cliente_async.cliente()
+
+        primeiro, segundo = asyncio.run(dois())
+        terceiro, _ = asyncio.run(dois())
+        self.assertIs(primeiro, segundo)
+        self.assertIsNot(primeiro, terceiro)
+
+
+class PerfiladorTests(SimpleTestCase):
+    """PT: Relatório do cProfile com `?_ordem=`. EN: cProfile report with `?_ordem=`."""
+
+    def _relatorio(self, ordem):
+        perfil = perfilador.cProfile.Profile()
+        perfil.runcall(sorted, [3, 1, 2])
+        requisicao = RequestFactory().get('/', {settings.FRONTEND_PERFIL_PARAM: 'cprofile', '_ordem': ordem})
+        return perfilador._relatorio_cprofile(perfil, requisicao).content.decode()
+
+    def test_ordem_valida(self):
+        self.assertIn('Ordered by: internal time', self._relatorio('time'))
+
+    def test_ordem_invalida_cai_para_cumulative(self):
+        self.assertIn('Ordered by: cumulative time', self._relatorio('__class__'))
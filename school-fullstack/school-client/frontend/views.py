@@ -13,6 +13,9 @@ from django.http import HttpRequest
 import requests
 from requests import HTTPError
 from urllib.parse import urlparse, urlunparse
+import time
+
+from . import fases, resiliencia
 
 
 def _api_headers(request: HttpRequest | None = None):
@@ -41,16 +44,32 @@ def _api_headers(request: HttpRequest | None = None):
     return headers
 
 
+# Cache da base resolvida: (instante, url). Evita sondar a API em toda requisição.
+_api_base_cache = (0.0, None)
+
+
 def _resolve_api_base():
     """Retorna uma base de API alcançável (URL) usando heurísticas simples.
 
     - Usa `API_BASE_URL` do settings se responder.
     - Se o host for `0.0.0.0`, troca para `localhost` (clientes não conectam em 0.0.0.0).
     - Se a porta for 8001, tenta fallback para 8000 no mesmo host.
+    - O resultado fica em cache por `API_BASE_TTL` segundos.
 
     Returns:
         str: URL base sem barra final (ex.: "http://localhost:8001").
     """
+    global _api_base_cache
+    instante, base = _api_base_cache
+    if base and time.monotonic() - instante < settings.API_BASE_TTL:
+        return base
+    base = _probe_api_base()
+    _api_base_cache = (time.monotonic(), base)
+    return base
+
+
+def _probe_api_base():
+    """Sonda os candidatos de `_resolve_api_base` (sem cache)."""
     configured = (settings.API_BASE_URL or '').strip().rstrip('/') or 'http://localhost:8001'
 
     def normalize(host_port_base: str) -> str:
@@ -117,8 +136,28 @@ def _fetch_json(url: str, params=None, request: HttpRequest | None = None):
     Returns:
         tuple[dict|list|None, str|None]: (payload, erro). `erro` é None se sucesso.
     """
+    return _get_json(url, params, _api_headers(request))
+
+
+def _get_json(url: str, params, headers: dict):
+    """Executa o GET de `_fetch_json` com cabeçalhos já montados.
+
+    Passa pela camada de `resiliencia` (singleflight, circuit breaker, último
+    payload válido e timeout adaptativo). Separado para ser reutilizado fora do
+    ciclo de request (ex.: `cliente_async`).
+    """
+    return resiliencia.get_json(url, params, headers, _requisitar)
+
+
+def _requisitar(url: str, params, headers: dict, timeout: float):
+    """GET bruto com mensagens de erro amigáveis.
+
+    Returns:
+        tuple: (payload, erro, falhou) — `falhou` indica conexão/timeout/5xx.
+    """
     try:
-        resp = requests.get(url, params=params or {}, headers=_api_headers(request), timeout=10)
+        with fases.medir('rede'):
+            resp = requests.get(url, params=params or {}, headers=headers, timeout=timeout)
         try:
             resp.raise_for_status()
         except HTTPError as http_err:
@@ -126,16 +165,75 @@ def _fetch_json(url: str, params=None, request: HttpRequest | None = None):
                 payload = resp.json()
             except Exception:
                 payload = {}
-            detail = payload.get('detail') or payload or resp.text
-            # Friendly hint when auth is required
-            if resp.status_code in (401, 403):
-                hint = ' Endpoint requer autenticação. Defina API_TOKEN no .env do client.'
-            else:
-                hint = ''
-            return None, f"HTTP {resp.status_code}: {detail}.{hint}"
-        return resp.json(), None
+            return None, _http_error(resp.status_code, payload, resp.text), resp.status_code >= 500
+        with fases.medir('json'):
+            return resp.json(), None, False
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as exc:
+        return None, f"Erro ao consultar API: {exc}", True
     except Exception as exc:
-        return None, f"Erro ao consultar API: {exc}"
+        return None, f"Erro ao consultar API: {exc}", False
+
+
+def _http_error(status: int, payload, text: str = '') -> str:
+    """Mensagem de erro amigável a partir do status e do corpo (DRF) da resposta."""
+    detail = (payload.get('detail') if isinstance(payload, dict) else None) or payload or text
+    # Friendly hint when auth is required
+    if status in (401, 403):
+        hint = ' Endpoint requer autenticação. Defina API_TOKEN no .env do client.'
+    else:
+        hint = ''
+    return f"HTTP {status}: {detail}.{hint}"
+
+
+def _batch_body(items):
+    """Corpo de `POST /batch/` para uma lista de `(url, params)` da mesma API."""
+    return {'requests': [{'path': urlparse(url).path, 'params': params or {}} for url, params in items]}
+
+
+def _batch_results(items, headers: dict, responses: list):
+    """Converte as respostas de `/batch/` em `(payload, erro)` e guarda os sucessos como último válido."""
+    results = []
+    for (url, params), item in zip(items, responses):
+        if item.get('status', 500) < 400:
+            resiliencia.guardar_ultimo_valido(url, params, headers, item.get('body'))
+            results.append((item.get('body'), None))
+        else:
+            results.append((None, _http_error(item.get('status'), item.get('body'))))
+    return results
+
+
+def _fetch_json_batch(items, request: HttpRequest | None = None):
+    """Modo em lote de `_fetch_json`: vários GETs numa única ida à API (`POST /batch/`).
+
+    PT: As sub-requisições rodam dentro da API sem nova autenticação por item. Se
+    o lote não estiver disponível (API antiga, erro ou circuito aberto), cai para
+    chamadas individuais de `_fetch_json`, com toda a camada de `resiliencia`.
+
+    EN: Sub-requests run inside the API without a new auth pass per item. When the
+    batch is unavailable (older API, error or open circuit), falls back to
+    individual `_fetch_json` calls with the full `resiliencia` layer.
+
+    Args:
+        items: lista de `(url, params)` apontando para a mesma base da API.
+        request: request atual para pegar token de sessão (opcional).
+
+    Returns:
+        list[tuple[dict|list|None, str|None]]: um `(payload, erro)` por item, na mesma ordem.
+    """
+    headers = _api_headers(request)
+    if len(items) > 1 and resiliencia.lote_disponivel(items[0][0]):
+        parsed = urlparse(items[0][0])
+        try:
+            with fases.medir('rede'):
+                resp = requests.post(f"{parsed.scheme}://{parsed.netloc}/batch/", json=_batch_body(items),
+                                     headers=headers, timeout=resiliencia.medidor(items[0][0]).timeout())
+            if resp.ok:
+                with fases.medir('json'):
+                    respostas = resp.json()['responses']
+                return _batch_results(items, headers, respostas)
+        except Exception:
+            pass  # PT/EN: segue para as chamadas individuais | fall through to individual calls
+    return [_get_json(url, params, headers) for url, params in items]
 
 
 def home(request: HttpRequest):
@@ -146,8 +244,11 @@ def home(request: HttpRequest):
     """
     base = _resolve_api_base()
     ctx = {'api_base': base, 'has_token': bool(request.session.get('api_token') or settings.API_TOKEN)}
-    students, err1 = _fetch_json(f"{base}/estudantes/", request=request)
-    courses, err2 = _fetch_json(f"{base}/cursos/", request=request)
+    # PT: Só os totais interessam: um lote com `fields=id` | EN: Only totals matter: one batch with `fields=id`
+    (students, err1), (courses, err2) = _fetch_json_batch([
+        (f"{base}/estudantes/", {'fields': 'id'}),
+        (f"{base}/cursos/", {'fields': 'id'}),
+    ], request=request)
     if students:
         ctx['students_count'] = students.get('count', len(students))
     if courses:
@@ -171,13 +272,32 @@ def students_list(request: HttpRequest):
     return render(request, 'frontend/students_list.html', ctx)
 
 
+def profile_context(perfil: dict) -> dict:
+    """Adapta o perfil da API ao formato que os templates de matrículas/notas já usam.
+
+    Returns:
+        dict: `student`, `enrollments` (curso = descrição, período por extenso) e
+        `grades` (lista plana com `curso_codigo`).
+    """
+    enrollments = [
+        {'curso_id': m['curso']['id'], 'curso': m['curso']['descricao'], 'periodo': m['periodo_nome']}
+        for m in perfil.get('matriculas', [])
+    ]
+    grades = [
+        dict(nota, curso=grupo['curso_id'], curso_codigo=grupo['curso_codigo'])
+        for grupo in perfil.get('notas_por_curso', [])
+        for nota in grupo['notas']
+    ]
+    return {'student': perfil.get('estudante'), 'enrollments': enrollments, 'grades': grades}
+
+
 def student_enrollments(request: HttpRequest, pk: int):
-    """Lista as matrículas de um estudante específico (por ID)."""
+    """Lista as matrículas de um estudante (endpoint composto `/estudantes/<pk>/perfil/`)."""
     base = _resolve_api_base()
     ctx = {'student_id': pk, 'api_base': base, 'has_token': bool(request.session.get('api_token') or settings.API_TOKEN)}
-    data, err = _fetch_json(f"{base}/estudantes/{pk}/matriculas/", request=request)
+    data, err = _fetch_json(f"{base}/estudantes/{pk}/perfil/", request=request)
     if data:
-        ctx['enrollments'] = data.get('results', data)
+        ctx.update(profile_context(data))
     ctx['error'] = err
     return render(request, 'frontend/student_enrollments.html', ctx)
 
@@ -211,12 +331,12 @@ def professors_list(request: HttpRequest):
 
 
 def student_grades(request: HttpRequest, pk: int):
-    """Lista notas de um estudante (endpoint `/estudantes/<pk>/notas/`)."""
+    """Lista todas as notas de um estudante (endpoint composto `/estudantes/<pk>/perfil/`)."""
     base = _resolve_api_base()
     ctx = {'student_id': pk, 'api_base': base, 'has_token': bool(request.session.get('api_token') or settings.API_TOKEN)}
-    data, err = _fetch_json(f"{base}/estudantes/{pk}/notas/", request=request)
+    data, err = _fetch_json(f"{base}/estudantes/{pk}/perfil/", request=request)
     if data:
-        ctx['grades'] = data.get('results', data)
+        ctx.update(profile_context(data))
     ctx['error'] = err
     return render(request, 'frontend/student_grades.html', ctx)
 
@@ -0,0 +1,155 @@
+"""
+PT: Versões assíncronas (ASGI) das views do frontend.
+EN: Asynchronous (ASGI) versions of the frontend views.
+
+Mesmo comportamento e templates de `views`, mas as chamadas à API usam o
+cliente HTTP assíncrono de `cliente_async`: enquanto a API responde, o event
+loop atende outros usuários em vez de prender uma thread por requisição.
+Ative com `FRONTEND_ASYNC=True` e sirva com um servidor ASGI (ex.: uvicorn).
+"""
+
+from django.http import HttpRequest
+from django.shortcuts import render, redirect
+
+from . import cliente_async as api
+from .views import course_form_context, profile_context, student_form_context
+
+
+async def _base_ctx(request: HttpRequest, **extra):
+    """Resolve a base da API e monta o contexto comum (base + estado do token)."""
+    base = await api.resolve_api_base()
+    ctx = {'api_base': base, 'has_token': await api.has_token(request)}
+    ctx.update(extra)
+    return base, ctx
+
+
+async def home(request: HttpRequest):
+    """Página inicial; os dois contadores vêm num único lote (`/batch/`)."""
+    base, ctx = await _base_ctx(request)
+    (students, err1), (courses, err2) = await api.fetch_json_batch([
+        (f"{base}/estudantes/", {'fields': 'id'}),
+        (f"{base}/cursos/", {'fields': 'id'}),
+    ], request=request)
+    if students:
+        ctx['students_count'] = students.get('count', len(students))
+    if courses:
+        ctx['courses_count'] = courses.get('count', len(courses))
+    ctx['error'] = err1 or err2
+    return render(request, 'frontend/home.html', ctx)
+
+
+async def _paginated(request: HttpRequest, path: str, key: str, template: str, links: bool = True):
+    """Lista paginada genérica (`/estudantes/`, `/cursos/`, `/professores/`)."""
+    base, ctx = await _base_ctx(request)
+    data, err = await api.fetch_json(f"{base}{path}", params={'page': request.GET.get('page', '1')}, request=request)
+    if data:
+        ctx[key] = data.get('results', data)
+        ctx['count'] = data.get('count')
+        if links:
+            ctx['next'] = data.get('next')
+            ctx['previous'] = data.get('previous')
+    ctx['error'] = err
+    return render(request, template, ctx)
+
+
+async def students_list(request: HttpRequest):
+    """Lista paginada de estudantes, consumindo `/estudantes/` da API."""
+    return await _paginated(request, '/estudantes/', 'students', 'frontend/students_list.html')
+
+
+async def courses_list(request: HttpRequest):
+    """Lista paginada de cursos, consumindo `/cursos/` da API."""
+    return await _paginated(request, '/cursos/', 'courses', 'frontend/courses_list.html')
+
+
+async def professors_list(request: HttpRequest):
+    """Lista paginada de professores, consumindo `/professores/` da API."""
+    return await _paginated(request, '/professores/', 'professors', 'frontend/professors_list.html', links=False)
+
+
+async def _detail_list(request: HttpRequest, path: str, key: str, template: str, **extra):
+    """Lista aninhada de um recurso (`/estudantes/<pk>/notas/` etc.)."""
+    base, ctx = await _base_ctx(request, **extra)
+    data, err = await api.fetch_json(f"{base}{path}", request=request)
+    if data:
+        ctx[key] = data.get('results', data)
+    ctx['error'] = err
+    return render(request, template, ctx)
+
+
+async def _profile(request: HttpRequest, pk: int, template: str):
+    """Matrículas/notas do estudante a partir do endpoint composto `/estudantes/<pk>/perfil/`."""
+    base, ctx = await _base_ctx(request, student_id=pk)
+    data, err = await api.fetch_json(f"{base}/estudantes/{pk}/perfil/", request=request)
+    if data:
+        ctx.update(profile_context(data))
+    ctx['error'] = err
+    return render(request, template, ctx)
+
+
+async def student_enrollments(request: HttpRequest, pk: int):
+    """Lista as matrículas de um estudante específico (por ID)."""
+    return await _profile(request, pk, 'frontend/student_enrollments.html')
+
+
+async def student_grades(request: HttpRequest, pk: int):
+    """Lista todas as notas de um estudante."""
+    return await _profile(request, pk, 'frontend/student_grades.html')
+
+
+async def course_grades(request: HttpRequest, pk: int):
+    """Lista notas de um curso (endpoint `/cursos/<pk>/notas/`)."""
+    return await _detail_list(request, f'/cursos/{pk}/notas/', 'grades',
+                              'frontend/course_grades.html', course_id=pk)
+
+
+async def _form_view(request: HttpRequest, *, fields, path, method, ok_status, success, template, context, prefill=None):
+    """Formulário genérico: GET renderiza (com pré-carga opcional), POST envia à API."""
+    base, ctx = await _base_ctx(request)
+    if request.method == 'POST':
+        payload = {name: request.POST.get(name, default) for name, default in fields}
+        try:
+            status, body = await api.send_json(method, f"{base}{path}", payload, request)
+            if status in ok_status:
+                return redirect(success)
+            return render(request, template, context(base, ctx['has_token'], payload, body))
+        except Exception as exc:
+            return render(request, template, context(base, ctx['has_token'], payload, {'error': str(exc)}))
+    if prefill:
+        data, err = await api.fetch_json(f"{base}{prefill}", request=request)
+        return render(request, template, context(base, ctx['has_token'], data, {'error': err} if err else None))
+    return render(request, template, context(base, ctx['has_token']))
+
+
+_STUDENT_FIELDS = (('nome', ''), ('email', ''), ('cpf', ''), ('data_nascimento', ''), ('celular', ''))
+_COURSE_FIELDS = (('codigo', ''), ('descricao', ''), ('nivel', 'B'))
+
+
+async def student_create(request: HttpRequest):
+    """Cria um estudante via POST na API e renderiza o formulário."""
+    return await _form_view(request, fields=_STUDENT_FIELDS, path='/estudantes/', method='POST',
+                            ok_status=(200, 201), success='students_list',
+                            template='frontend/student_form.html', context=student_form_context)
+
+
+async def student_edit(request: HttpRequest, pk: int):
+    """Edita um estudante existente (carrega dados no GET e envia PUT no POST)."""
+    return await _form_view(request, fields=_STUDENT_FIELDS, path=f'/estudantes/{pk}/', method='PUT',
+                            ok_status=(200, 202), success='students_list',
+                            template='frontend/student_form.html', context=student_form_context,
+                            prefill=f'/estudantes/{pk}/')
+
+
+async def course_create(request: HttpRequest):
+    """Cria um curso via POST na API e renderiza o formulário."""
+    return await _form_view(request, fields=_COURSE_FIELDS, path='/cursos/', method='POST',
+                            ok_status=(200, 201), success='courses_list',
+                            template='frontend/course_form.html', context=course_form_context)
+
+
+async def course_edit(request: HttpRequest, pk: int):
+    """Edita um curso existente (carrega dados no GET e envia PUT no POST)."""
+    return await _form_view(request, fields=_COURSE_FIELDS, path=f'/cursos/{pk}/', method='PUT',
+                            ok_status=(200, 202), success='courses_list',
+                            template='frontend/course_form.html', context=course_form_context,
+                            prefill=f'/cursos/{pk}/')
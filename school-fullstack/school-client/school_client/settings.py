@@ -44,10 +44,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'frontend.fases.FasesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'frontend.perfilador.PerfilMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -56,7 +58,8 @@ ROOT_URLCONF = 'school_client.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # PT: DjangoTemplates que mede a renderização (Server-Timing) | EN: DjangoTemplates that times rendering (Server-Timing)
+        'BACKEND': 'frontend.fases.TemplatesCronometrados',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -93,3 +96,21 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # PT/EN: Config para consumir a API school-rest
 API_BASE_URL = os.getenv('API_BASE_URL', 'http://localhost:8001')
 API_TOKEN = os.getenv('API_TOKEN', '')
+# PT: Segundos em cache da base resolvida | EN: Seconds the resolved base stays cached
+API_BASE_TTL = int(os.getenv('API_BASE_TTL', '30'))
+# PT: Views assíncronas (ASGI) e tamanho do pool HTTP | EN: Async views (ASGI) and HTTP pool size
+FRONTEND_ASYNC = os.getenv('FRONTEND_ASYNC', 'False').lower() in ('1', 'true', 'yes')
+API_MAX_CONNECTIONS = int(os.getenv('API_MAX_CONNECTIONS', '100'))
+# PT: Resiliência das chamadas à API (circuit breaker, timeout adaptativo, último payload válido)
+# EN: API call resilience (circuit breaker, adaptive timeout, last-known-good payload)
+API_BREAKER_FALHAS = int(os.getenv('API_BREAKER_FALHAS', '5'))
+API_BREAKER_RESET = float(os.getenv('API_BREAKER_RESET', '30'))
+API_TIMEOUT_MIN = float(os.getenv('API_TIMEOUT_MIN', '0.5'))
+API_TIMEOUT_MAX = float(os.getenv('API_TIMEOUT_MAX', '10'))
+API_TIMEOUT_FATOR = float(os.getenv('API_TIMEOUT_FATOR', '3'))
+API_TIMEOUT_AMOSTRAS = int(os.getenv('API_TIMEOUT_AMOSTRAS', '20'))
+API_LKG_TTL = int(os.getenv('API_LKG_TTL', str(24 * 3600)))
+# PT: Cabeçalho Server-Timing (rede/json/template/app) e parâmetro de profiling para staff
+# EN: Server-Timing header (rede/json/template/app) and staff profiling query parameter
+FRONTEND_SERVER_TIMING = os.getenv('FRONTEND_SERVER_TIMING', str(DEBUG)).lower() in ('1', 'true', 'yes')
+FRONTEND_PERFIL_PARAM = os.getenv('FRONTEND_PERFIL_PARAM', '_perfil')
@@ -1,38 +1,88 @@
 """
 PT: Configurações do Django Admin para os modelos da aplicação escola.
+- Listas com contagem estimada (`escola.paginacao`) e sem o total geral ao
+  filtrar, então abrir uma lista não faz `COUNT(*)` na tabela inteira.
+- `list_select_related` traz estudante e curso no mesmo SELECT (sem N+1 ao
+  mostrar matrículas e notas); chaves estrangeiras usam autocomplete em vez de
+  um <select> com a tabela inteira.
+- A busca não diferencia maiúsculas e usa lookups que aproveitam índices: prefixo
+  (`istartswith`) para nomes e códigos, igualdade (`iexact`) para email e exata
+  para cpf. No Postgres os índices funcionais `UPPER(...)` da migração 0009
+  respondem a essas expressões. `icontains` (LIKE '%x%') sempre varre a tabela.
+
 EN: Django Admin configurations for the escola app models.
+- Lists with estimated counts (`escola.paginacao`) and no grand total when
+  filtering, so opening a list does not `COUNT(*)` the whole table.
+- `list_select_related` fetches student and course in the same SELECT (no N+1
+  when showing enrollments and grades); foreign keys use autocomplete instead of
+  a <select> holding the whole table.
+- Search is case-insensitive and uses lookups that can use indexes: prefix
+  (`istartswith`) for names and codes, equality (`iexact`) for email and exact
+  match for cpf. On Postgres the `UPPER(...)` functional indexes from migration
+  0009 answer those expressions. `icontains` (LIKE '%x%') always scans the table.
 """
 
 from django.contrib import admin
-from escola.models import Estudante, Curso, Matricula, Professor, Nota
+from escola.models import Estudante, Curso, Matricula, Professor, Nota, Tarefa
+from escola.paginacao import PaginadorEstimado
+
+
+class AdminEscola(admin.ModelAdmin):
+    """PT: Base das listas do admin para tabelas grandes. EN: Admin list base for large tables."""
+    paginator = PaginadorEstimado
+    show_full_result_count = False
+    list_per_page = 10
 
 
-class Estudantes(admin.ModelAdmin):
+class Estudantes(AdminEscola):
     """PT: Lista e busca de estudantes no admin. EN: Student list and search in admin."""
     list_display = ('id', 'nome', 'email', 'cpf', 'data_nascimento', 'celular')
     list_display_links = ('id', 'nome')
-    search_fields = ('nome', 'email', 'cpf')
-    list_per_page = 10
+    search_fields = ('nome__istartswith', 'email__iexact', 'cpf__exact')
 
-class Cursos(admin.ModelAdmin):
+class Cursos(AdminEscola):
     """PT: Lista, filtros e busca de cursos. EN: Course list, filters and search."""
     list_display = ('id', 'codigo', 'descricao', 'nivel')
     list_display_links = ('id', 'codigo')
     list_filter = ('nivel',)
-    search_fields = ('codigo', 'descricao', 'nivel')
-    list_per_page = 10
-        
-class Matriculas(admin.ModelAdmin):
+    search_fields = ('codigo__istartswith',)
+
+class Matriculas(AdminEscola):
     """PT: Lista e busca de matrículas. EN: Enrollment list and search."""
     list_display = ('id', 'estudante', 'curso', 'periodo')
     list_display_links = ('id', 'estudante')
     list_filter = ('periodo',)
-    search_fields = ('estudante__nome', 'curso__codigo')
-    list_per_page = 10
-        
+    list_select_related = ('estudante', 'curso')
+    autocomplete_fields = ('estudante', 'curso')
+    search_fields = ('estudante__nome__istartswith', 'curso__codigo__istartswith')
+
+class Professores(AdminEscola):
+    """PT: Lista e busca de professores. EN: Teacher list and search."""
+    list_display = ('id', 'nome', 'email', 'celular')
+    list_display_links = ('id', 'nome')
+    autocomplete_fields = ('cursos',)
+    search_fields = ('nome__istartswith',)
+
+class Notas(AdminEscola):
+    """PT: Lista e busca de notas. EN: Grade list and search."""
+    list_display = ('id', 'estudante', 'curso', 'avaliacao', 'valor', 'data')
+    list_display_links = ('id', 'estudante')
+    list_select_related = ('estudante', 'curso')
+    autocomplete_fields = ('estudante', 'curso')
+    search_fields = ('estudante__nome__istartswith', 'curso__codigo__istartswith')
+
+class Tarefas(AdminEscola):
+    """PT: Acompanhamento da fila de tarefas. EN: Job queue monitoring."""
+    list_display = ('id', 'tipo', 'estado', 'tentativas', 'executar_em', 'trabalhador', 'concluida_em')
+    list_display_links = ('id', 'tipo')
+    list_filter = ('estado',)
+    readonly_fields = ('tentativas', 'resultado', 'erro', 'criado_por', 'trabalhador', 'expira_em', 'criada_em',
+                       'iniciada_em', 'concluida_em')
+
 
 admin.site.register(Estudante, Estudantes)
 admin.site.register(Curso, Cursos)
 admin.site.register(Matricula, Matriculas)
-admin.site.register(Professor)
-admin.site.register(Nota)
+admin.site.register(Professor, Professores)
+admin.site.register(Nota, Notas)
+admin.site.register(Tarefa, Tarefas)
@@ -0,0 +1,116 @@
+"""
+PT: Registro de mudanças (change log) para sincronização incremental.
+- Cada inclusão/alteração/exclusão de Estudante, Curso, Matricula, Professor ou
+  Nota vira uma `Alteracao` com `seq` crescente (gravada na mesma transação da
+  mudança, via sinais em `escola.signals`).
+- Operações em massa que não disparam sinais (`bulk_create`, `update()`) devem
+  chamar `registrar_lote`.
+- `compactar` mantém só a última entrada de cada objeto entre as antigas: quem
+  sincroniza a partir de qualquer `seq` continua chegando ao estado final.
+- Ordem: um leitor que pede `seq > X` só não perde linhas se nenhuma transação
+  com `seq` menor ainda estiver por confirmar. No SQLite as escritas já são
+  serializadas pelo próprio banco; no Postgres `reservar_ordem` segura um
+  advisory lock até o COMMIT, então os `seq` ficam visíveis na ordem. O custo é
+  uma escrita de cada vez nas tabelas com feed.
+
+EN: Change log for incremental sync.
+- Every insert/update/delete of Estudante, Curso, Matricula, Professor or Nota
+  becomes an `Alteracao` with a growing `seq` (written in the same transaction
+  as the change, via signals in `escola.signals`).
+- Bulk operations that skip signals (`bulk_create`, `update()`) must call
+  `registrar_lote`.
+- `compactar` keeps only each object's latest entry among the old ones: a mirror
+  syncing from any `seq` still reaches the final state.
+- Ordering: a reader asking for `seq > X` only never misses rows if no
+  transaction with a lower `seq` is still uncommitted. On SQLite writes are
+  already serialized by the database; on Postgres `reservar_ordem` holds an
+  advisory lock until COMMIT, so `seq` values become visible in order. The cost
+  is one writer at a time on the tables with a feed.
+"""
+
+from decimal import Decimal
+
+from django.db import connections, models, router, transaction
+from django.db.models import Exists, OuterRef
+
+from escola.models import Alteracao, Curso, Estudante, Matricula, Nota, Professor
+
+MODELOS = (Estudante, Curso, Matricula, Professor, Nota)
+
+CRIACAO, ALTERACAO, EXCLUSAO = 'C', 'U', 'D'
+
+# PT: Chave do advisory lock de `reservar_ordem` | EN: Advisory lock key for `reservar_ordem`
+TRAVA_ORDEM = 7_301_040
+
+
+def nome_modelo(model) -> str:
+    return model._meta.model_name
+
+
+def _valor(field, valor):
+    # PT: Decimais saem como na API ("8.50"), mesmo se o objeto recebeu float/int
+    # EN: Decimals come out as in the API ("8.50"), even if the object got a float/int
+    if isinstance(field, models.DecimalField) and valor is not None:
+        return format(Decimal(str(valor)), f'.{field.decimal_places}f')
+    return valor
+
+
+def instantaneo(instance) -> dict:
+    """PT: Colunas do objeto (FKs como `<campo>_id`). EN: Object columns (FKs as `<field>_id`)."""
+    return {f.attname: _valor(f, getattr(instance, f.attname)) for f in instance._meta.concrete_fields}
+
+
+def _nova(instance, operacao: str) -> Alteracao:
+    return Alteracao(modelo=nome_modelo(type(instance)), objeto_id=instance.pk,
+                     operacao=operacao, dados=instantaneo(instance))
+
+
+def reservar_ordem() -> None:
+    """PT: No Postgres, espera a vez de gravar alterações e a mantém até o fim da transação.
+    EN: On Postgres, waits for the turn to write changes and keeps it until the transaction ends.
+
+    Chamada antes de escrever nos modelos com feed (sinais `pre_*`, upsert em
+    lote), para que a trava venha antes das travas de linha — pegá-la só no
+    INSERT da `Alteracao` poderia formar deadlock com quem já a tem. Fora de um
+    bloco atômico não faz nada: `registrar` abre o seu.
+    """
+    conexao = connections[router.db_for_write(Alteracao)]
+    if conexao.vendor == 'postgresql' and conexao.in_atomic_block:
+        with conexao.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [TRAVA_ORDEM])
+
+
+def registrar(instance, operacao: str) -> Alteracao:
+    """PT: Grava uma mudança de um objeto. EN: Records one object's change."""
+    alteracao = _nova(instance, operacao)
+    with transaction.atomic(using=router.db_for_write(Alteracao), savepoint=False):
+        reservar_ordem()
+        alteracao.save()
+    return alteracao
+
+
+def registrar_lote(instances, operacao: str) -> None:
+    """PT: Grava as mudanças de vários objetos num INSERT só. EN: Records many objects' changes in one INSERT."""
+    with transaction.atomic(using=router.db_for_write(Alteracao), savepoint=False):
+        reservar_ordem()
+        Alteracao.objects.bulk_create([_nova(obj, operacao) for obj in instances])
+
+
+def substituidas(antes):
+    """PT: Entradas anteriores a `antes` que já têm uma entrada mais nova do mesmo objeto.
+    EN: Entries older than `antes` that already have a newer entry for the same object.
+    """
+    mais_nova = Alteracao.objects.filter(
+        modelo=OuterRef('modelo'), objeto_id=OuterRef('objeto_id'), seq__gt=OuterRef('seq'),
+    )
+    return Alteracao.objects.filter(criado_em__lt=antes).filter(Exists(mais_nova))
+
+
+def compactar(antes) -> int:
+    """PT: Remove as entradas de `substituidas(antes)`. EN: Deletes the `substituidas(antes)` entries.
+
+    Returns:
+        int: entradas removidas | entries removed.
+    """
+    removidas, _ = substituidas(antes).delete()
+    return removidas
@@ -10,6 +10,11 @@ class EscolaConfig(AppConfig):
 
     - default_auto_field: usa BigAutoField para chaves primárias auto-incrementais.
     - name: caminho do app (usado pelo Django para registro).
+    - ready: registra os sinais (invalidação do cache de autenticação).
     """
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'escola'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
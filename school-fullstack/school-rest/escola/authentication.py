@@ -0,0 +1,115 @@
+"""
+PT: Autenticação por token com cache (evita consultas repetidas a cada requisição).
+- Resolve token → usuário, permissões e grupos uma vez e guarda no cache do Django.
+- Invalidação: exclusão do token remove a entrada; mudanças em usuário, grupos
+  ou permissões trocam a geração (todas as entradas antigas deixam de valer).
+- A geração é um timestamp em ns, não um contador: se o cache descartar a chave
+  (MAX_ENTRIES), a nova geração nunca coincide com uma antiga e nada volta a valer.
+- Contadores de acertos/falhas só são gravados com `ESCOLA_AUTH_ESTATISTICAS`; sem
+  ela um acerto custa uma única leitura do cache.
+
+EN: Cached token authentication (avoids repeated queries on every request).
+- Resolves token → user, permissions and groups once and keeps them in Django's cache.
+- Invalidation: deleting the token removes its entry; changes to users, groups
+  or permissions bump the generation (every older entry stops being used).
+- The generation is a ns timestamp, not a counter: if the cache culls the key
+  (MAX_ENTRIES), the new generation never matches an old one and nothing comes back.
+- Hit/miss counters are only written with `ESCOLA_AUTH_ESTATISTICAS`; otherwise a
+  hit touches the cache just once.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.authentication import TokenAuthentication
+
+CHAVE_GERACAO = 'escola:auth:geracao'
+CHAVE_ACERTOS = 'escola:auth:acertos'
+CHAVE_FALHAS = 'escola:auth:falhas'
+
+# PT: Consultas evitadas por acerto: token+usuário (sempre) e, quando usados,
+# permissões de usuário/grupo e a lista de grupos do /me/.
+# EN: Queries avoided per hit: token+user (always) and, when used,
+# user/group permissions and the /me/ group list.
+CONSULTAS_MINIMAS_POR_ACERTO = 1
+CONSULTAS_MAXIMAS_POR_ACERTO = 4
+
+
+def _geracao() -> int:
+    geracao = cache.get(CHAVE_GERACAO)
+    if geracao is None:
+        cache.add(CHAVE_GERACAO, time.time_ns(), None)
+        geracao = cache.get(CHAVE_GERACAO)
+    return geracao
+
+
+def chave_token(key: str, geracao: int | None = None) -> str:
+    """PT: Chave de cache do token (hash, para não expor o token nas chaves).
+    EN: Cache key for a token (hashed, so the token never shows up in keys).
+    """
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return f'escola:auth:{geracao if geracao is not None else _geracao()}:{digest}'
+
+
+def invalidar_token(key: str) -> None:
+    """PT: Remove um token específico do cache. EN: Drops one token from the cache."""
+    cache.delete(chave_token(key))
+
+
+def invalidar_tudo() -> None:
+    """PT: Invalida todas as entradas trocando a geração. EN: Invalidates every entry by bumping the generation."""
+    cache.set(CHAVE_GERACAO, time.time_ns(), None)
+
+
+def _contar(chave: str) -> None:
+    # PT: Uma escrita no cache por requisição só quando alguém vai ler os números
+    # EN: One cache write per request only when someone is going to read the numbers
+    if not settings.ESCOLA_AUTH_ESTATISTICAS:
+        return
+    try:
+        cache.incr(chave)
+    except ValueError:
+        cache.add(chave, 1, None)
+
+
+def estatisticas() -> dict:
+    """PT: Acertos, falhas e faixa estimada de consultas evitadas.
+    EN: Hits, misses and the estimated range of avoided queries.
+    """
+    acertos = cache.get(CHAVE_ACERTOS, 0)
+    falhas = cache.get(CHAVE_FALHAS, 0)
+    return {
+        'acertos': acertos,
+        'falhas': falhas,
+        'consultas_evitadas_min': acertos * CONSULTAS_MINIMAS_POR_ACERTO,
+        'consultas_evitadas_max': acertos * CONSULTAS_MAXIMAS_POR_ACERTO,
+    }
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """PT: `TokenAuthentication` que guarda o par (usuário, token) no cache por
+    `ESCOLA_AUTH_CACHE_TTL` segundos, com permissões e grupos pré-carregados.
+
+    EN: `TokenAuthentication` that caches the (user, token) pair for
+    `ESCOLA_AUTH_CACHE_TTL` seconds, with permissions and groups preloaded.
+    """
+
+    def authenticate_credentials(self, key):
+        chave = chave_token(key)
+        token = cache.get(chave)
+        if token is not None:
+            _contar(CHAVE_ACERTOS)
+            return (token.user, token)
+
+        _contar(CHAVE_FALHAS)
+        user, token = super().authenticate_credentials(key)
+        # PT: O ModelBackend guarda as permissões em `_perm_cache` no próprio objeto,
+        # que vai junto para o cache; `_escola_grupos` atende o /me/.
+        # EN: ModelBackend keeps permissions in `_perm_cache` on the object itself,
+        # which travels to the cache; `_escola_grupos` serves /me/.
+        user.get_all_permissions()
+        user._escola_grupos = list(user.groups.values_list('name', flat=True))
+        cache.set(chave, token, settings.ESCOLA_AUTH_CACHE_TTL)
+        return (user, token)
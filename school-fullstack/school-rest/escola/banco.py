@@ -0,0 +1,212 @@
+"""
+PT: Roteamento de banco: primário, réplicas de leitura e a conexão somente leitura.
+- `LeituraMiddleware` marca as requisições GET/HEAD/OPTIONS e identifica o
+  cliente (token ou cookie de sessão). Só as leituras dessas requisições saem do
+  `default`; escritas, e leituras de POST/PUT/PATCH/DELETE, ficam nele.
+- Modelos de `ESCOLA_REPLICA_MODELOS` (Estudante, Curso, Professor, Matricula,
+  Nota) são lidos de uma réplica de `ESCOLA_REPLICAS`, escolhida uma vez por
+  requisição entre as que estão com atraso até `ESCOLA_REPLICA_ATRASO_MAX` s
+  (medido a cada `ESCOLA_REPLICA_VERIFICACAO` s por processo). Sem réplica
+  saudável, o primário responde.
+- Read-your-writes: quem escreveu um desses modelos fica fixado no primário por
+  `ESCOLA_REPLICA_FIXACAO` s (marca no cache, vale para todos os processos).
+- Os demais modelos de GETs vão para o alias `leitura`, quando configurado
+  (ex.: `SQLITE_LEITURA=True`).
+- Dentro de uma transação no `default` as leituras ficam nele (enxergam o que a
+  própria transação escreveu).
+- Caches montados a partir de uma réplica (ex.: perfil do estudante) podem
+  guardar um dado até `ESCOLA_REPLICA_ATRASO_MAX` s mais velho que o primário.
+
+EN: Database routing: primary, read replicas and the read-only connection.
+- `LeituraMiddleware` flags GET/HEAD/OPTIONS requests and identifies the client
+  (token or session cookie). Only those requests' reads leave `default`; writes,
+  and reads from POST/PUT/PATCH/DELETE, stay on it.
+- Models in `ESCOLA_REPLICA_MODELOS` (Estudante, Curso, Professor, Matricula,
+  Nota) are read from one of `ESCOLA_REPLICAS`, picked once per request among
+  those lagging at most `ESCOLA_REPLICA_ATRASO_MAX` s (measured every
+  `ESCOLA_REPLICA_VERIFICACAO` s per process). With no healthy replica, the
+  primary answers.
+- Read-your-writes: a client that wrote one of those models is pinned to the
+  primary for `ESCOLA_REPLICA_FIXACAO` s (a cache mark, shared by every process).
+- Other models read by GETs go to the `leitura` alias, when configured
+  (e.g. `SQLITE_LEITURA=True`).
+- Inside a transaction on `default` reads stay there (they see what the
+  transaction itself wrote).
+- Caches built from a replica (e.g. the student profile) may hold data up to
+  `ESCOLA_REPLICA_ATRASO_MAX` s older than the primary.
+"""
+
+import hashlib
+import math
+import random
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+LEITURA = 'leitura'
+METODOS_LEITURA = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+# PT: Segundos atrás do primário; 0 no primário ou com o replay em dia
+# EN: Seconds behind the primary; 0 on a primary or when replay has caught up
+SQL_ATRASO_POSTGRES = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+@dataclass
+class _Requisicao:
+    somente_leitura: bool
+    cliente: str | None = None
+    fixado: bool = False
+    escreveu: bool = False
+    replica: str | None = None
+
+
+_requisicao: ContextVar[_Requisicao | None] = ContextVar('escola_requisicao_banco', default=None)
+
+# PT/EN: alias -> (medido_em, atraso em s | lag in s)
+_atrasos: dict[str, tuple[float, float]] = {}
+
+
+def _cliente(request) -> str | None:
+    """PT: Hash do token (cabeçalho Authorization) ou do cookie de sessão.
+    EN: Hash of the token (Authorization header) or of the session cookie.
+    """
+    credencial = request.headers.get('Authorization') or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    return hashlib.sha256(credencial.encode()).hexdigest() if credencial else None
+
+
+def chave_fixacao(cliente: str) -> str:
+    return f'escola:banco:fixado:{cliente}'
+
+
+def _replicas_ativas() -> bool:
+    return bool(settings.ESCOLA_REPLICAS)
+
+
+def _inicio(request) -> _Requisicao:
+    return _Requisicao(request.method in METODOS_LEITURA, _cliente(request) if _replicas_ativas() else None)
+
+
+class LeituraMiddleware:
+    """PT: Marca a requisição (somente leitura? qual cliente?) para o roteador.
+    EN: Tags the request (read-only? which client?) for the router.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        estado = _inicio(request)
+        if estado.somente_leitura and estado.cliente:
+            estado.fixado = cache.get(chave_fixacao(estado.cliente)) is not None
+        marca = _requisicao.set(estado)
+        try:
+            return self.get_response(request)
+        finally:
+            _requisicao.reset(marca)
+            if estado.escreveu and estado.cliente:
+                cache.set(chave_fixacao(estado.cliente), True, settings.ESCOLA_REPLICA_FIXACAO)
+
+    async def __acall__(self, request):
+        estado = _inicio(request)
+        if estado.somente_leitura and estado.cliente:
+            estado.fixado = await cache.aget(chave_fixacao(estado.cliente)) is not None
+        marca = _requisicao.set(estado)
+        try:
+            return await self.get_response(request)
+        finally:
+            _requisicao.reset(marca)
+            if estado.escreveu and estado.cliente:
+                await cache.aset(chave_fixacao(estado.cliente), True, settings.ESCOLA_REPLICA_FIXACAO)
+
+
+def medir_atraso(alias: str) -> float:
+    """PT: Atraso da réplica em segundos (`inf` se ela não responde). Só o Postgres
+    informa atraso real; nos demais bancos vale 0 enquanto a conexão abre.
+    EN: Replica lag in seconds (`inf` if it does not answer). Only Postgres reports
+    real lag; other databases count as 0 while the connection opens.
+    """
+    conexao = connections[alias]
+    try:
+        if conexao.vendor == 'postgresql':
+            with conexao.cursor() as cursor:
+                cursor.execute(SQL_ATRASO_POSTGRES)
+                return float(cursor.fetchone()[0])
+        conexao.ensure_connection()
+        return 0.0
+    except DatabaseError:
+        return math.inf
+
+
+def atraso(alias: str) -> float:
+    """PT: `medir_atraso` com cache por processo. EN: `medir_atraso` cached per process."""
+    agora = time.monotonic()
+    medido = _atrasos.get(alias)
+    if medido is None or agora - medido[0] >= settings.ESCOLA_REPLICA_VERIFICACAO:
+        medido = _atrasos[alias] = (agora, medir_atraso(alias))
+    return medido[1]
+
+
+def escolher_replica() -> str:
+    """PT: Uma réplica dentro do atraso aceito, ou o primário. EN: A replica within the accepted lag, or the primary."""
+    saudaveis = [alias for alias in settings.ESCOLA_REPLICAS if atraso(alias) <= settings.ESCOLA_REPLICA_ATRASO_MAX]
+    return random.choice(saudaveis) if saudaveis else DEFAULT_DB_ALIAS
+
+
+def _replicado(model) -> bool:
+    return model._meta.app_label == 'escola' and model._meta.model_name in settings.ESCOLA_REPLICA_MODELOS
+
+
+class RoteadorLeitura:
+    """PT: Leituras de GETs em réplica/`leitura`; escritas e o resto no `default`.
+    EN: GET reads on a replica/`leitura`; writes and everything else on `default`.
+    """
+
+    def db_for_read(self, model, **hints):
+        estado = _requisicao.get()
+        if (estado is None or not estado.somente_leitura
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return DEFAULT_DB_ALIAS
+        if _replicas_ativas() and _replicado(model):
+            if estado.fixado or estado.escreveu:
+                return DEFAULT_DB_ALIAS
+            if estado.replica is None:
+                estado.replica = escolher_replica()
+            return estado.replica
+        if LEITURA in settings.DATABASES:
+            return LEITURA
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        estado = _requisicao.get()
+        if estado is not None and _replicado(model):
+            estado.escreveu = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # PT/EN: Todos os aliases têm os mesmos dados | every alias holds the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # PT: O alias somente leitura nunca migra; réplicas de verdade recebem o schema pela
+        #     replicação, mas bancos avulsos (ex.: os de teste) precisam das tabelas.
+        # EN: The read-only alias never migrates; real replicas get the schema through
+        #     replication, but standalone databases (e.g. test ones) need the tables.
+        return db != LEITURA
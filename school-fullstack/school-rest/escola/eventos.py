@@ -0,0 +1,234 @@
+"""
+PT: Server-Sent Events com as notas de um curso (`/cursos/{pk}/notas/stream/`).
+- Fonte: o feed de mudanças (`Alteracao`, modelo `nota`); cada evento traz a nota
+  no mesmo formato do `NotaSerializer` e `id: <seq>` para retomar de onde parou
+  (`Last-Event-ID` ou `?since=`). Os `seq` ficam visíveis em ordem
+  (`escola.alteracoes.reservar_ordem`), então buscar `seq > último` não pula eventos.
+- ASGI (ex.: `uvicorn setup.asgi:application`): um único poller por processo
+  consulta o banco a cada `ESCOLA_SSE_INTERVALO` segundos e distribui para os
+  ouvintes do curso; ouvintes ociosos custam só uma fila limitada
+  (`ESCOLA_SSE_FILA`). Se a fila enche, o ouvinte recebe `reset` e recarrega.
+- WSGI (runserver): cada conexão consulta o banco sozinha — serve para
+  desenvolvimento; em produção use ASGI.
+- Conexões duram até `ESCOLA_SSE_DURACAO` segundos; o EventSource reconecta sozinho.
+
+EN: Server-Sent Events with a course's grades (`/cursos/{pk}/notas/stream/`).
+- Source: the change feed (`Alteracao`, model `nota`); each event carries the grade
+  in the same shape as `NotaSerializer` and `id: <seq>` to resume where it left
+  off (`Last-Event-ID` or `?since=`). `seq` values become visible in order
+  (`escola.alteracoes.reservar_ordem`), so fetching `seq > last` never skips events.
+- ASGI (e.g. `uvicorn setup.asgi:application`): a single poller per process
+  queries the database every `ESCOLA_SSE_INTERVALO` seconds and fans out to the
+  course's listeners; idle listeners only cost a bounded queue
+  (`ESCOLA_SSE_FILA`). When the queue fills up, the listener gets `reset` and reloads.
+- WSGI (runserver): each connection queries the database on its own — fine for
+  development; use ASGI in production.
+- Connections last up to `ESCOLA_SSE_DURACAO` seconds; EventSource reconnects on its own.
+"""
+
+import asyncio
+import json
+import time
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Max
+from django.http import StreamingHttpResponse
+
+from escola.models import Alteracao, Curso, Estudante
+
+RESET = 'event: reset\ndata: {}\n\n'
+PING = ': ping\n\n'
+
+
+def ultimo_seq() -> int:
+    return Alteracao.objects.aggregate(m=Max('seq'))['m'] or 0
+
+
+def carregar(desde: int, curso: int | None = None, limite: int = 500) -> list[dict]:
+    """PT: Mudanças de notas com `seq > desde`, já no formato do `NotaSerializer`.
+    EN: Grade changes with `seq > desde`, already shaped like `NotaSerializer`.
+    """
+    queryset = Alteracao.objects.filter(seq__gt=desde, modelo='nota').order_by('seq')
+    if curso is not None:
+        queryset = queryset.filter(dados__curso_id=curso)
+    linhas = list(queryset.values('seq', 'operacao', 'dados')[:limite])
+    if not linhas:
+        return []
+
+    # PT: Nomes e códigos numa consulta cada, para o lote todo | EN: Names and codes in one query each for the whole batch
+    nomes = dict(Estudante.objects.filter(pk__in={l['dados']['estudante_id'] for l in linhas})
+                 .values_list('id', 'nome'))
+    codigos = dict(Curso.objects.filter(pk__in={l['dados']['curso_id'] for l in linhas})
+                   .values_list('id', 'codigo'))
+    eventos = []
+    for linha in linhas:
+        dados = linha['dados']
+        eventos.append({
+            'seq': linha['seq'],
+            'curso': dados['curso_id'],
+            'operacao': linha['operacao'],
+            'nota': {
+                'id': dados['id'],
+                'estudante': dados['estudante_id'],
+                'estudante_nome': nomes.get(dados['estudante_id'], ''),
+                'curso': dados['curso_id'],
+                'curso_codigo': codigos.get(dados['curso_id'], ''),
+                'valor': dados['valor'],
+                'avaliacao': dados['avaliacao'],
+                'data': dados['data'],
+            },
+        })
+    return eventos
+
+
+def quadro(evento: dict) -> str:
+    """PT: Evento no formato SSE. EN: Event in SSE wire format."""
+    corpo = json.dumps({'operacao': evento['operacao'], 'nota': evento['nota']}, ensure_ascii=False)
+    return f"id: {evento['seq']}\nevent: nota\ndata: {corpo}\n\n"
+
+
+def _ola(seq: int) -> str:
+    return f"retry: 3000\nid: {seq}\nevent: hello\ndata: {json.dumps({'seq': seq})}\n\n"
+
+
+class Ouvinte:
+    """PT: Uma conexão SSE: fila limitada e marca de transbordo. EN: One SSE connection: bounded queue and overflow flag."""
+
+    __slots__ = ('curso', 'fila', 'transbordou', '__weakref__')
+
+    def __init__(self, curso: int):
+        self.curso = curso
+        self.fila = asyncio.Queue(maxsize=settings.ESCOLA_SSE_FILA)
+        self.transbordou = False
+
+    def entregar(self, evento: dict):
+        try:
+            self.fila.put_nowait(evento)
+        except asyncio.QueueFull:
+            # PT: Cliente lento: descarta e pede recarga | EN: Slow client: drop and ask for a reload
+            self.transbordou = True
+
+
+class Central:
+    """PT: Poller único do event loop e distribuição por curso.
+    EN: The event loop's single poller and per-course fan-out.
+    """
+
+    def __init__(self):
+        self.ouvintes: dict[int, set[Ouvinte]] = {}
+        self.ultimo: int | None = None
+        self.tarefa: asyncio.Task | None = None
+
+    async def inscrever(self, curso: int) -> Ouvinte:
+        if self.ultimo is None:
+            self.ultimo = await sync_to_async(ultimo_seq)()
+        ouvinte = Ouvinte(curso)
+        self.ouvintes.setdefault(curso, set()).add(ouvinte)
+        if self.tarefa is None or self.tarefa.done():
+            self.tarefa = asyncio.get_running_loop().create_task(self._rodar())
+        return ouvinte
+
+    def cancelar(self, ouvinte: Ouvinte):
+        grupo = self.ouvintes.get(ouvinte.curso)
+        if grupo is not None:
+            grupo.discard(ouvinte)
+            if not grupo:
+                del self.ouvintes[ouvinte.curso]
+
+    async def _rodar(self):
+        while self.ouvintes:
+            await asyncio.sleep(settings.ESCOLA_SSE_INTERVALO)
+            try:
+                eventos = await sync_to_async(carregar)(self.ultimo)
+            except Exception:
+                continue  # PT/EN: falha temporária do banco; tenta de novo | transient DB failure; retry
+            for evento in eventos:
+                self.ultimo = evento['seq']
+                for ouvinte in tuple(self.ouvintes.get(evento['curso'], ())):
+                    ouvinte.entregar(evento)
+        # PT: Sem ouvintes o poller para e esquece a posição | EN: With no listeners the poller stops and forgets its position
+        self.ultimo = None
+
+
+_centrais: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Central]' = weakref.WeakKeyDictionary()
+
+
+def central() -> Central:
+    loop = asyncio.get_running_loop()
+    if loop not in _centrais:
+        _centrais[loop] = Central()
+    return _centrais[loop]
+
+
+async def _stream_async(curso: int, desde: int | None):
+    hub = central()
+    ouvinte = await hub.inscrever(curso)
+    try:
+        enviado = hub.ultimo
+        if desde is not None and desde < enviado:
+            # PT: Reenvia o que o cliente perdeu até o ponto do poller | EN: Replay what the client missed up to the poller
+            perdidos = await sync_to_async(carregar)(desde, curso, settings.ESCOLA_SSE_FILA)
+            if len(perdidos) >= settings.ESCOLA_SSE_FILA:
+                yield RESET
+                return
+            for evento in perdidos:
+                if evento['seq'] <= enviado:
+                    yield quadro(evento)
+        yield _ola(enviado)
+
+        loop = asyncio.get_running_loop()
+        fim = loop.time() + settings.ESCOLA_SSE_DURACAO
+        while loop.time() < fim:
+            try:
+                evento = await asyncio.wait_for(ouvinte.fila.get(), timeout=settings.ESCOLA_SSE_PING)
+            except asyncio.TimeoutError:
+                yield PING
+                continue
+            if ouvinte.transbordou:
+                yield RESET
+                return
+            if evento['seq'] > enviado:
+                enviado = evento['seq']
+                yield quadro(evento)
+    finally:
+        hub.cancelar(ouvinte)
+
+
+def _stream_sincrono(curso: int, desde: int | None):
+    enviado = ultimo_seq() if desde is None else desde
+    yield _ola(enviado)
+    fim = time.monotonic() + settings.ESCOLA_SSE_DURACAO
+    ping = time.monotonic() + settings.ESCOLA_SSE_PING
+    while time.monotonic() < fim:
+        time.sleep(settings.ESCOLA_SSE_INTERVALO)
+        for evento in carregar(enviado, curso, settings.ESCOLA_SSE_FILA):
+            enviado = evento['seq']
+            yield quadro(evento)
+        if time.monotonic() >= ping:
+            ping = time.monotonic() + settings.ESCOLA_SSE_PING
+            yield PING
+
+
+async def stream_notas_curso(request, pk: int):
+    """PT: Stream SSE das notas do curso `pk` (leitura aberta, como `/cursos/{pk}/notas/`).
+    EN: SSE stream of course `pk` grades (open read, like `/cursos/{pk}/notas/`).
+    """
+    bruto = request.headers.get('Last-Event-ID') or request.GET.get('since')
+    desde = int(bruto) if bruto and bruto.isdigit() else None
+    if isinstance(request, ASGIRequest):
+        conteudo = _stream_async(pk, desde)
+    else:
+        conteudo = _stream_sincrono(pk, desde)
+
+    resposta = StreamingHttpResponse(conteudo, content_type='text/event-stream')
+    resposta['Cache-Control'] = 'no-cache'
+    resposta['X-Accel-Buffering'] = 'no'  # PT/EN: sem buffer no nginx | no nginx buffering
+    origem = request.headers.get('Origin')
+    permitidas = settings.ESCOLA_SSE_ORIGENS
+    if origem and ('*' in permitidas or origem in permitidas):
+        resposta['Access-Control-Allow-Origin'] = origem
+        resposta['Vary'] = 'Origin'
+    return resposta
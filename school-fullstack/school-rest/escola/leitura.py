@@ -0,0 +1,141 @@
+"""
+PT: Caminho rápido de leitura para listas da API escola.
+- Em listas grandes o `to_representation` campo a campo do DRF custa mais CPU
+  que o próprio SQL. Aqui cada serializer é "compilado" uma vez num mapeador de
+  linhas: a lista sai direto de `values()`, sem instanciar modelos nem passar
+  pela maquinaria de campos do DRF.
+- A saída é idêntica à do serializer (mesmas chaves, ordem e conversões —
+  `DecimalField`, `DateField`, `get_FOO_display` etc.).
+- Serializers com campos que não dá para compilar (muitos-para-muitos,
+  `SerializerMethodField`, `source='*'`, propriedades) seguem pelo caminho normal.
+- Desligue com `ESCOLA_LEITURA_RAPIDA=False`.
+
+EN: Fast read path for escola API lists.
+- On large lists DRF's per-field `to_representation` costs more CPU than the SQL
+  itself. Here each serializer is "compiled" once into a row mapper: the list is
+  built straight from `values()`, without model instances or DRF's field machinery.
+- Output is identical to the serializer's (same keys, order and conversions —
+  `DecimalField`, `DateField`, `get_FOO_display` etc.).
+- Serializers with fields that cannot be compiled (many-to-many,
+  `SerializerMethodField`, `source='*'`, properties) take the regular path.
+- Turn off with `ESCOLA_LEITURA_RAPIDA=False`.
+"""
+
+import re
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.response import Response
+
+_DISPLAY = re.compile(r'get_(\w+)_display')
+
+# PT: Campos cuja representação é o próprio valor vindo do banco
+# EN: Fields whose representation is the database value itself
+_DIRETOS = (
+    serializers.ReadOnlyField,
+    serializers.PrimaryKeyRelatedField,
+    serializers.IntegerField,
+    serializers.CharField,
+    serializers.BooleanField,
+)
+
+_compilados: dict[tuple, 'MapeadorLinhas | None'] = {}
+
+
+class MapeadorLinhas:
+    """PT: Converte linhas de `values()` em dicionários iguais aos do serializer.
+    EN: Turns `values()` rows into the same dicts the serializer would produce.
+    """
+
+    __slots__ = ('lookups', 'itens')
+
+    def __init__(self, itens: list[tuple], pk: str = 'id'):
+        self.itens = itens
+        # PT: A pk sempre entra no SELECT para que `distinct()` não funda linhas iguais
+        # EN: The pk is always selected so `distinct()` never merges identical rows
+        self.lookups = list(dict.fromkeys([pk, *(lookup for _, lookup, _ in itens)]))
+
+    def __call__(self, linha: dict) -> dict:
+        saida = {}
+        for nome, lookup, conversor in self.itens:
+            valor = linha[lookup]
+            saida[nome] = valor if valor is None or conversor is None else conversor(valor)
+        return saida
+
+    def lista(self, linhas) -> list[dict]:
+        return [self(linha) for linha in linhas]
+
+
+def _campo_modelo(model, partes):
+    """PT: Segue a cadeia de relações e devolve o campo final (ou None).
+    EN: Follows the relation chain and returns the final field (or None).
+    """
+    campo = None
+    for parte in partes:
+        if model is None:
+            return None
+        try:
+            campo = model._meta.get_field(parte)
+        except FieldDoesNotExist:
+            return None
+        if campo.many_to_many or campo.one_to_many:
+            return None
+        model = campo.related_model
+    return campo
+
+
+def _compilar(serializer) -> MapeadorLinhas | None:
+    model = serializer.Meta.model
+    itens = []
+    for nome, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if isinstance(field, (serializers.ManyRelatedField, serializers.SerializerMethodField,
+                              serializers.BaseSerializer)) or field.source == '*':
+            return None
+
+        partes = field.source.split('.')
+        display = _DISPLAY.fullmatch(partes[-1])
+        if display:
+            partes[-1] = display.group(1)
+        campo = _campo_modelo(model, partes)
+        if campo is None:
+            return None
+
+        if display:
+            rotulos = dict(campo.flatchoices)
+            conversor = lambda valor, rotulos=rotulos: rotulos.get(valor, valor)  # noqa: E731
+        elif isinstance(field, _DIRETOS):
+            conversor = None
+        else:
+            conversor = field.to_representation
+        itens.append((nome, '__'.join(partes), conversor))
+    return MapeadorLinhas(itens, model._meta.pk.name)
+
+
+def mapeador_para(serializer) -> MapeadorLinhas | None:
+    """PT: Mapeador compilado (em cache por classe + campos) ou None se não compilável.
+    EN: Compiled mapper (cached per class + fields) or None when it cannot be compiled.
+    """
+    chave = (type(serializer), tuple(serializer.fields))
+    if chave not in _compilados:
+        _compilados[chave] = _compilar(serializer)
+    return _compilados[chave]
+
+
+class LeituraRapidaMixin:
+    """PT: Mixin de view que responde listas pelo mapeador compilado quando possível.
+    EN: View mixin that answers lists through the compiled mapper when possible.
+    """
+
+    def list(self, request, *args, **kwargs):
+        mapeador = mapeador_para(self.get_serializer()) if settings.ESCOLA_LEITURA_RAPIDA else None
+        if mapeador is None:
+            return super().list(request, *args, **kwargs)
+
+        linhas = self.filter_queryset(self.get_queryset()).values(*mapeador.lookups)
+        page = self.paginate_queryset(linhas)
+        if page is not None:
+            return self.get_paginated_response(mapeador.lista(page))
+        return Response(mapeador.lista(linhas))
@@ -0,0 +1,355 @@
+"""
+PT: Benchmark da API escola: todas as rotas GET do router e as listas aninhadas.
+- Cria uma base de teste (como `manage.py test`) com o tamanho pedido e a apaga no final.
+- Modos: `client` (test client do Django, sem rede — também conta SQL e mede memória
+  com tracemalloc), `wsgi` (servidor WSGI local em thread) e `asgi` (uvicorn local, se instalado).
+- Mede p50/p95/p99, média e vazão; grava tudo em JSON (`--saida`) e compara com um
+  resultado anterior (`--comparar`), falhando se algo piorou além de `--tolerancia`.
+- Throttling fica desligado durante a medição; autenticação usa um token (passa pelo cache de tokens).
+
+    python manage.py bench_api --estudantes 2000 --saida bench.json
+    python manage.py bench_api --estudantes 2000 --comparar bench.json
+
+EN: escola API benchmark: every GET route in the router plus the nested lists.
+- Creates a test database (like `manage.py test`) of the requested size and drops it at the end.
+- Modes: `client` (Django test client, no network — also counts SQL and measures memory
+  with tracemalloc), `wsgi` (local WSGI server in a thread) and `asgi` (local uvicorn, if installed).
+- Measures p50/p95/p99, mean and throughput; writes everything as JSON (`--saida`) and
+  compares against a previous run (`--comparar`), failing when something got worse beyond `--tolerancia`.
+- Throttling is off while measuring; authentication uses a token (goes through the token cache).
+"""
+
+import json
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import threading
+import time
+import tracemalloc
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.test import Client
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment
+from django.urls import URLPattern
+from rest_framework.authtoken.models import Token
+from rest_framework.views import APIView
+
+from escola import alteracoes, authentication, perfil, resumo
+from escola.medicao import percentil
+from escola.models import Curso, Estudante, Matricula, Nota, Professor
+
+try:
+    import uvicorn
+except ImportError:  # pragma: no cover - uvicorn é opcional | uvicorn is optional
+    uvicorn = None
+
+MODOS = ('client', 'wsgi', 'asgi')
+
+# PT: Rotas sem pk que também entram | EN: Routes without a pk that are included too
+EXTRAS = ('me/', 'changes/')
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, timeout=5, cwd=settings.BASE_DIR).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ''
+
+
+class _Silencioso(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede latência (p50/p95/p99), vazão, SQL e memória das rotas GET da API numa base de teste.\n"
+        "Measures latency (p50/p95/p99), throughput, SQL and memory of the API GET routes on a test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--estudantes', type=int, default=1000, help="Estudantes criados | Students created")
+        parser.add_argument('--cursos', type=int, default=20, help="Cursos criados | Courses created")
+        parser.add_argument('--professores', type=int, default=40, help="Professores criados | Teachers created")
+        parser.add_argument('--notas', type=int, default=2, help="Notas por matrícula | Grades per enrollment")
+        parser.add_argument('--modos', default='client,wsgi,asgi', help="client,wsgi,asgi")
+        parser.add_argument('--repeticoes', type=int, default=50, help="Requisições medidas por rota | Measured requests per route")
+        parser.add_argument('--aquecimento', type=int, default=5, help="Requisições descartadas | Discarded requests")
+        parser.add_argument('--concorrencia', type=int, default=1,
+                            help="Clientes simultâneos nos modos com servidor | Concurrent clients in server modes")
+        parser.add_argument('--filtro', default='', help="Só rotas que contêm o texto | Only routes containing the text")
+        parser.add_argument('--saida', help="Arquivo JSON de resultado | JSON result file")
+        parser.add_argument('--comparar', help="JSON de uma execução anterior | JSON from a previous run")
+        parser.add_argument('--tolerancia', type=float, default=20.0,
+                            help="Piora aceita no p50 (%%) | Accepted p50 slowdown (%%)")
+
+    # --- Dados | Data ---
+
+    def _popular(self, opcoes) -> dict:
+        aleatorio = random.Random(42)
+        niveis, periodos = 'BIA', 'MVN'
+        cursos = Curso.objects.bulk_create(
+            Curso(codigo=f'C{i:04d}', descricao=f'Curso {i}', nivel=niveis[i % 3]) for i in range(opcoes['cursos'])
+        )
+        professores = Professor.objects.bulk_create(
+            Professor(nome=f'Professor {i:04d}', email=f'p{i}@bench.pt', celular='351900000000')
+            for i in range(opcoes['professores'])
+        )
+        Ligacao = Professor.cursos.through
+        Ligacao.objects.bulk_create(
+            Ligacao(professor=p, curso=c)
+            for c in cursos for p in aleatorio.sample(professores, min(len(professores), 2))
+        )
+        estudantes = Estudante.objects.bulk_create(
+            Estudante(nome=f'Estudante {i:06d}', email=f'e{i}@bench.pt', cpf=f'{i:011d}',
+                      data_nascimento=date(1990 + i % 15, 1 + i % 12, 1 + i % 28), celular='351900000000')
+            for i in range(opcoes['estudantes'])
+        )
+        matriculas = Matricula.objects.bulk_create(
+            Matricula(estudante=e, curso=c, periodo=aleatorio.choice(periodos))
+            for e in estudantes for c in aleatorio.sample(cursos, min(len(cursos), aleatorio.randint(1, 3)))
+        )
+        inicio = date(2024, 1, 1)
+        notas = Nota.objects.bulk_create(
+            Nota(estudante_id=m.estudante_id, curso_id=m.curso_id, avaliacao=f'Prova {n + 1}',
+                 valor=Decimal(aleatorio.randint(0, 1000)) / 100, data=inicio + timedelta(days=aleatorio.randint(0, 364)))
+            for m in matriculas for n in range(opcoes['notas'])
+        )
+        # PT: bulk_create não dispara sinais: o feed de mudanças e os resumos são gravados à parte
+        # EN: bulk_create fires no signals: the change feed and the summaries are written separately
+        for objetos in (cursos, professores, estudantes, matriculas, notas):
+            alteracoes.registrar_lote(objetos, alteracoes.CRIACAO)
+        resumo.atualizar_resumos()
+        # PT: Perfis/tokens de outra base não podem vir do cache | EN: Profiles/tokens from another DB must not come from cache
+        perfil.invalidar_perfis()
+        authentication.invalidar_tudo()
+        return {'cursos': len(cursos), 'professores': len(professores), 'estudantes': len(estudantes),
+                'matriculas': len(matriculas), 'notas': len(notas)}
+
+    def _rotas(self) -> list[str]:
+        """PT: Listas e detalhes do router, listas aninhadas por pk e os extras.
+        EN: Router lists and details, nested per-pk lists and the extras.
+        """
+        from setup import urls
+
+        rotas = []
+        for prefixo, viewset, _ in urls.router.registry:
+            # PT: Viewsets sem `queryset` (ex.: tarefas, filtradas por usuário) e tabelas vazias ficam de fora
+            # EN: Viewsets without `queryset` (e.g. jobs, filtered per user) and empty tables are skipped
+            queryset = getattr(viewset, 'queryset', None)
+            if queryset is None:
+                continue
+            primeiro = queryset.model.objects.order_by('pk').values_list('pk', flat=True).first()
+            if primeiro is None:
+                continue
+            rotas += [f'/{prefixo}/', f'/{prefixo}/{primeiro}/']
+
+        # PT: O objeto "típico" é o do meio da tabela | EN: The "typical" object is the middle of the table
+        meio = {
+            'estudantes': Estudante.objects.order_by('pk').values_list('pk', flat=True)[Estudante.objects.count() // 2],
+            'cursos': Curso.objects.order_by('pk').values_list('pk', flat=True)[Curso.objects.count() // 2],
+        }
+        for padrao in urls.urlpatterns:
+            rota = str(padrao.pattern)
+            if not isinstance(padrao, URLPattern) or '<int:pk>' not in rota or rota.endswith('stream/'):
+                continue
+            prefixo = rota.split('/', 1)[0]
+            if prefixo in meio:
+                rotas.append('/' + rota.replace('<int:pk>', str(meio[prefixo])))
+        rotas += [f'/{extra}' for extra in EXTRAS]
+        return [r for r in rotas if self.filtro in r]
+
+    # --- Medição | Measurement ---
+
+    def _medir(self, pedir, opcoes, workers: int = 1) -> dict:
+        for _ in range(opcoes['aquecimento']):
+            pedir()
+        n, workers = opcoes['repeticoes'], max(1, workers)
+        tempos, erros = [], 0
+
+        def lote(quantidade):
+            locais, falhas = [], 0
+            for _ in range(quantidade):
+                inicio = time.perf_counter()
+                status, _ = pedir()
+                locais.append(time.perf_counter() - inicio)
+                falhas += status >= 400
+            return locais, falhas
+
+        inicio = time.perf_counter()
+        if workers == 1:
+            tempos, erros = lote(n)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                partes = [n // workers + (i < n % workers) for i in range(workers)]
+                for locais, falhas in pool.map(lote, partes):
+                    tempos += locais
+                    erros += falhas
+        decorrido = time.perf_counter() - inicio
+
+        tempos.sort()
+        return {
+            'requisicoes': len(tempos),
+            'erros': erros,
+            'rps': round(len(tempos) / decorrido, 1) if decorrido else 0,
+            'p50_ms': round(percentil(tempos, 50) * 1000, 2),
+            'p95_ms': round(percentil(tempos, 95) * 1000, 2),
+            'p99_ms': round(percentil(tempos, 99) * 1000, 2),
+            'media_ms': round(statistics.fmean(tempos) * 1000, 2),
+        }
+
+    def _modo_client(self, rotas, token, opcoes) -> list[dict]:
+        cliente = Client(HTTP_AUTHORIZATION=f'Token {token}')
+
+        def pedidor(rota):
+            def pedir():
+                resposta = cliente.get(rota)
+                return resposta.status_code, resposta.content
+            return pedir
+
+        resultados = []
+        for rota in rotas:
+            pedir = pedidor(rota)
+            medida = self._medir(pedir, opcoes)
+            with CaptureQueriesContext(connection) as consultas:
+                _, corpo = pedir()
+            # PT: Lido já: a próxima requisição zera o log de consultas | EN: Read now: the next request resets the query log
+            sql = len(consultas)
+            tracemalloc.start()
+            pedir()
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            resultados.append({'modo': 'client', 'rota': rota, **medida, 'sql': sql,
+                               'bytes': len(corpo), 'pico_kb': round(pico / 1024, 1)})
+        return resultados
+
+    def _modo_servidor(self, modo, base, rotas, token, opcoes) -> list[dict]:
+        def pedidor(rota):
+            pedido = urllib.request.Request(base + rota, headers={'Authorization': f'Token {token}'})
+
+            def pedir():
+                try:
+                    with urllib.request.urlopen(pedido, timeout=30) as resposta:
+                        return resposta.status, resposta.read()
+                except urllib.error.HTTPError as erro:
+                    return erro.code, b''
+            return pedir
+
+        return [{'modo': modo, 'rota': rota, **self._medir(pedidor(rota), opcoes, opcoes['concorrencia'])} for rota in rotas]
+
+    def _wsgi(self):
+        servidor = ThreadedWSGIServer(('127.0.0.1', 0), _Silencioso, allow_reuse_address=True)
+        servidor.set_app(get_wsgi_application())
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        return f'http://127.0.0.1:{servidor.server_port}', lambda: (servidor.shutdown(), servidor.server_close())
+
+    def _asgi(self):
+        from django.core.asgi import get_asgi_application
+
+        config = uvicorn.Config(get_asgi_application(), host='127.0.0.1', port=0, log_level='warning', lifespan='off')
+        servidor = uvicorn.Server(config)
+        threading.Thread(target=servidor.run, daemon=True).start()
+        while not servidor.started:
+            time.sleep(0.01)
+        porta = servidor.servers[0].sockets[0].getsockname()[1]
+        return f'http://127.0.0.1:{porta}', lambda: setattr(servidor, 'should_exit', True)
+
+    # --- Saída | Output ---
+
+    def _comparar(self, caminho, resultados, tolerancia) -> list[str]:
+        with open(caminho, encoding='utf-8') as arquivo:
+            anteriores = {(r['modo'], r['rota']): r for r in json.load(arquivo)['resultados']}
+        pioras = []
+        self.stdout.write(f"\n{'modo':<7}{'rota':<34}{'p50 antes':>11}{'p50 agora':>11}{'Δ%':>8}")
+        for r in resultados:
+            antes = anteriores.get((r['modo'], r['rota']))
+            if antes is None:
+                continue
+            delta = (r['p50_ms'] - antes['p50_ms']) / antes['p50_ms'] * 100 if antes['p50_ms'] else 0.0
+            self.stdout.write(f"{r['modo']:<7}{r['rota']:<34}{antes['p50_ms']:>11}{r['p50_ms']:>11}{delta:>+8.1f}")
+            if delta > tolerancia:
+                pioras.append(f"{r['modo']} {r['rota']}: p50 {antes['p50_ms']} → {r['p50_ms']} ms ({delta:+.1f}%)")
+            if 'sql' in r and 'sql' in antes and r['sql'] > antes['sql']:
+                pioras.append(f"{r['modo']} {r['rota']}: SQL {antes['sql']} → {r['sql']}")
+        return pioras
+
+    def handle(self, *args, **options):
+        modos = [m.strip() for m in options['modos'].split(',') if m.strip()]
+        desconhecidos = set(modos) - set(MODOS)
+        if desconhecidos:
+            raise CommandError(f"Modos inválidos: {', '.join(sorted(desconhecidos))} (use {', '.join(MODOS)}).")
+        if 'asgi' in modos and uvicorn is None:
+            self.stderr.write("uvicorn não instalado: modo asgi ignorado | uvicorn not installed: asgi mode skipped")
+            modos.remove('asgi')
+        self.filtro = options['filtro']
+
+        # PT: DEBUG desligado como em produção (e como no `manage.py test`) | EN: DEBUG off as in production (and `manage.py test`)
+        setup_test_environment(debug=False)
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        bancos = runner.setup_databases()
+        # PT: As views copiam `throttle_classes` ao serem definidas; desliga na classe base durante a medição
+        # EN: Views copy `throttle_classes` when defined; switch it off on the base class while measuring
+        limites, APIView.throttle_classes = APIView.throttle_classes, ()
+        try:
+            with override_settings(ALLOWED_HOSTS=['*']):
+                tamanho = self._popular(options)
+                usuario = get_user_model().objects.create_superuser('bench', 'bench@bench.pt', 'bench')
+                token = Token.objects.create(user=usuario).key
+                rotas = self._rotas()
+
+                resultados = []
+                for modo in modos:
+                    self.stderr.write(f"[{modo}] {len(rotas)} rotas…")
+                    if modo == 'client':
+                        resultados += self._modo_client(rotas, token, options)
+                        continue
+                    base, parar = self._wsgi() if modo == 'wsgi' else self._asgi()
+                    try:
+                        resultados += self._modo_servidor(modo, base, rotas, token, options)
+                    finally:
+                        parar()
+        finally:
+            APIView.throttle_classes = limites
+            runner.teardown_databases(bancos)
+            teardown_test_environment()
+
+        relatorio = {
+            'commit': _commit(),
+            'quando': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'banco': connection.vendor,
+            'tamanho': tamanho,
+            'parametros': {k: options[k] for k in ('repeticoes', 'aquecimento', 'concorrencia')},
+            # PT/EN: KB no Linux | KB on Linux
+            'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            'resultados': resultados,
+        }
+        if options['saida']:
+            with open(options['saida'], 'w', encoding='utf-8') as arquivo:
+                json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+
+        self.stdout.write(f"{'modo':<7}{'rota':<34}{'p50':>8}{'p95':>8}{'p99':>8}{'rps':>9}{'sql':>5}{'KB':>9}{'erros':>6}")
+        for r in resultados:
+            self.stdout.write(f"{r['modo']:<7}{r['rota']:<34}{r['p50_ms']:>8}{r['p95_ms']:>8}{r['p99_ms']:>8}"
+                              f"{r['rps']:>9}{r.get('sql', ''):>5}{r.get('pico_kb', ''):>9}{r['erros']:>6}")
+
+        if options['comparar']:
+            pioras = self._comparar(options['comparar'], resultados, options['tolerancia'])
+            if pioras:
+                raise CommandError('Regressões | Regressions:\n' + '\n'.join(pioras))
@@ -0,0 +1,82 @@
+"""
+PT: Benchmark de renderização: tamanho do payload e tempo de codificação de uma página de notas.
+EN: Rendering benchmark: payload size and encode time for a page of grades.
+"""
+
+import gzip
+import json
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from escola import renderers
+from escola.middleware import brotli
+
+
+def _linhas(n: int) -> list[dict]:
+    """PT: Linhas no mesmo formato do `NotaSerializer`. EN: Rows shaped like `NotaSerializer` output."""
+    random.seed(42)
+    inicio = date(2024, 1, 1)
+    avaliacoes = ['Prova 1', 'Prova 2', 'Trabalho', 'Projeto final']
+    return [
+        {
+            'id': i,
+            'estudante': 1 + i % 500,
+            'estudante_nome': f'Estudante {1 + i % 500:03d}',
+            'curso': 1 + i % 8,
+            'curso_codigo': ['PY101', 'DJ201', 'DB101', 'AI301', 'DS201', 'JS101', 'HT101', 'AL301'][i % 8],
+            'valor': f'{random.uniform(0, 10):.2f}',
+            'avaliacao': avaliacoes[i % len(avaliacoes)],
+            'data': (inicio + timedelta(days=i % 365)).isoformat(),
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara JSONRenderer do DRF, FastJSONRenderer (orjson) e o formato colunar: "
+        "tamanho bruto/gzip/br e tempo de codificação.\n"
+        "Compares DRF's JSONRenderer, FastJSONRenderer (orjson) and the columnar format."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--linhas', type=int, default=10000, help="Linhas por página | Rows per page")
+        parser.add_argument('--repeticoes', type=int, default=5, help="Repetições (mediana) | Repetitions (median)")
+        parser.add_argument('--json', action='store_true', help="Saída em JSON | JSON output")
+
+    def handle(self, *args, **options):
+        pagina = {'count': options['linhas'], 'next': None, 'previous': None, 'results': _linhas(options['linhas'])}
+        casos = [
+            ('drf-json', JSONRenderer()),
+            ('fast-json' + ('' if renderers.orjson else ' (sem orjson)'), renderers.FastJSONRenderer()),
+            ('columns', renderers.ColumnarJSONRenderer()),
+        ]
+
+        resultados = []
+        for nome, renderer in casos:
+            tempos = []
+            for _ in range(options['repeticoes']):
+                inicio = time.perf_counter()
+                corpo = renderer.render(pagina, renderer.media_type, {})
+                tempos.append(time.perf_counter() - inicio)
+            tempos.sort()
+            resultados.append({
+                'renderer': nome,
+                'ms': round(tempos[len(tempos) // 2] * 1000, 2),
+                'bytes': len(corpo),
+                'gzip': len(gzip.compress(corpo, compresslevel=6)),
+                'br': len(brotli.compress(corpo, quality=5)) if brotli else None,
+            })
+
+        if options['json']:
+            self.stdout.write(json.dumps(resultados, indent=2))
+            return
+        self.stdout.write(f"{options['linhas']} linhas / rows")
+        self.stdout.write(f"{'renderer':<24}{'ms':>9}{'bytes':>11}{'gzip':>10}{'br':>10}")
+        for r in resultados:
+            br = r['br'] if r['br'] is not None else '-'
+            self.stdout.write(f"{r['renderer']:<24}{r['ms']:>9}{r['bytes']:>11}{r['gzip']:>10}{br:>10}")
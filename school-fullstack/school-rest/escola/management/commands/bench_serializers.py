@@ -0,0 +1,111 @@
+"""
+PT: Microbenchmark: serializers do DRF × caminho rápido (`escola.leitura`) nas listas da API.
+- Cria os dados dentro de uma transação que é desfeita no final (a base não muda).
+- Confere que os dois caminhos geram exatamente os mesmos bytes de JSON.
+
+EN: Microbenchmark: DRF serializers vs the fast path (`escola.leitura`) on API lists.
+- Creates its data inside a transaction that is rolled back at the end (database unchanged).
+- Checks that both paths produce exactly the same JSON bytes.
+"""
+
+import json
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from escola.leitura import mapeador_para
+from escola.models import Curso, Estudante, Matricula, Nota
+from escola.projecao import projetar
+from escola.renderers import FastJSONRenderer
+from escola.serializers import (
+    EstudanteSerializer,
+    ListaMatriculasCursoSerializer,
+    ListaMatriculasEstudanteSerializer,
+    MatriculaSerializer,
+    NotaSerializer,
+)
+
+
+def _mediana(funcao, repeticoes: int):
+    tempos, resultado = [], None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    tempos.sort()
+    return tempos[len(tempos) // 2], resultado
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara serializers do DRF e mapeadores de values() (tempo e bytes idênticos).\n"
+        "Compares DRF serializers and values() mappers (time and identical bytes)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--linhas', type=int, default=5000, help="Notas/matrículas criadas | Rows created")
+        parser.add_argument('--repeticoes', type=int, default=5, help="Repetições (mediana) | Repetitions (median)")
+        parser.add_argument('--json', action='store_true', help="Saída em JSON | JSON output")
+
+    def _popular(self, n: int):
+        curso = Curso.objects.create(codigo='BENCH', descricao='Curso de benchmark', nivel='A')
+        estudantes = Estudante.objects.bulk_create(
+            Estudante(nome=f'Aluno {i:05d}', email=f'a{i}@bench.pt', cpf=f'{i:011d}',
+                      data_nascimento=date(2000, 1, 1), celular='351900000000')
+            for i in range(n)
+        )
+        Matricula.objects.bulk_create(Matricula(estudante=e, curso=curso, periodo='MVN'[i % 3])
+                                      for i, e in enumerate(estudantes))
+        inicio = date(2024, 1, 1)
+        Nota.objects.bulk_create(
+            Nota(estudante=e, curso=curso, valor=Decimal(i % 1000) / 100, avaliacao='Prova',
+                 data=inicio + timedelta(days=i % 365))
+            for i, e in enumerate(estudantes)
+        )
+        return curso, estudantes[0]
+
+    def handle(self, *args, **options):
+        renderer = FastJSONRenderer()
+        resultados = []
+        with transaction.atomic():
+            curso, estudante = self._popular(options['linhas'])
+            casos = [
+                ('ListaNotasCurso', NotaSerializer, Nota.objects.filter(curso=curso).order_by('-data', 'pk')),
+                ('ListaMatriculasCurso', ListaMatriculasCursoSerializer, Matricula.objects.filter(curso=curso).order_by('pk')),
+                ('ListaMatriculasEstudante', ListaMatriculasEstudanteSerializer,
+                 Matricula.objects.filter(curso=curso).order_by('pk')),
+                ('Matriculas', MatriculaSerializer, Matricula.objects.filter(curso=curso).order_by('pk')),
+                ('Estudantes', EstudanteSerializer, Estudante.objects.filter(matricula__curso=curso).order_by('pk')),
+            ]
+            for nome, classe, queryset in casos:
+                mapeador = mapeador_para(classe())
+                if mapeador is None:
+                    raise CommandError(f'{classe.__name__} não é compilável.')
+                lento, corpo_lento = _mediana(
+                    lambda: renderer.render(classe(projetar(queryset, classe()), many=True).data),
+                    options['repeticoes'])
+                rapido, corpo_rapido = _mediana(
+                    lambda: renderer.render(mapeador.lista(queryset.values(*mapeador.lookups))),
+                    options['repeticoes'])
+                resultados.append({
+                    'caso': nome,
+                    'linhas': queryset.count(),
+                    'drf_ms': round(lento * 1000, 2),
+                    'rapido_ms': round(rapido * 1000, 2),
+                    'ganho': round(lento / rapido, 1) if rapido else None,
+                    'identico': corpo_lento == corpo_rapido,
+                })
+            transaction.set_rollback(True)
+
+        if options['json']:
+            self.stdout.write(json.dumps(resultados, indent=2))
+        else:
+            self.stdout.write(f"{'caso':<26}{'linhas':>8}{'drf ms':>10}{'rápido ms':>11}{'ganho':>8}  idêntico")
+            for r in resultados:
+                self.stdout.write(f"{r['caso']:<26}{r['linhas']:>8}{r['drf_ms']:>10}{r['rapido_ms']:>11}"
+                                  f"{r['ganho']:>7}x  {'sim' if r['identico'] else 'NÃO'}")
+        if not all(r['identico'] for r in resultados):
+            raise CommandError('Saídas diferentes entre os caminhos | Outputs differ between paths')
@@ -0,0 +1,158 @@
+"""
+PT: Compara o SQLite no modo padrão do Django com o modo otimizado (WAL + pragmas de
+`SQLITE_PRAGMAS`) sob leituras e escritas simultâneas.
+- Cria um banco temporário com uma tabela no formato de `escola_nota`.
+- `--leitores` threads fazem a consulta de médias por curso sem parar, enquanto
+  `--escritores` threads lançam notas (uma transação por nota), por `--duracao` s.
+- Mostra leituras/s, escritas/s, p95 de cada lado e quantas operações falharam com
+  "database is locked".
+
+    python manage.py bench_sqlite --leitores 8 --escritores 2 --duracao 5
+
+EN: Compares SQLite in Django's default mode with the tuned mode (WAL + the
+`SQLITE_PRAGMAS` pragmas) under concurrent reads and writes.
+- Builds a temporary database with a table shaped like `escola_nota`.
+- `--leitores` threads run the per-course average query non-stop while
+  `--escritores` threads insert grades (one transaction per grade), for `--duracao` s.
+- Reports reads/s, writes/s, p95 on each side and how many operations failed with
+  "database is locked".
+"""
+
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from escola.medicao import percentil
+
+MODOS = {
+    # PT/EN: O que o Django faz sem OPTIONS | what Django does without OPTIONS
+    'padrao': {'init': '', 'begin': 'BEGIN'},
+    'otimizado': {'init': 'PRAGMA journal_mode=WAL;' + settings.SQLITE_PRAGMAS, 'begin': 'BEGIN IMMEDIATE'},
+}
+
+CONSULTA = 'SELECT curso_id, AVG(valor), COUNT(*) FROM nota WHERE curso_id = ? GROUP BY curso_id'
+INSERCAO = 'INSERT INTO nota (estudante_id, curso_id, avaliacao, valor) VALUES (?, ?, ?, ?)'
+
+
+def _conectar(caminho: str, init: str) -> sqlite3.Connection:
+    # PT/EN: Mesmo modo de transação do Django (isolation_level=None + BEGIN explícito)
+    conexao = sqlite3.connect(caminho, isolation_level=None, check_same_thread=False)
+    if init:
+        conexao.executescript(init)
+    return conexao
+
+
+def _preparar(caminho: str, linhas: int, cursos: int):
+    conexao = sqlite3.connect(caminho)
+    conexao.execute('CREATE TABLE nota (id INTEGER PRIMARY KEY, estudante_id INTEGER, curso_id INTEGER, '
+                    'avaliacao TEXT, valor REAL)')
+    conexao.execute('CREATE INDEX nota_curso ON nota (curso_id)')
+    aleatorio = random.Random(42)
+    conexao.executemany(INSERCAO, ((i % 5000, i % cursos, 'Prova 1', aleatorio.uniform(0, 10))
+                                   for i in range(linhas)))
+    conexao.commit()
+    conexao.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara o SQLite padrão × WAL + pragmas sob leituras e escritas simultâneas.\n"
+        "Compares default SQLite vs WAL + pragmas under concurrent reads and writes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--leitores', type=int, default=8, help="Threads de leitura | Reader threads")
+        parser.add_argument('--escritores', type=int, default=2, help="Threads de escrita | Writer threads")
+        parser.add_argument('--duracao', type=float, default=5.0, help="Segundos por modo | Seconds per mode")
+        parser.add_argument('--linhas', type=int, default=100_000, help="Notas iniciais | Initial grades")
+        parser.add_argument('--cursos', type=int, default=50)
+        parser.add_argument('--json', action='store_true', help="Saída em JSON | JSON output")
+
+    def _rodar(self, modo: str, opcoes) -> dict:
+        config = MODOS[modo]
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, 'bench.sqlite3')
+            _preparar(caminho, opcoes['linhas'], opcoes['cursos'])
+            parar = threading.Event()
+            leituras, escritas = [], []
+            travado = {'leitura': 0, 'escrita': 0}
+            trava = threading.Lock()
+
+            def leitor(semente):
+                conexao = _conectar(caminho, config['init'])
+                aleatorio, tempos = random.Random(semente), []
+                while not parar.is_set():
+                    inicio = time.perf_counter()
+                    try:
+                        conexao.execute(CONSULTA, (aleatorio.randrange(opcoes['cursos']),)).fetchall()
+                    except sqlite3.OperationalError:
+                        with trava:
+                            travado['leitura'] += 1
+                        continue
+                    tempos.append(time.perf_counter() - inicio)
+                conexao.close()
+                with trava:
+                    leituras.extend(tempos)
+
+            def escritor(semente):
+                conexao = _conectar(caminho, config['init'])
+                aleatorio, tempos = random.Random(semente), []
+                while not parar.is_set():
+                    inicio = time.perf_counter()
+                    try:
+                        conexao.execute(config['begin'])
+                        conexao.execute(CONSULTA, (aleatorio.randrange(opcoes['cursos']),)).fetchall()
+                        conexao.execute(INSERCAO, (aleatorio.randrange(5000), aleatorio.randrange(opcoes['cursos']),
+                                                   'Prova 2', aleatorio.uniform(0, 10)))
+                        conexao.execute('COMMIT')
+                    except sqlite3.OperationalError:
+                        if conexao.in_transaction:
+                            conexao.execute('ROLLBACK')
+                        with trava:
+                            travado['escrita'] += 1
+                        continue
+                    tempos.append(time.perf_counter() - inicio)
+                conexao.close()
+                with trava:
+                    escritas.extend(tempos)
+
+            threads = [threading.Thread(target=leitor, args=(i,)) for i in range(opcoes['leitores'])]
+            threads += [threading.Thread(target=escritor, args=(1000 + i,)) for i in range(opcoes['escritores'])]
+            for thread in threads:
+                thread.start()
+            time.sleep(opcoes['duracao'])
+            parar.set()
+            for thread in threads:
+                thread.join()
+
+        leituras.sort()
+        escritas.sort()
+        return {
+            'modo': modo,
+            'leituras_s': round(len(leituras) / opcoes['duracao'], 1),
+            'escritas_s': round(len(escritas) / opcoes['duracao'], 1),
+            'leitura_p95_ms': round(percentil(leituras, 95) * 1000, 3),
+            'escrita_p95_ms': round(percentil(escritas, 95) * 1000, 3),
+            'leituras_travadas': travado['leitura'],
+            'escritas_travadas': travado['escrita'],
+        }
+
+    def handle(self, *args, **options):
+        resultados = [self._rodar(modo, options) for modo in MODOS]
+        if options['json']:
+            self.stdout.write(json.dumps({'sqlite': sqlite3.sqlite_version, 'resultados': resultados}))
+            return
+        self.stdout.write(f"SQLite {sqlite3.sqlite_version}: {options['leitores']} leitores, "
+                          f"{options['escritores']} escritores, {options['duracao']} s por modo")
+        self.stdout.write(f"{'modo':<11}{'leit/s':>10}{'escr/s':>9}{'leit p95':>10}{'escr p95':>10}"
+                          f"{'travadas (l/e)':>16}")
+        for r in resultados:
+            self.stdout.write(f"{r['modo']:<11}{r['leituras_s']:>10}{r['escritas_s']:>9}{r['leitura_p95_ms']:>10}"
+                              f"{r['escrita_p95_ms']:>10}{r['leituras_travadas']:>9}/{r['escritas_travadas']}")
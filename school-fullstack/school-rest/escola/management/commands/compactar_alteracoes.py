@@ -0,0 +1,33 @@
+"""
+PT: Compacta o feed de mudanças: entre as entradas antigas, mantém só a última de cada objeto.
+EN: Compacts the change feed: among old entries, keeps only each object's latest one.
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from escola.alteracoes import compactar, substituidas
+from escola.models import Alteracao
+
+
+class Command(BaseCommand):
+    help = (
+        "Remove entradas de /changes/ mais velhas que --dias que já foram substituídas por outra do mesmo objeto.\n"
+        "Removes /changes/ entries older than --dias that were superseded by a newer one for the same object."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=30, help="Idade mínima em dias | Minimum age in days")
+        parser.add_argument('--dry-run', action='store_true', help="Só conta | Count only")
+
+    def handle(self, *args, **options):
+        antes = timezone.now() - timedelta(days=options['dias'])
+        if options['dry_run']:
+            total = substituidas(antes).count()
+            self.stdout.write(f"{total} entradas seriam removidas (dry-run).")
+            return
+        removidas = compactar(antes)
+        restantes = Alteracao.objects.count()
+        self.stdout.write(self.style.SUCCESS(f"{removidas} entradas removidas; {restantes} restantes."))
@@ -0,0 +1,87 @@
+"""
+PT: Mostra o perfil de conexão do banco em uso e mede o custo de reconectar.
+- Configuração efetiva: CONN_MAX_AGE, health checks, pool, cursores no servidor
+  e, no Postgres, `statement_timeout` e versão.
+- `SELECT 1` repetido reaproveitando a conexão × reconectando a cada vez
+  (o que acontece com CONN_MAX_AGE=0 e sem pool).
+- `--export`: percorre a exportação CSV de notas e mostra o pico de memória.
+
+Funciona igual contra um Postgres local (ex.: container) ou no SQLite padrão.
+
+EN: Shows the active database connection profile and measures the cost of reconnecting.
+- Effective settings: CONN_MAX_AGE, health checks, pool, server-side cursors and,
+  on Postgres, `statement_timeout` and version.
+- Repeated `SELECT 1` reusing the connection vs reconnecting every time
+  (what happens with CONN_MAX_AGE=0 and no pool).
+- `--export`: walks the grade CSV export and reports peak memory.
+
+Works the same against a local Postgres (e.g. a container) or the default SQLite.
+"""
+
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from escola.exportacao import COLUNAS_NOTAS, linhas_csv
+from escola.models import Nota
+
+
+def _selects(conexao, vezes: int, reconectar: bool) -> float:
+    inicio = time.perf_counter()
+    for _ in range(vezes):
+        if reconectar:
+            conexao.close()
+        with conexao.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+    return (time.perf_counter() - inicio) / vezes * 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Mostra o perfil de conexão do banco e mede reuso × reconexão (e, com --export, a memória da exportação).\n"
+        "Shows the database connection profile and measures reuse vs reconnect (and, with --export, export memory)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help="Alias do banco | Database alias")
+        parser.add_argument('--consultas', type=int, default=200, help="SELECT 1 por caso | SELECT 1 per case")
+        parser.add_argument('--export', action='store_true', help="Mede a exportação CSV de notas | Measure the grade CSV export")
+
+    def handle(self, *args, **options):
+        conexao = connections[options['database']]
+        config = conexao.settings_dict
+        self.stdout.write(f"banco:               {conexao.vendor} ({config['NAME']})")
+        self.stdout.write(f"CONN_MAX_AGE:        {config.get('CONN_MAX_AGE')}")
+        self.stdout.write(f"CONN_HEALTH_CHECKS:  {config.get('CONN_HEALTH_CHECKS')}")
+        self.stdout.write(f"pool:                {config.get('OPTIONS', {}).get('pool') or '-'}")
+        self.stdout.write(f"cursores no servidor: {'não' if config.get('DISABLE_SERVER_SIDE_CURSORS') else 'sim'}"
+                          f"{'' if conexao.vendor == 'postgresql' else ' (só no Postgres)'}")
+        if conexao.vendor == 'postgresql':
+            with conexao.cursor() as cursor:
+                cursor.execute('SHOW statement_timeout')
+                self.stdout.write(f"statement_timeout:   {cursor.fetchone()[0]}")
+                cursor.execute('SHOW server_version')
+                self.stdout.write(f"versão:              {cursor.fetchone()[0]}")
+
+        vezes = options['consultas']
+        reuso = _selects(conexao, vezes, reconectar=False)
+        reconexao = _selects(conexao, vezes, reconectar=True)
+        self.stdout.write(f"\nSELECT 1 reaproveitando a conexão: {reuso:.3f} ms")
+        self.stdout.write(f"SELECT 1 reconectando:             {reconexao:.3f} ms ({reconexao / reuso:.0f}x)")
+
+        if options['export']:
+            queryset = Nota.objects.using(options['database']).order_by('pk')
+            tracemalloc.start()
+            inicio = time.perf_counter()
+            linhas = total = 0
+            for pedaco in linhas_csv(queryset, COLUNAS_NOTAS):
+                linhas += 1
+                total += len(pedaco)
+            decorrido = time.perf_counter() - inicio
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self.stdout.write(f"\nexportação: {linhas - 1} notas, {total / 1024:.0f} KB em {decorrido:.2f} s, "
+                              f"pico de memória {pico / 1024:.0f} KB")
@@ -0,0 +1,46 @@
+"""
+PT: Mostra a eficácia do cache de autenticação por token (acertos, falhas, consultas evitadas).
+EN: Shows how effective the token authentication cache is (hits, misses, avoided queries).
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from escola import authentication
+
+
+class Command(BaseCommand):
+    help = (
+        "Mostra acertos/falhas do cache de tokens e as consultas evitadas "
+        "(só contam com ESCOLA_AUTH_ESTATISTICAS=True no servidor).\n"
+        "Shows token cache hits/misses and avoided queries (counted only with ESCOLA_AUTH_ESTATISTICAS=True)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--zerar', action='store_true',
+                            help="Zera os contadores depois de exibir | Reset counters after printing")
+        parser.add_argument('--invalidar', action='store_true',
+                            help="Invalida todos os tokens em cache | Invalidate every cached token")
+
+    def handle(self, *args, **options):
+        if not settings.ESCOLA_AUTH_ESTATISTICAS:
+            self.stdout.write(self.style.WARNING(
+                "ESCOLA_AUTH_ESTATISTICAS está desligada: os contadores não avançam | counters are off"))
+        dados = authentication.estatisticas()
+        total = dados['acertos'] + dados['falhas']
+        taxa = (dados['acertos'] / total * 100) if total else 0.0
+        self.stdout.write(f"Acertos / hits: {dados['acertos']}")
+        self.stdout.write(f"Falhas / misses: {dados['falhas']}")
+        self.stdout.write(f"Taxa de acerto / hit rate: {taxa:.1f}%")
+        self.stdout.write(
+            f"Consultas evitadas / queries saved: "
+            f"{dados['consultas_evitadas_min']}–{dados['consultas_evitadas_max']}"
+        )
+
+        if options['zerar']:
+            cache.delete_many([authentication.CHAVE_ACERTOS, authentication.CHAVE_FALHAS])
+            self.stdout.write("Contadores zerados.")
+        if options['invalidar']:
+            authentication.invalidar_tudo()
+            self.stdout.write(self.style.SUCCESS("Cache de tokens invalidado."))
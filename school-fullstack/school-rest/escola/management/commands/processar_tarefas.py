@@ -0,0 +1,85 @@
+"""
+PT: Trabalhadores da fila de tarefas (`escola.tarefas`): um processo por núcleo por padrão.
+EN: Job queue workers (`escola.tarefas`): one process per core by default.
+"""
+
+import multiprocessing
+import os
+import signal
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+
+# PT: `escola.tarefas` só é importado depois do django.setup() de cada processo (ver `_processo`)
+# EN: `escola.tarefas` is only imported after each process's django.setup() (see `_processo`)
+
+
+def _parar_com_sinais() -> threading.Event:
+    """PT: SIGINT/SIGTERM terminam a tarefa atual e saem. EN: SIGINT/SIGTERM finish the current job and exit."""
+    parar = threading.Event()
+    for sinal in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sinal, lambda *_: parar.set())
+    return parar
+
+
+def _relatar(tarefa, segundos):
+    print(f"[{os.getpid()}] #{tarefa.pk} {tarefa.tipo}: {tarefa.get_estado_display()} em {segundos:.2f} s", flush=True)
+
+
+def _processo(tipos, ate_esvaziar):
+    import django
+    django.setup()
+    from escola import tarefas
+    tarefas.trabalhar(tipos, _parar_com_sinais(), ate_esvaziar, ao_terminar=_relatar)
+
+
+class Command(BaseCommand):
+    help = (
+        "Executa as tarefas em segundo plano (POST /tarefas/) com --processos trabalhadores.\n"
+        "Runs background jobs (POST /tarefas/) with --processos workers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processos', type=int, default=os.cpu_count() or 1,
+                            help="Processos trabalhadores (padrão: núcleos) | Worker processes (default: cores)")
+        parser.add_argument('--tipos', help="Só estes tipos, separados por vírgula | Only these types, comma-separated")
+        parser.add_argument('--ate-esvaziar', action='store_true',
+                            help="Sai quando não houver tarefa pronta (cron/testes) | Exit when no job is ready (cron/tests)")
+
+    def handle(self, *args, **options):
+        from escola import tarefas
+
+        tipos = [t.strip() for t in (options['tipos'] or '').split(',') if t.strip()] or None
+        desconhecidos = set(tipos or ()) - set(tarefas.TIPOS)
+        if desconhecidos:
+            raise CommandError(f"Tipos desconhecidos: {', '.join(sorted(desconhecidos))}. "
+                               f"Disponíveis: {', '.join(sorted(tarefas.TIPOS))}.")
+        processos = max(1, options['processos'])
+        self.stdout.write(f"{processos} trabalhador(es); tipos: {', '.join(tipos or sorted(tarefas.TIPOS))}.")
+
+        if processos == 1:
+            total = tarefas.trabalhar(tipos, _parar_com_sinais(), options['ate_esvaziar'], ao_terminar=_relatar)
+            self.stdout.write(self.style.SUCCESS(f"{total} tarefa(s) executada(s)."))
+            return
+
+        # PT: spawn em todo SO: cada processo abre as próprias conexões (nada herdado de um fork)
+        # EN: spawn on every OS: each process opens its own connections (nothing inherited from a fork)
+        contexto = multiprocessing.get_context('spawn')
+        filhos = [contexto.Process(target=_processo, args=(tipos, options['ate_esvaziar']), name=f'tarefas-{n}')
+                  for n in range(processos)]
+        for filho in filhos:
+            filho.start()
+
+        def repassar(*_):
+            for filho in filhos:
+                if filho.is_alive():
+                    os.kill(filho.pid, signal.SIGTERM)
+        for sinal in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sinal, repassar)
+
+        for filho in filhos:
+            filho.join()
+        falhos = [filho.name for filho in filhos if filho.exitcode]
+        if falhos:
+            raise CommandError(f"Trabalhadores terminaram com erro: {', '.join(falhos)}.")
+        self.stdout.write(self.style.SUCCESS("Trabalhadores encerrados."))
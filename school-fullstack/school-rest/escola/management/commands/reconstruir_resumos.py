@@ -0,0 +1,26 @@
+"""
+PT: Recalcula os resumos materializados dos cursos (`/cursos/{pk}/resumo/`).
+EN: Rebuilds the materialized course summaries (`/cursos/{pk}/resumo/`).
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from escola.resumo import atualizar_resumos
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula os resumos de todos os cursos (ou só de --curso), ex.: depois de cargas em massa.\n"
+        "Rebuilds the summaries of every course (or just --curso), e.g. after bulk loads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--curso', type=int, action='append', help="Só este curso (pode repetir) | Only this course (repeatable)")
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        total = atualizar_resumos(options['curso'])
+        decorrido = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(f"{total} resumos recalculados em {decorrido:.2f} s."))
@@ -8,6 +8,7 @@ from datetime import date
 
 from django.core.management.base import BaseCommand
 
+from escola import matriculas
 from escola.models import Estudante, Curso, Matricula, Professor, Nota
 
 
@@ -65,19 +66,14 @@ class Command(BaseCommand):
             )
             estudantes.append(est)
 
-        # Matrículas (1-3 cursos por estudante)
+        # Matrículas (1-3 cursos por estudante), num upsert só; as existentes ficam como estão
         periodos = ['M', 'V', 'N']
-        created = 0
-        for est in estudantes:
-            qtd = random.randint(1, 3)
-            cursos_escolhidos = random.sample(curso_objs, qtd)
-            for c in cursos_escolhidos:
-                Matricula.objects.get_or_create(
-                    estudante=est,
-                    curso=c,
-                    defaults={'periodo': random.choice(periodos)}
-                )
-                created += 1
+        novas = [
+            Matricula(estudante=est, curso=c, periodo=random.choice(periodos))
+            for est in estudantes
+            for c in random.sample(curso_objs, random.randint(1, 3))
+        ]
+        matriculas.upsert(novas, atualizar_periodo=False)
 
         # Professores
         prof_nomes = [
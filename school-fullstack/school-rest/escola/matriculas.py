@@ -0,0 +1,70 @@
+"""
+PT: Upsert idempotente de matrículas (`POST /matriculas/upsert/` e `seed_escola`).
+- Uma consulta descobre quais pares (estudante, curso) já existem; os novos e os
+  que mudaram de período vão num único `INSERT ... ON CONFLICT (estudante_id,
+  curso_id) DO UPDATE`, e os iguais não geram escrita nenhuma. Repetir o mesmo
+  pedido não muda nada.
+- Pares repetidos no mesmo pedido: vale o último.
+- `bulk_create` não dispara sinais, então o feed `/changes/`, os resumos dos
+  cursos e os perfis dos estudantes são atualizados aqui.
+
+EN: Idempotent enrollment upsert (`POST /matriculas/upsert/` and `seed_escola`).
+- One query finds which (student, course) pairs already exist; new ones and those
+  whose period changed go into a single `INSERT ... ON CONFLICT (estudante_id,
+  curso_id) DO UPDATE`, and unchanged ones cause no write at all. Repeating the
+  same request changes nothing.
+- Pairs repeated in one request: the last one wins.
+- `bulk_create` fires no signals, so the `/changes/` feed, course summaries and
+  student profiles are updated here.
+"""
+
+from django.db import transaction
+
+from escola import alteracoes, resumo
+from escola.models import Matricula
+from escola.perfil import invalidar_perfil
+
+
+def upsert(novas, atualizar_periodo: bool = True) -> dict:
+    """PT: Grava as matrículas (não salvas) de `novas`. Com `atualizar_periodo=False`
+    as existentes ficam como estão (como um `get_or_create`).
+    EN: Stores the (unsaved) enrollments in `novas`. With `atualizar_periodo=False`
+    existing ones are left alone (like `get_or_create`).
+
+    Returns:
+        dict: listas `criadas`, `atualizadas` e `inalteradas` | `criadas`,
+        `atualizadas` and `inalteradas` lists (Matricula instances with pk).
+    """
+    por_par = {(m.estudante_id, m.curso_id): m for m in novas}
+    existentes = {
+        (estudante_id, curso_id): (pk, periodo)
+        for pk, estudante_id, curso_id, periodo in Matricula.objects.filter(
+            estudante_id__in={e for e, _ in por_par}, curso_id__in={c for _, c in por_par},
+        ).values_list('pk', 'estudante_id', 'curso_id', 'periodo')
+    }
+
+    criadas, atualizadas, inalteradas = [], [], []
+    for par, matricula in por_par.items():
+        atual = existentes.get(par)
+        if atual is None:
+            criadas.append(matricula)
+        elif atualizar_periodo and atual[1] != matricula.periodo:
+            atualizadas.append(matricula)
+        else:
+            matricula.pk, matricula.periodo = atual
+            inalteradas.append(matricula)
+
+    gravar = criadas + atualizadas
+    if gravar:
+        with transaction.atomic():
+            alteracoes.reservar_ordem()
+            # PT: O ON CONFLICT cobre quem inseriu o mesmo par entre a consulta e aqui
+            # EN: ON CONFLICT covers anyone who inserted the same pair between the query and here
+            Matricula.objects.bulk_create(gravar, update_conflicts=True, unique_fields=['estudante', 'curso'],
+                                          update_fields=['periodo'])
+            alteracoes.registrar_lote(criadas, alteracoes.CRIACAO)
+            alteracoes.registrar_lote(atualizadas, alteracoes.ALTERACAO)
+            resumo.agendar(*{m.curso_id for m in gravar})
+        for estudante_id in {m.estudante_id for m in gravar}:
+            invalidar_perfil(estudante_id)
+    return {'criadas': criadas, 'atualizadas': atualizadas, 'inalteradas': inalteradas}
@@ -0,0 +1,70 @@
+"""
+PT: Middleware de compressão da API escola.
+- Negocia Brotli (quando o pacote `brotli` está instalado) ou GZip via `Accept-Encoding`.
+- Só comprime respostas a partir de `ESCOLA_COMPRESSAO_MIN_BYTES` (listas grandes);
+  respostas pequenas não compensam o custo de CPU.
+- Streams de eventos (`text/event-stream`) nunca são comprimidos.
+
+EN: Compression middleware for the escola API.
+- Negotiates Brotli (when the `brotli` package is installed) or GZip via `Accept-Encoding`.
+- Only compresses responses of at least `ESCOLA_COMPRESSAO_MIN_BYTES` (large lists);
+  small responses are not worth the CPU cost.
+- Event streams (`text/event-stream`) are never compressed.
+"""
+
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli  # type: ignore
+except Exception:  # PT/EN: Modo degradado quando brotli não está instalado
+    brotli = None
+
+
+def aceita(accept_encoding: str, codificacao: str) -> bool:
+    """PT: Indica se `codificacao` está em `Accept-Encoding` com q > 0.
+    EN: Whether `codificacao` appears in `Accept-Encoding` with q > 0.
+    """
+    for parte in accept_encoding.split(','):
+        nome, _, params = parte.strip().partition(';')
+        if nome.strip().lower() != codificacao:
+            continue
+        params = params.replace(' ', '')
+        if params.startswith('q='):
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+class CompressaoMiddleware(GZipMiddleware):
+    """PT: `GZipMiddleware` com limite de tamanho e preferência por Brotli.
+    EN: `GZipMiddleware` with a size threshold and a preference for Brotli.
+    """
+
+    def process_response(self, request, response):
+        if response.get('Content-Type', '').startswith('text/event-stream'):
+            return response
+        if not response.streaming and len(response.content) < settings.ESCOLA_COMPRESSAO_MIN_BYTES:
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+
+        ae = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if brotli is None or response.streaming or not aceita(ae, 'br'):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        comprimido = brotli.compress(response.content, quality=settings.ESCOLA_BROTLI_QUALIDADE)
+        if len(comprimido) >= len(response.content):
+            return response
+        response.content = comprimido
+        response.headers['Content-Length'] = str(len(comprimido))
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-19 00:26
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('escola', '0003_professor_nota'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Alteracao',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False)),
+                ('modelo', models.CharField(max_length=30)),
+                ('objeto_id', models.BigIntegerField()),
+                ('operacao', models.CharField(choices=[('C', 'criação'), ('U', 'alteração'), ('D', 'exclusão')], max_length=1)),
+                ('dados', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('criado_em', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['modelo', 'objeto_id'], name='escola_alte_modelo_386b6f_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-19 00:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('escola', '0004_alteracao'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumoCurso',
+            fields=[
+                ('curso', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='resumo', serialize=False, to='escola.curso')),
+                ('total_matriculas', models.PositiveIntegerField(default=0)),
+                ('matriculas_matutino', models.PositiveIntegerField(default=0)),
+                ('matriculas_vespertino', models.PositiveIntegerField(default=0)),
+                ('matriculas_noturno', models.PositiveIntegerField(default=0)),
+                ('professores', models.JSONField(default=list)),
+                ('total_notas', models.PositiveIntegerField(default=0)),
+                ('media', models.DecimalField(decimal_places=2, max_digits=5, null=True)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
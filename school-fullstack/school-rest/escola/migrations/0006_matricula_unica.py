@@ -0,0 +1,61 @@
+"""
+PT: Uma matrícula por (estudante, curso).
+- Mescla as duplicadas: fica a mais antiga (menor id) com o período da mais
+  recente; as demais são apagadas e as mudanças entram no feed `/changes/`.
+- Cria a restrição única, cujo índice (estudante_id, curso_id) também responde
+  à verificação de matrícula do `NotaSerializer` sem ler a tabela.
+
+EN: One enrollment per (student, course).
+- Merges duplicates: the oldest one (lowest id) stays with the newest one's
+  period; the others are deleted and the changes go into the `/changes/` feed.
+- Adds the unique constraint, whose (estudante_id, curso_id) index also answers
+  `NotaSerializer`'s enrollment check without reading the table.
+"""
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def _dados(matricula) -> dict:
+    return {'id': matricula.pk, 'estudante_id': matricula.estudante_id,
+            'curso_id': matricula.curso_id, 'periodo': matricula.periodo}
+
+
+def mesclar_duplicadas(apps, schema_editor):
+    Matricula = apps.get_model('escola', 'Matricula')
+    Alteracao = apps.get_model('escola', 'Alteracao')
+    banco = schema_editor.connection.alias
+    grupos = (Matricula.objects.using(banco).values('estudante_id', 'curso_id')
+              .annotate(total=Count('id')).filter(total__gt=1).order_by())
+
+    alteracoes, excluir = [], []
+    for grupo in grupos:
+        linhas = list(Matricula.objects.using(banco)
+                      .filter(estudante_id=grupo['estudante_id'], curso_id=grupo['curso_id']).order_by('id'))
+        mantida, mais_recente = linhas[0], linhas[-1]
+        if mantida.periodo != mais_recente.periodo:
+            mantida.periodo = mais_recente.periodo
+            mantida.save(update_fields=['periodo'])
+            alteracoes.append(Alteracao(modelo='matricula', objeto_id=mantida.pk, operacao='U', dados=_dados(mantida)))
+        for duplicada in linhas[1:]:
+            excluir.append(duplicada.pk)
+            alteracoes.append(Alteracao(modelo='matricula', objeto_id=duplicada.pk, operacao='D',
+                                        dados=_dados(duplicada)))
+
+    Matricula.objects.using(banco).filter(pk__in=excluir).delete()
+    Alteracao.objects.using(banco).bulk_create(alteracoes)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('escola', '0005_resumocurso'),
+    ]
+
+    operations = [
+        migrations.RunPython(mesclar_duplicadas, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='matricula',
+            constraint=models.UniqueConstraint(fields=('estudante', 'curso'), name='matricula_estudante_curso_unica'),
+        ),
+    ]
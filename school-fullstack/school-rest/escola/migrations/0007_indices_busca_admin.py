@@ -0,0 +1,46 @@
+"""
+PT: Índices para a busca do admin: nome de estudante/professor (prefixo; no Postgres
+o Django cria também o índice `varchar_pattern_ops` usado pelo LIKE 'x%'), email e
+cpf de estudante e código de curso.
+
+EN: Indexes for the admin search: student/teacher name (prefix; on Postgres Django
+also creates the `varchar_pattern_ops` index used by LIKE 'x%'), student email and
+cpf, and course code.
+"""
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('escola', '0006_matricula_unica'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='curso',
+            name='codigo',
+            field=models.CharField(db_index=True, max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='estudante',
+            name='cpf',
+            field=models.CharField(db_index=True, max_length=11),
+        ),
+        migrations.AlterField(
+            model_name='estudante',
+            name='email',
+            field=models.EmailField(db_index=True, max_length=30),
+        ),
+        migrations.AlterField(
+            model_name='estudante',
+            name='nome',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='professor',
+            name='nome',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+    ]
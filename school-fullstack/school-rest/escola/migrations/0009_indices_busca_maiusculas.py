@@ -0,0 +1,52 @@
+"""
+PT: Índices funcionais para a busca do admin sem diferenciar maiúsculas (só Postgres).
+- `istartswith` e `iexact` viram `UPPER(coluna::text) LIKE UPPER('x%')` e
+  `UPPER(coluna::text) = UPPER('x')`; os índices de 0007 sobre a coluna pura não
+  servem a essas expressões.
+- `UPPER(nome)` e `UPPER(codigo)` com `text_pattern_ops` respondem ao prefixo;
+  `UPPER(email)` responde à igualdade.
+- Em outros bancos não faz nada (o SQLite não indexa esses LIKE de qualquer forma).
+
+EN: Functional indexes for the case-insensitive admin search (Postgres only).
+- `istartswith` and `iexact` become `UPPER(column::text) LIKE UPPER('x%')` and
+  `UPPER(column::text) = UPPER('x')`; 0007's indexes on the bare column do not
+  serve those expressions.
+- `UPPER(nome)` and `UPPER(codigo)` with `text_pattern_ops` answer the prefix;
+  `UPPER(email)` answers the equality.
+- Other databases are left alone (SQLite does not index those LIKEs anyway).
+"""
+
+from django.db import migrations
+
+# PT/EN: (nome do índice | index name, tabela | table, expressão | expression)
+INDICES = (
+    ('escola_estudante_nome_upper', 'escola_estudante', 'UPPER("nome") text_pattern_ops'),
+    ('escola_estudante_email_upper', 'escola_estudante', 'UPPER("email")'),
+    ('escola_professor_nome_upper', 'escola_professor', 'UPPER("nome") text_pattern_ops'),
+    ('escola_curso_codigo_upper', 'escola_curso', 'UPPER("codigo") text_pattern_ops'),
+)
+
+
+def criar_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for nome, tabela, expressao in INDICES:
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS "{nome}" ON "{tabela}" ({expressao})')
+
+
+def remover_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for nome, _, _ in INDICES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{nome}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('escola', '0008_tarefa'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indices, remover_indices),
+    ]
@@ -3,21 +3,30 @@ PT: Modelos de domínio da aplicação escola.
 - Estudante: dados pessoais e contato.
 - Curso: informações e nível.
 - Matricula: vínculo entre estudante e curso com período.
+- Alteracao: registro de mudanças (feed incremental em `/changes/`).
+- Tarefa: trabalho em segundo plano (fila em `escola.tarefas`, status em `/tarefas/`).
 
 EN: Domain models for the escola app.
 - Estudante (Student): personal and contact data.
 - Curso (Course): information and level.
 - Matricula (Enrollment): relation between student and course with period.
+- Alteracao (Change): change log (incremental feed at `/changes/`).
+- Tarefa (Job): background work (queue in `escola.tarefas`, status at `/tarefas/`).
 """
 
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.utils import timezone
 
 
 class Estudante(models.Model):
     """PT: Representa um estudante. EN: Represents a student."""
-    nome = models.CharField(max_length=100)
-    email = models.EmailField(max_length=30,blank=False)
-    cpf = models.CharField(max_length=11)
+    # PT: Índices para a busca do admin (nome por prefixo, email e cpf exatos)
+    # EN: Indexes for the admin search (name by prefix, exact email and cpf)
+    nome = models.CharField(max_length=100, db_index=True)
+    email = models.EmailField(max_length=30,blank=False, db_index=True)
+    cpf = models.CharField(max_length=11, db_index=True)
     data_nascimento = models.DateField()
     celular = models.CharField(max_length=15)
 
@@ -28,7 +37,7 @@ class Curso(models.Model):
     """PT: Representa um curso. EN: Represents a course."""
     # PT: Níveis possíveis do curso | EN: Course level choices
     NIVEL = (('B','básico'), ('I','intermediário'), ('A','avançado'))
-    codigo = models.CharField(max_length=10)
+    codigo = models.CharField(max_length=10, db_index=True)
     descricao = models.CharField(max_length=100, blank=False)
     nivel = models.CharField(max_length=1, choices=NIVEL, default='B')
 
@@ -47,6 +56,13 @@ class Matricula(models.Model):
     estudante = models.ForeignKey(Estudante, on_delete=models.CASCADE)
     curso = models.ForeignKey(Curso, on_delete=models.CASCADE)
     periodo = models.CharField(max_length=1, choices=PERIODO, default='M')
+
+    class Meta:
+        # PT: Uma matrícula por estudante e curso; o índice também serve às buscas por (estudante, curso)
+        # EN: One enrollment per student and course; the index also serves (student, course) lookups
+        constraints = [
+            models.UniqueConstraint(fields=('estudante', 'curso'), name='matricula_estudante_curso_unica'),
+        ]
     
     def __str__(self):
             return f'{self.estudante.nome} - {self.curso.codigo}'
@@ -54,7 +70,7 @@ class Matricula(models.Model):
 
 class Professor(models.Model):
     """PT: Representa um professor. EN: Represents a teacher."""
-    nome = models.CharField(max_length=100)
+    nome = models.CharField(max_length=100, db_index=True)
     email = models.EmailField(max_length=60, blank=False)
     celular = models.CharField(max_length=15, blank=True)
 
@@ -80,3 +96,102 @@ class Nota(models.Model):
 
     def __str__(self):
         return f'{self.estudante.nome} / {self.curso.codigo} = {self.valor}'
+
+
+class ResumoCurso(models.Model):
+    """PT: Resumo materializado de um curso (`/cursos/{pk}/resumo/`).
+
+    Matrículas por período, professores e média das notas, recalculados só para o
+    curso afetado quando uma matrícula, nota ou professor muda (ver `escola.resumo`).
+
+    EN: Materialized course summary (`/cursos/{pk}/resumo/`).
+
+    Enrollments per period, teachers and grade average, recomputed only for the
+    affected course when an enrollment, grade or teacher changes (see `escola.resumo`).
+    """
+    curso = models.OneToOneField(Curso, on_delete=models.CASCADE, primary_key=True, related_name='resumo')
+    total_matriculas = models.PositiveIntegerField(default=0)
+    matriculas_matutino = models.PositiveIntegerField(default=0)
+    matriculas_vespertino = models.PositiveIntegerField(default=0)
+    matriculas_noturno = models.PositiveIntegerField(default=0)
+    # PT: [{"id": ..., "nome": ...}] em ordem de nome | EN: [{"id": ..., "nome": ...}] ordered by name
+    professores = models.JSONField(default=list)
+    total_notas = models.PositiveIntegerField(default=0)
+    media = models.DecimalField(max_digits=5, decimal_places=2, null=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'Resumo {self.curso_id}'
+
+
+class Alteracao(models.Model):
+    """PT: Registro de inclusão/alteração/exclusão de um objeto da escola.
+
+    `seq` cresce sempre (AUTOINCREMENT/identity, nunca reaproveitado) e fica
+    visível na ordem (`escola.alteracoes.reservar_ordem`), então quem espelha os
+    dados guarda o último `seq` visto e pede só o que veio depois.
+    `dados` guarda as colunas do objeto no momento da mudança (nas exclusões, o
+    último estado conhecido).
+
+    EN: Insert/update/delete record for an escola object.
+
+    `seq` always grows (AUTOINCREMENT/identity, never reused) and becomes visible
+    in order (`escola.alteracoes.reservar_ordem`), so mirrors keep the last `seq`
+    they saw and ask only for what came after it. `dados` holds the
+    object's columns at change time (for deletes, the last known state).
+    """
+    OPERACAO = (('C', 'criação'), ('U', 'alteração'), ('D', 'exclusão'))
+
+    seq = models.BigAutoField(primary_key=True)
+    modelo = models.CharField(max_length=30)
+    objeto_id = models.BigIntegerField()
+    operacao = models.CharField(max_length=1, choices=OPERACAO)
+    dados = models.JSONField(encoder=DjangoJSONEncoder)
+    criado_em = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['modelo', 'objeto_id'])]
+
+    def __str__(self):
+        return f'#{self.seq} {self.operacao} {self.modelo}:{self.objeto_id}'
+
+
+class Tarefa(models.Model):
+    """PT: Trabalho em segundo plano executado por `python manage.py processar_tarefas`.
+
+    Fica `P` até um trabalhador reservá-la (`E`, com `expira_em` renovado enquanto
+    roda); termina `C` com `resultado` ou, esgotadas as `max_tentativas`, `F` com o
+    último `erro`. Entre tentativas volta a `P` com `executar_em` no futuro (backoff).
+
+    EN: Background job run by `python manage.py processar_tarefas`.
+
+    Stays `P` until a worker claims it (`E`, with `expira_em` renewed while it
+    runs); ends `C` with `resultado` or, once `max_tentativas` are used up, `F`
+    with the last `erro`. Between attempts it goes back to `P` with a future
+    `executar_em` (backoff).
+    """
+    ESTADO = (('P', 'pendente'), ('E', 'executando'), ('C', 'concluída'), ('F', 'falhou'), ('X', 'cancelada'))
+
+    tipo = models.CharField(max_length=50)
+    parametros = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    estado = models.CharField(max_length=1, choices=ESTADO, default='P')
+    tentativas = models.PositiveIntegerField(default=0)
+    max_tentativas = models.PositiveIntegerField(default=3)
+    executar_em = models.DateTimeField(default=timezone.now)
+    resultado = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    erro = models.TextField(blank=True)
+    criado_por = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+                                   related_name='tarefas')
+    trabalhador = models.CharField(max_length=100, blank=True)
+    expira_em = models.DateTimeField(null=True, blank=True)
+    criada_em = models.DateTimeField(auto_now_add=True)
+    iniciada_em = models.DateTimeField(null=True, blank=True)
+    concluida_em = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        # PT: Reserva (pendentes por horário) e limites por tipo (executando por tipo)
+        # EN: Claiming (pending by time) and per-type limits (running by type)
+        indexes = [models.Index(fields=['estado', 'executar_em']), models.Index(fields=['estado', 'tipo'])]
+
+    def __str__(self):
+        return f'#{self.pk} {self.tipo} ({self.get_estado_display()})'
@@ -0,0 +1,57 @@
+"""
+PT: Paginador com contagem estimada para tabelas grandes (changelists do admin).
+- Sem filtro, a contagem vem das estatísticas do banco (`pg_class.reltuples` no
+  Postgres, `MAX(rowid)` no SQLite) em vez de um `COUNT(*)` que lê a tabela
+  inteira; abaixo de `ESCOLA_ADMIN_CONTAGEM_EXATA` linhas conta de verdade.
+- Com filtro ou busca, conta no máximo `ESCOLA_ADMIN_CONTAGEM_EXATA` + 1 linhas
+  (`COUNT(*)` sobre um `LIMIT`): além disso a lista mostra só as primeiras páginas.
+- O total pode ficar um pouco diferente do real (estatísticas desatualizadas,
+  ids apagados); as páginas em si vêm sempre da consulta normal.
+
+EN: Paginator with estimated counts for large tables (admin changelists).
+- Unfiltered, the count comes from database statistics (`pg_class.reltuples` on
+  Postgres, `MAX(rowid)` on SQLite) instead of a `COUNT(*)` that reads the whole
+  table; below `ESCOLA_ADMIN_CONTAGEM_EXATA` rows it counts for real.
+- With a filter or search, it counts at most `ESCOLA_ADMIN_CONTAGEM_EXATA` + 1
+  rows (`COUNT(*)` over a `LIMIT`): beyond that the list only shows the first pages.
+- The total may be slightly off (stale statistics, deleted ids); the pages
+  themselves always come from the regular query.
+"""
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimar_linhas(model, banco: str) -> int | None:
+    """PT: Linhas da tabela segundo o banco, sem varrê-la (None se não dá para estimar).
+    EN: Table row count according to the database, without scanning it (None if it can't be estimated).
+    """
+    conexao = connections[banco]
+    tabela = conexao.ops.quote_name(model._meta.db_table)
+    with conexao.cursor() as cursor:
+        if conexao.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)', [tabela])
+            linha = cursor.fetchone()
+            # PT/EN: -1 = tabela nunca analisada | table never analyzed
+            return linha[0] if linha and linha[0] >= 0 else None
+        if conexao.vendor == 'sqlite':
+            cursor.execute(f'SELECT MAX(rowid) FROM {tabela}')
+            return cursor.fetchone()[0] or 0
+    return None
+
+
+class PaginadorEstimado(Paginator):
+    """PT: `count` estimado/limitado acima de `ESCOLA_ADMIN_CONTAGEM_EXATA`. EN: Estimated/capped `count` above `ESCOLA_ADMIN_CONTAGEM_EXATA`."""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        limite = settings.ESCOLA_ADMIN_CONTAGEM_EXATA
+        if not queryset.query.has_filters():
+            estimativa = estimar_linhas(queryset.model, queryset.db)
+            if estimativa is not None and estimativa > limite:
+                return estimativa
+            return queryset.count()
+        return queryset.order_by()[:limite + 1].count()
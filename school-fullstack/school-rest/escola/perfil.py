@@ -0,0 +1,105 @@
+"""
+PT: Perfil do estudante (`/estudantes/{pk}/perfil/`) montado numa quantidade fixa de consultas.
+- Uma chamada substitui `/estudantes/{pk}/`, `/matriculas/` e `/notas/` no client.
+- 4 consultas, independente do número de matrículas/notas: estudante, matrículas
+  com curso, professores dos cursos (prefetch) e notas com o código do curso.
+- O perfil inteiro fica no cache (`ESCOLA_PERFIL_CACHE_TTL`); mudanças no
+  estudante, em matrículas ou notas apagam a entrada dele, e mudanças em cursos
+  ou professores trocam a versão de todos os perfis (ver `escola.signals`).
+
+EN: Student profile (`/estudantes/{pk}/perfil/`) built in a fixed number of queries.
+- One call replaces `/estudantes/{pk}/`, `/matriculas/` and `/notas/` in the client.
+- 4 queries regardless of enrollment/grade count: student, enrollments with
+  course, course teachers (prefetch) and grades with the course code.
+- The whole profile is cached (`ESCOLA_PERFIL_CACHE_TTL`); changes to the student,
+  their enrollments or grades delete that entry, and changes to courses or
+  teachers bump the version of every profile (see `escola.signals`).
+"""
+
+import time
+from decimal import ROUND_HALF_UP, Decimal
+from itertools import groupby
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+from escola.models import Estudante, Matricula, Nota, Professor
+from escola.serializers import EstudanteSerializer, PerfilMatriculaSerializer, PerfilNotaSerializer
+
+CHAVE_VERSAO = 'escola:perfil:versao'
+
+
+def versao_perfis() -> int:
+    """PT: Versão atual dos perfis (criada na primeira leitura). EN: Current profile version (created on first read)."""
+    versao = cache.get(CHAVE_VERSAO)
+    if versao is None:
+        cache.add(CHAVE_VERSAO, time.time_ns(), None)
+        versao = cache.get(CHAVE_VERSAO)
+    return versao
+
+
+def chave_perfil(pk: int) -> str:
+    return f'escola:perfil:{versao_perfis()}:{pk}'
+
+
+def invalidar_perfil(pk: int) -> None:
+    """PT: Apaga o perfil de um estudante. EN: Deletes one student's profile."""
+    cache.delete(chave_perfil(pk))
+
+
+def invalidar_perfis() -> None:
+    """PT: Troca a versão; perfis antigos expiram sozinhos. EN: Bumps the version; old profiles just expire."""
+    cache.set(CHAVE_VERSAO, time.time_ns(), None)
+
+
+def _media(notas: list) -> str:
+    total = sum((n.valor for n in notas), Decimal(0))
+    return str((total / len(notas)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
+
+
+def montar_perfil(pk: int) -> dict | None:
+    """PT: Monta o perfil (None se o estudante não existe). EN: Builds the profile (None if the student does not exist)."""
+    estudante = Estudante.objects.filter(pk=pk).first()
+    if estudante is None:
+        return None
+
+    matriculas = (
+        Matricula.objects.filter(estudante_id=pk)
+        .select_related('curso')
+        .prefetch_related(Prefetch('curso__professores', queryset=Professor.objects.only('id', 'nome')))
+        .order_by('curso__codigo', 'pk')
+    )
+    notas = (
+        Nota.objects.filter(estudante_id=pk)
+        .select_related('curso')
+        .only('id', 'curso_id', 'curso__codigo', 'valor', 'avaliacao', 'data')
+        .order_by('curso__codigo', 'curso_id', '-data', 'pk')
+    )
+
+    notas_por_curso = []
+    for curso_id, grupo in groupby(notas, key=lambda n: n.curso_id):
+        grupo = list(grupo)
+        notas_por_curso.append({
+            'curso_id': curso_id,
+            'curso_codigo': grupo[0].curso.codigo,
+            'media': _media(grupo),
+            'notas': PerfilNotaSerializer(grupo, many=True).data,
+        })
+
+    return {
+        'estudante': EstudanteSerializer(estudante).data,
+        'matriculas': PerfilMatriculaSerializer(matriculas, many=True).data,
+        'notas_por_curso': notas_por_curso,
+    }
+
+
+def perfil_em_cache(pk: int) -> dict | None:
+    """PT: Perfil do cache ou recém-montado (e guardado). EN: Profile from cache or freshly built (and stored)."""
+    chave = chave_perfil(pk)
+    perfil = cache.get(chave)
+    if perfil is None:
+        perfil = montar_perfil(pk)
+        if perfil is not None:
+            cache.set(chave, perfil, settings.ESCOLA_PERFIL_CACHE_TTL)
+    return perfil
@@ -0,0 +1,120 @@
+"""
+PT: Projeção de campos (sparse fieldsets) para a API escola.
+- `?fields=a,b` mantém só os campos pedidos; `?exclude=c` remove campos.
+- A projeção vale só para leituras (GET/HEAD/OPTIONS); escritas usam o serializer completo.
+- O queryset acompanha os campos que sobraram: `only()` nas colunas usadas,
+  `select_related()` nas relações lidas (ex.: `estudante.nome`) e `Prefetch`
+  enxuto nos muitos-para-muitos — colunas e relações não pedidas não são buscadas.
+
+EN: Field projection (sparse fieldsets) for the escola API.
+- `?fields=a,b` keeps only the requested fields; `?exclude=c` drops fields.
+- Projection applies to reads only (GET/HEAD/OPTIONS); writes use the full serializer.
+- The queryset follows the remaining fields: `only()` on the used columns,
+  `select_related()` on relations that are read (e.g. `estudante.nome`) and a
+  lean `Prefetch` on many-to-many fields — unrequested columns and relations are never fetched.
+"""
+
+import re
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+_DISPLAY = re.compile(r'get_(\w+)_display')
+
+
+def _lista(valor: str | None) -> list[str]:
+    return [nome.strip() for nome in (valor or '').split(',') if nome.strip()]
+
+
+def campos_pedidos(request) -> tuple[list[str], list[str]]:
+    """PT: Lê `fields` e `exclude` da query string (vazio em escritas).
+    EN: Reads `fields` and `exclude` from the query string (empty on writes).
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return [], []
+    return _lista(request.query_params.get('fields')), _lista(request.query_params.get('exclude'))
+
+
+class CamposDinamicosMixin:
+    """PT: Mixin de serializer que aplica `?fields=` / `?exclude=` do request no contexto.
+    EN: Serializer mixin applying `?fields=` / `?exclude=` from the request in the context.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        pedidos, excluidos = campos_pedidos(self.context.get('request'))
+        if not pedidos and not excluidos:
+            return
+        desconhecidos = sorted((set(pedidos) | set(excluidos)) - set(self.fields))
+        if desconhecidos:
+            raise serializers.ValidationError({'fields': [f'Campo desconhecido: {nome}' for nome in desconhecidos]})
+        for nome in list(self.fields):
+            if (pedidos and nome not in pedidos) or nome in excluidos:
+                self.fields.pop(nome)
+
+
+def projetar(queryset, serializer):
+    """PT: Restringe o queryset às colunas/relações que o serializer vai ler.
+
+    Se algum campo depender de algo que não é coluna (propriedade, método,
+    `source='*'`), o queryset volta sem `only()` para não gerar consultas extras.
+
+    EN: Restricts the queryset to the columns/relations the serializer will read.
+
+    If any field depends on something that is not a column (property, method,
+    `source='*'`), the queryset comes back without `only()` to avoid extra queries.
+    """
+    opts = queryset.model._meta
+    colunas = {opts.pk.name}
+    relacoes = set()
+    prefetches = []
+    projetavel = True
+
+    for field in serializer.fields.values():
+        if isinstance(field, serializers.ManyRelatedField):
+            try:
+                relacionado = opts.get_field(field.source).related_model
+            except FieldDoesNotExist:
+                projetavel = False
+                continue
+            sub = relacionado._default_manager.all()
+            filho = field.child_relation
+            if isinstance(filho, serializers.SlugRelatedField):
+                sub = sub.only(relacionado._meta.pk.name, filho.slug_field)
+            prefetches.append(Prefetch(field.source, queryset=sub))
+            continue
+
+        partes = field.source.split('.')
+        casamento = _DISPLAY.fullmatch(partes[0])
+        if casamento:
+            partes[0] = casamento.group(1)
+        try:
+            opts.get_field(partes[0])
+        except FieldDoesNotExist:
+            projetavel = False
+            continue
+        if len(partes) > 1:
+            relacoes.add('__'.join(partes[:-1]))
+        colunas.add('__'.join(partes))
+
+    if relacoes:
+        queryset = queryset.select_related(*relacoes)
+    if prefetches:
+        queryset = queryset.prefetch_related(*prefetches)
+    if projetavel:
+        queryset = queryset.only(*colunas)
+    return queryset
+
+
+class ProjecaoMixin:
+    """PT: Mixin de view que projeta o queryset conforme o serializer (só em leituras).
+    EN: View mixin that projects the queryset to match the serializer (reads only).
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method not in SAFE_METHODS:
+            return queryset
+        return projetar(queryset, self.get_serializer())
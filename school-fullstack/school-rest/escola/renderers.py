@@ -0,0 +1,72 @@
+"""
+PT: Renderizadores JSON da API escola.
+- `FastJSONRenderer`: usa `orjson` quando instalado (mesma saída compacta do
+  `JSONRenderer`, bem mais rápido em listas grandes); sem ele, cai no renderer do DRF.
+- `ColumnarJSONRenderer`: formato colunar opcional (`?format=columns`) para listas —
+  os nomes dos campos vão uma vez em `columns` e cada linha é só uma lista de valores.
+
+EN: JSON renderers for the escola API.
+- `FastJSONRenderer`: uses `orjson` when installed (same compact output as
+  `JSONRenderer`, much faster on large lists); without it, falls back to DRF's renderer.
+- `ColumnarJSONRenderer`: optional columnar format (`?format=columns`) for lists —
+  field names are sent once in `columns` and each row is just a list of values.
+"""
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson  # type: ignore
+except Exception:  # PT/EN: Modo degradado quando orjson não está instalado
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """PT: `JSONRenderer` com `orjson`; saída indentada (ex.: browsable API) continua no DRF.
+    EN: `JSONRenderer` backed by `orjson`; indented output (e.g. browsable API) stays on DRF.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=orjson.OPT_NON_STR_KEYS)
+        except (TypeError, orjson.JSONEncodeError):
+            # PT: Tipos que o orjson recusa (ex.: inteiros > 64 bits) seguem pelo encoder do DRF
+            # EN: Types orjson rejects (e.g. integers > 64 bits) go through DRF's encoder
+            return super().render(data, accepted_media_type, renderer_context)
+        # PT/EN: Mesmo escape do DRF para U+2028/U+2029 | Same U+2028/U+2029 escaping as DRF
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+def colunar(data):
+    """PT: Converte listas de objetos em `{'columns': [...], 'rows': [[...], ...]}`.
+
+    Aceita a resposta paginada (`count/next/previous/results`) ou uma lista simples;
+    qualquer outra coisa (detalhe, erro) é devolvida sem mudanças.
+
+    EN: Turns lists of objects into `{'columns': [...], 'rows': [[...], ...]}`.
+
+    Accepts the paginated response (`count/next/previous/results`) or a plain list;
+    anything else (detail, error) is returned unchanged.
+    """
+    if isinstance(data, dict) and isinstance(data.get('results'), list):
+        convertido = {k: v for k, v in data.items() if k != 'results'}
+        convertido.update(colunar(data['results']))
+        return convertido
+    if not isinstance(data, list) or not all(isinstance(item, dict) for item in data):
+        return data
+    colunas = list(data[0]) if data else []
+    return {'columns': colunas, 'rows': [[item.get(c) for c in colunas] for item in data]}
+
+
+class ColumnarJSONRenderer(FastJSONRenderer):
+    """PT: JSON colunar, escolhido com `?format=columns` ou pelo `Accept`.
+    EN: Columnar JSON, picked with `?format=columns` or via `Accept`.
+    """
+    media_type = 'application/vnd.escola.columns+json'
+    format = 'columns'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(colunar(data), accepted_media_type, renderer_context)
@@ -0,0 +1,131 @@
+"""
+PT: Resumo materializado por curso (`ResumoCurso`, servido em `/cursos/{pk}/resumo/`).
+- Matrículas por período, professores e média das notas ficam numa linha por
+  curso; a leitura é um SELECT pela chave primária, sem percorrer matrículas.
+- Mudanças em matrículas, notas e professores (`escola.signals`) agendam o
+  recálculo só dos cursos afetados para depois do commit (um por transação).
+- O recálculo agrega com GROUP BY e grava com upsert, então serve tanto para um
+  curso quanto para todos (`python manage.py reconstruir_resumos`).
+- Operações em massa que não disparam sinais (`bulk_create`, `update()`) chamam
+  `atualizar_resumos` com os cursos tocados.
+
+EN: Materialized per-course summary (`ResumoCurso`, served at `/cursos/{pk}/resumo/`).
+- Enrollments per period, teachers and grade average live in one row per
+  course; reading it is a primary-key SELECT, without walking enrollments.
+- Changes to enrollments, grades and teachers (`escola.signals`) schedule a
+  recompute of just the affected courses after commit (one per transaction).
+- The recompute aggregates with GROUP BY and writes with an upsert, so it works
+  for one course as well as for all of them (`python manage.py reconstruir_resumos`).
+- Bulk operations that fire no signals (`bulk_create`, `update()`) call
+  `atualizar_resumos` with the courses they touched.
+"""
+
+from collections import defaultdict
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from escola.models import Curso, Matricula, Nota, Professor, ResumoCurso
+
+# PT: Código do período -> campo do resumo | EN: Period code -> summary field
+CAMPOS_PERIODO = {'M': 'matriculas_matutino', 'V': 'matriculas_vespertino', 'N': 'matriculas_noturno'}
+CAMPOS_ATUALIZADOS = ['total_matriculas', *CAMPOS_PERIODO.values(), 'professores', 'total_notas', 'media',
+                      'atualizado_em']
+
+
+def _media(soma, quantidade) -> Decimal | None:
+    if not quantidade:
+        return None
+    return (Decimal(soma) / quantidade).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+def calcular_resumos(cursos_ids=None) -> list[ResumoCurso]:
+    """PT: Resumos (não salvos) dos cursos pedidos, ou de todos; 3 consultas agregadas.
+    EN: Summaries (unsaved) of the given courses, or all of them; 3 aggregate queries.
+    """
+    cursos = Curso.objects.all() if cursos_ids is None else Curso.objects.filter(pk__in=cursos_ids)
+    filtro = {} if cursos_ids is None else {'curso_id__in': cursos_ids}
+    resumos = {pk: ResumoCurso(curso_id=pk) for pk in cursos.values_list('pk', flat=True)}
+
+    for curso_id, periodo, quantidade in (Matricula.objects.filter(**filtro).order_by()
+                                          .values_list('curso_id', 'periodo').annotate(Count('pk'))):
+        resumo = resumos[curso_id]
+        resumo.total_matriculas += quantidade
+        if periodo in CAMPOS_PERIODO:
+            setattr(resumo, CAMPOS_PERIODO[periodo], getattr(resumo, CAMPOS_PERIODO[periodo]) + quantidade)
+
+    for curso_id, quantidade, soma in (Nota.objects.filter(**filtro).order_by()
+                                       .values_list('curso_id').annotate(Count('pk'), Sum('valor'))):
+        resumos[curso_id].total_notas = quantidade
+        resumos[curso_id].media = _media(soma, quantidade)
+
+    professores = defaultdict(list)
+    for curso_id, professor_id, nome in (Professor.cursos.through.objects.filter(**filtro)
+                                         .values_list('curso_id', 'professor_id', 'professor__nome')
+                                         .order_by('professor__nome', 'professor_id')):
+        professores[curso_id].append({'id': professor_id, 'nome': nome})
+    for curso_id, lista in professores.items():
+        resumos[curso_id].professores = lista
+
+    return list(resumos.values())
+
+
+def atualizar_resumos(cursos_ids=None) -> int:
+    """PT: Recalcula e grava (upsert) os resumos; devolve quantos. Cursos excluídos levam o
+    resumo junto (CASCADE).
+    EN: Recomputes and stores (upserts) the summaries; returns how many. Deleted courses
+    take their summary along (CASCADE).
+    """
+    cursos_ids = None if cursos_ids is None else sorted(set(cursos_ids))
+    with transaction.atomic():
+        if cursos_ids is not None:
+            # PT: Trava os cursos (no Postgres) para dois recálculos simultâneos não se cruzarem;
+            #     no SQLite a transação IMMEDIATE já serializa.
+            # EN: Locks the courses (on Postgres) so two concurrent recomputes don't interleave;
+            #     on SQLite the IMMEDIATE transaction already serializes them.
+            list(Curso.objects.select_for_update().filter(pk__in=cursos_ids).values_list('pk', flat=True))
+        resumos = calcular_resumos(cursos_ids)
+        ResumoCurso.objects.bulk_create(resumos, batch_size=500, update_conflicts=True, unique_fields=['curso'],
+                                        update_fields=CAMPOS_ATUALIZADOS)
+    return len(resumos)
+
+
+def agendar(*cursos_ids) -> None:
+    """PT: Recalcula os cursos depois do commit da transação atual (ou já, sem transação).
+    Todas as chamadas de uma transação juntam os ids num único recálculo.
+    EN: Recomputes the courses after the current transaction commits (or now, outside one).
+    Every call within a transaction adds its ids to a single recompute.
+    """
+    ids = {pk for pk in cursos_ids if pk is not None}
+    if not ids:
+        return
+    conexao = transaction.get_connection()
+    pendentes, recalcular = getattr(conexao, '_resumos_agendados', None) or (set(), None)
+    # PT: O callback sai da fila quando roda ou quando a transação (ou o savepoint em que
+    #     entrou) é desfeita; aí começa um conjunto novo.
+    # EN: The callback leaves the queue when it runs or when the transaction (or the
+    #     savepoint it joined in) rolls back; then a fresh set starts.
+    novo = not any(entrada[1] is recalcular for entrada in conexao.run_on_commit)
+    if novo:
+        pendentes = set()
+
+        def recalcular():
+            if conexao._resumos_agendados[1] is recalcular:
+                conexao._resumos_agendados = None
+            atualizar_resumos(pendentes)
+
+        conexao._resumos_agendados = (pendentes, recalcular)
+    pendentes |= ids
+    if novo:
+        transaction.on_commit(recalcular)
+
+
+def resumo_do_curso(pk: int) -> ResumoCurso | None:
+    """PT: Resumo gravado, montado na hora se ainda não existe (None se o curso não existe).
+    EN: Stored summary, built on the spot if missing (None if the course does not exist).
+    """
+    resumo = ResumoCurso.objects.select_related('curso').filter(curso_id=pk).first()
+    if resumo is None and atualizar_resumos([pk]):
+        resumo = ResumoCurso.objects.select_related('curso').get(curso_id=pk)
+    return resumo
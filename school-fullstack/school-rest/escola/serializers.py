@@ -2,25 +2,32 @@
 PT: Serializers da aplicação escola para (de)serialização e validação.
 - EstudanteSerializer, CursoSerializer, MatriculaSerializer: CRUD principal.
 - Listas específicas para matrículas por estudante e por curso.
+- ResumoCursoSerializer: resumo materializado do curso (`/cursos/{pk}/resumo/`).
+- TarefaSerializer: tarefas em segundo plano (`/tarefas/`).
+- Todos aceitam `?fields=` / `?exclude=` em leituras (ver `escola.projecao`).
 
 EN: Serializers for the escola app for (de)serialization and validation.
 - EstudanteSerializer, CursoSerializer, MatriculaSerializer: main CRUD.
 - Specific lists for enrollments by student and by course.
+- ResumoCursoSerializer: materialized course summary (`/cursos/{pk}/resumo/`).
+- TarefaSerializer: background jobs (`/tarefas/`).
+- All accept `?fields=` / `?exclude=` on reads (see `escola.projecao`).
 """
 
 from rest_framework import serializers
-from escola.models import Estudante, Curso, Matricula, Professor, Nota
+from escola.models import Estudante, Curso, Matricula, Professor, Nota, Alteracao, ResumoCurso, Tarefa
+from escola.projecao import CamposDinamicosMixin
 from datetime import date
 
 
-class EstudanteSerializer(serializers.ModelSerializer):
+class EstudanteSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """PT: Campos públicos do estudante. EN: Public student fields."""
     class Meta:
         model = Estudante
         fields = ('id', 'nome', 'email', 'cpf', 'data_nascimento', 'celular')
 
 
-class CursoSerializer(serializers.ModelSerializer):
+class CursoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """PT: Serializa todos os campos do curso. EN: Serializes all course fields."""
     professores = serializers.SlugRelatedField(
         slug_field='nome', many=True, read_only=True
@@ -30,14 +37,42 @@ class CursoSerializer(serializers.ModelSerializer):
         fields = ('id', 'codigo', 'descricao', 'nivel', 'professores')
 
 
-class MatriculaSerializer(serializers.ModelSerializer):
+class MatriculaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """PT: Serializa todos os campos da matrícula. EN: Serializes all enrollment fields."""
     class Meta:
         model = Matricula
         fields = '__all__'
 
 
-class ListaMatriculasEstudanteSerializer(serializers.ModelSerializer):
+class _MatriculasUpsertListSerializer(serializers.ListSerializer):
+    def validate(self, attrs):
+        """PT: Confere estudantes e cursos em 2 consultas para o lote todo (não 2 por item).
+        EN: Checks students and courses in 2 queries for the whole batch (not 2 per item).
+        """
+        erros = {}
+        for campo, modelo in (('estudante', Estudante), ('curso', Curso)):
+            pedidos = {item[campo] for item in attrs}
+            faltando = pedidos - set(modelo.objects.filter(pk__in=pedidos).values_list('pk', flat=True))
+            if faltando:
+                erros[campo] = f'Não encontrados: {", ".join(map(str, sorted(faltando)))}.'
+        if erros:
+            raise serializers.ValidationError(erros)
+        return attrs
+
+
+class MatriculaUpsertSerializer(serializers.Serializer):
+    """PT: Item do upsert de matrículas: o par (estudante, curso) existente é atualizado.
+    EN: Enrollment upsert item: an existing (student, course) pair gets updated.
+    """
+    estudante = serializers.IntegerField(min_value=1)
+    curso = serializers.IntegerField(min_value=1)
+    periodo = serializers.ChoiceField(choices=Matricula.PERIODO, default='M')
+
+    class Meta:
+        list_serializer_class = _MatriculasUpsertListSerializer
+
+
+class ListaMatriculasEstudanteSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """PT: Lista de matrículas de um estudante. EN: A student's enrollment list."""
     curso = serializers.ReadOnlyField(source='curso.descricao')
     curso_id = serializers.ReadOnlyField(source='curso.id')
@@ -48,7 +83,7 @@ class ListaMatriculasEstudanteSerializer(serializers.ModelSerializer):
         fields = ['curso_id', 'curso', 'periodo']
 
 
-class ListaMatriculasCursoSerializer(serializers.ModelSerializer):
+class ListaMatriculasCursoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """PT: Lista de estudantes matriculados em um curso. EN: Students enrolled in a course."""
     estudante_nome = serializers.ReadOnlyField(source='estudante.nome')
 
@@ -57,7 +92,19 @@ class ListaMatriculasCursoSerializer(serializers.ModelSerializer):
         fields = ['estudante_nome']
 
 
-class ProfessorSerializer(serializers.ModelSerializer):
+class PerfilMatriculaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    """PT: Matrícula com os dados do curso (perfil do estudante).
+    EN: Enrollment with course details (student profile).
+    """
+    periodo_nome = serializers.ReadOnlyField(source='get_periodo_display')
+    curso = CursoSerializer(read_only=True)
+
+    class Meta:
+        model = Matricula
+        fields = ('id', 'periodo', 'periodo_nome', 'curso')
+
+
+class ProfessorSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """PT: Serializa professores, incluindo nomes de cursos.
     EN: Serializes teachers, including course names.
     """
@@ -68,7 +115,7 @@ class ProfessorSerializer(serializers.ModelSerializer):
         fields = ('id', 'nome', 'email', 'celular', 'cursos')
 
 
-class NotaSerializer(serializers.ModelSerializer):
+class NotaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """PT: Serializa notas de estudantes. EN: Serializes student grades."""
     estudante_nome = serializers.ReadOnlyField(source='estudante.nome')
     curso_codigo = serializers.ReadOnlyField(source='curso.codigo')
@@ -100,7 +147,62 @@ class NotaSerializer(serializers.ModelSerializer):
         estudante = attrs.get('estudante')
         curso = attrs.get('curso')
         if estudante and curso:
-            exists = Matricula.objects.filter(estudante=estudante, curso=curso).exists()
+            # PT: Respondida só pelo índice único (estudante_id, curso_id) | EN: Answered from the unique (estudante_id, curso_id) index alone
+            exists = Matricula.objects.filter(estudante_id=estudante.pk, curso_id=curso.pk).exists()
             if not exists:
                 raise serializers.ValidationError('Estudante não está matriculado neste curso.')
         return attrs
+
+
+class PerfilNotaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    """PT: Nota dentro do perfil (agrupada por curso). EN: Grade inside the profile (grouped by course)."""
+    class Meta:
+        model = Nota
+        fields = ('id', 'avaliacao', 'data', 'valor')
+
+
+class AlteracaoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    """PT: Entrada do feed de mudanças. EN: Change feed entry."""
+    class Meta:
+        model = Alteracao
+        fields = ('seq', 'modelo', 'objeto_id', 'operacao', 'dados', 'criado_em')
+
+
+class ResumoCursoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    """PT: Resumo do curso: matrículas por período, professores e média.
+    EN: Course summary: enrollments per period, teachers and average.
+    """
+    curso_codigo = serializers.ReadOnlyField(source='curso.codigo')
+    curso_descricao = serializers.ReadOnlyField(source='curso.descricao')
+    matriculas_por_periodo = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ResumoCurso
+        fields = ('curso', 'curso_codigo', 'curso_descricao', 'total_matriculas', 'matriculas_por_periodo',
+                  'professores', 'total_notas', 'media', 'atualizado_em')
+
+    def get_matriculas_por_periodo(self, obj):
+        return {nome: getattr(obj, f'matriculas_{nome}') for _, nome in Matricula.PERIODO}
+
+
+class TarefaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    """PT: Tarefa em segundo plano; na criação só `tipo`, `parametros` e `executar_em` (opcional).
+    EN: Background job; on create only `tipo`, `parametros` and `executar_em` (optional).
+    """
+    parametros = serializers.DictField(required=False, default=dict)
+    executar_em = serializers.DateTimeField(required=False)
+    arquivo = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Tarefa
+        fields = ('id', 'tipo', 'parametros', 'estado', 'tentativas', 'max_tentativas', 'executar_em', 'resultado',
+                  'erro', 'arquivo', 'criada_em', 'iniciada_em', 'concluida_em')
+        read_only_fields = ('estado', 'tentativas', 'max_tentativas', 'resultado', 'erro', 'criada_em',
+                            'iniciada_em', 'concluida_em')
+
+    def get_arquivo(self, obj):
+        if obj.estado != 'C' or not isinstance(obj.resultado, dict) or 'arquivo' not in obj.resultado:
+            return None
+        caminho = f'/tarefas/{obj.pk}/arquivo/'
+        request = self.context.get('request')
+        return request.build_absolute_uri(caminho) if request else caminho
@@ -0,0 +1,151 @@
+"""
+PT: Sinais da aplicação escola.
+- Invalidação do cache de autenticação (`escola.authentication`) quando tokens,
+  usuários, grupos ou permissões mudam (ex.: após `bootstrap_roles`).
+- Invalidação dos perfis de estudante em cache (`escola.perfil`).
+- Registro de mudanças para o feed `/changes/` (`escola.alteracoes`).
+- Recálculo dos resumos dos cursos afetados (`escola.resumo`).
+
+EN: Signals for the escola app.
+- Invalidates the authentication cache (`escola.authentication`) when tokens,
+  users, groups or permissions change (e.g. after `bootstrap_roles`).
+- Invalidates cached student profiles (`escola.perfil`).
+- Records changes for the `/changes/` feed (`escola.alteracoes`).
+- Recomputes the summaries of affected courses (`escola.resumo`).
+"""
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from escola import alteracoes, resumo
+from escola.authentication import invalidar_token, invalidar_tudo
+from escola.models import Curso, Estudante, Matricula, Nota, Professor
+from escola.perfil import invalidar_perfil, invalidar_perfis
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def token_alterado(sender, instance, **kwargs):
+    invalidar_token(instance.key)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def acesso_alterado(sender, **kwargs):
+    # PT: m2m_changed dispara em pre_* e post_*; basta invalidar depois
+    # EN: m2m_changed fires on pre_* and post_*; invalidating afterwards is enough
+    if not kwargs.get('action', 'post_').startswith('post_'):
+        return
+    # PT: O login só atualiza last_login; não precisa derrubar o cache
+    # EN: Logging in only touches last_login; no need to drop the cache
+    if kwargs.get('update_fields') == frozenset({'last_login'}):
+        return
+    invalidar_tudo()
+
+
+@receiver(post_save, sender=Estudante)
+@receiver(post_delete, sender=Estudante)
+def estudante_alterado(sender, instance, **kwargs):
+    invalidar_perfil(instance.pk)
+
+
+@receiver(post_save, sender=Matricula)
+@receiver(post_delete, sender=Matricula)
+@receiver(post_save, sender=Nota)
+@receiver(post_delete, sender=Nota)
+def historico_alterado(sender, instance, **kwargs):
+    invalidar_perfil(instance.estudante_id)
+
+
+@receiver(post_save, sender=Curso)
+@receiver(post_delete, sender=Curso)
+@receiver(post_save, sender=Professor)
+@receiver(post_delete, sender=Professor)
+@receiver(m2m_changed, sender=Professor.cursos.through)
+def curso_alterado(sender, **kwargs):
+    # PT: Cursos e professores aparecem em vários perfis | EN: Courses and teachers show up in many profiles
+    if kwargs.get('action', 'post_').startswith('post_'):
+        invalidar_perfis()
+
+
+def _reservar_ordem(sender, raw=False, **kwargs):
+    # PT: Antes da escrita da linha (ver `alteracoes.reservar_ordem`) | EN: Before the row write (see `alteracoes.reservar_ordem`)
+    if not raw:
+        alteracoes.reservar_ordem()
+
+
+def _registrar_salvo(sender, instance, created, raw=False, **kwargs):
+    if not raw:  # PT/EN: loaddata/fixtures não entram no feed | fixtures stay out of the feed
+        alteracoes.registrar(instance, alteracoes.CRIACAO if created else alteracoes.ALTERACAO)
+
+
+def _registrar_excluido(sender, instance, **kwargs):
+    alteracoes.registrar(instance, alteracoes.EXCLUSAO)
+
+
+for _modelo in alteracoes.MODELOS:
+    pre_save.connect(_reservar_ordem, sender=_modelo, dispatch_uid=f'alteracoes_ordem_save_{_modelo.__name__}')
+    pre_delete.connect(_reservar_ordem, sender=_modelo, dispatch_uid=f'alteracoes_ordem_delete_{_modelo.__name__}')
+    post_save.connect(_registrar_salvo, sender=_modelo, dispatch_uid=f'alteracoes_save_{_modelo.__name__}')
+    post_delete.connect(_registrar_excluido, sender=_modelo, dispatch_uid=f'alteracoes_delete_{_modelo.__name__}')
+
+
+@receiver(m2m_changed, sender=Professor.cursos.through)
+def professores_cursos_alterados(sender, instance, action, model, pk_set, **kwargs):
+    # PT: Os dois lados mudam (Professor.cursos e Curso.professores) | EN: Both sides change
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    alteracoes.registrar(instance, alteracoes.ALTERACAO)
+    if pk_set:
+        alteracoes.registrar_lote(model.objects.filter(pk__in=pk_set), alteracoes.ALTERACAO)
+
+
+@receiver(pre_save, sender=Matricula)
+@receiver(pre_save, sender=Nota)
+def guardar_curso_anterior(sender, instance, update_fields=None, **kwargs):
+    # PT: Trocar o curso de uma matrícula/nota muda dois resumos | EN: Moving one to another course changes two summaries
+    if instance._state.adding or (update_fields is not None and 'curso' not in update_fields):
+        return
+    instance._curso_anterior = sender.objects.filter(pk=instance.pk).values_list('curso_id', flat=True).first()
+
+
+@receiver(post_save, sender=Matricula)
+@receiver(post_delete, sender=Matricula)
+@receiver(post_save, sender=Nota)
+@receiver(post_delete, sender=Nota)
+def resumo_historico_alterado(sender, instance, **kwargs):
+    resumo.agendar(instance.curso_id, getattr(instance, '_curso_anterior', None))
+
+
+@receiver(post_save, sender=Professor)
+def resumo_professor_salvo(sender, instance, created, **kwargs):
+    # PT: O nome aparece no resumo de cada curso dele | EN: The name shows up in each of their course summaries
+    if not created:
+        resumo.agendar(*instance.cursos.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=Professor)
+def resumo_professor_excluido(sender, instance, **kwargs):
+    # PT: As ligações somem sem m2m_changed | EN: The links go away without m2m_changed
+    resumo.agendar(*instance.cursos.values_list('pk', flat=True))
+
+
+@receiver(m2m_changed, sender=Professor.cursos.through)
+def resumo_professores_cursos(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        if action.startswith('post_'):
+            resumo.agendar(instance.pk)
+    elif action == 'pre_clear':
+        resumo.agendar(*instance.cursos.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        resumo.agendar(*(pk_set or ()))
@@ -0,0 +1,363 @@
+"""
+PT: Fila de tarefas em segundo plano guardada no próprio banco (modelo `Tarefa`), sem broker.
+- `enfileirar(tipo, parametros)` (ou `POST /tarefas/`) grava a tarefa; dentro de uma
+  transação ela só fica visível no commit. `python manage.py processar_tarefas` sobe
+  trabalhadores (um processo por núcleo por padrão) que a reservam e executam.
+- Reserva: numa transação curta (no Postgres sob um advisory lock; no SQLite a
+  transação IMMEDIATE já serializa) conta as tarefas em execução por tipo, escolhe a
+  pendente mais antiga de um tipo abaixo do limite e a marca `E` com um UPDATE
+  condicional, então duas reservas nunca pegam a mesma tarefa.
+- Enquanto roda, uma thread renova `expira_em` a cada terço de `ESCOLA_TAREFAS_PRAZO`;
+  se o trabalhador morre, a tarefa expira e volta para a fila (conta como tentativa).
+- Falhas voltam para a fila com backoff exponencial e jitter (`ESCOLA_TAREFAS_BACKOFF`
+  × 2^(tentativa-1), até `ESCOLA_TAREFAS_BACKOFF_MAX`); `TarefaInvalida` falha de vez.
+  Cada tentativa refaz a tarefa inteira, por isso os tipos precisam ser idempotentes.
+- Arquivos gerados (ex.: exportações) ficam em `ESCOLA_TAREFAS_ARQUIVOS` por
+  `ESCOLA_TAREFAS_RETENCAO` segundos; os trabalhadores apagam os mais velhos.
+- Os tipos ficam no fim deste módulo, registrados com `@tipo(...)`: limite de
+  execução simultânea (sobrescrito por `ESCOLA_TAREFAS_LIMITES`), tentativas e as
+  permissões exigidas para enfileirar (None = só superusuário).
+
+EN: Background job queue stored in the database itself (`Tarefa` model), no broker.
+- `enfileirar(tipo, parametros)` (or `POST /tarefas/`) stores the job; inside a
+  transaction it only becomes visible on commit. `python manage.py processar_tarefas`
+  starts workers (one process per core by default) that claim and run it.
+- Claiming: in a short transaction (on Postgres under an advisory lock; on SQLite
+  the IMMEDIATE transaction already serializes) it counts running jobs per type,
+  picks the oldest pending job of a type below its limit and marks it `E` with a
+  conditional UPDATE, so two claims never take the same job.
+- While it runs, a thread renews `expira_em` every third of `ESCOLA_TAREFAS_PRAZO`;
+  if the worker dies, the job expires and goes back to the queue (counts as an attempt).
+- Failures go back to the queue with exponential backoff and jitter
+  (`ESCOLA_TAREFAS_BACKOFF` × 2^(attempt-1), up to `ESCOLA_TAREFAS_BACKOFF_MAX`);
+  `TarefaInvalida` fails for good. Each attempt reruns the whole job, so types must
+  be idempotent.
+- Generated files (e.g. exports) stay in `ESCOLA_TAREFAS_ARQUIVOS` for
+  `ESCOLA_TAREFAS_RETENCAO` seconds; workers delete older ones.
+- Job types live at the end of this module, registered with `@tipo(...)`: concurrency
+  limit (overridden by `ESCOLA_TAREFAS_LIMITES`), attempts and the permissions
+  required to enqueue (None = superuser only).
+"""
+
+import json
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from typing import Callable
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from escola import matriculas, resumo
+from escola.exportacao import COLUNAS_NOTAS, linhas_csv
+from escola.models import Matricula, Nota, Tarefa
+from escola.serializers import MatriculaUpsertSerializer
+
+PENDENTE, EXECUTANDO, CONCLUIDA, FALHOU, CANCELADA = 'P', 'E', 'C', 'F', 'X'
+# PT: Chave do advisory lock das reservas no Postgres | EN: Postgres advisory lock key for claims
+_TRAVA_RESERVA = 7_245_050
+
+
+class TarefaInvalida(Exception):
+    """PT: Erro que tentar de novo não resolve (ex.: parâmetros inválidos): falha sem retentativa.
+    EN: Error that retrying won't fix (e.g. invalid parameters): fails without retry.
+    """
+
+
+@dataclass(frozen=True)
+class Tipo:
+    nome: str
+    funcao: Callable[[Tarefa], dict]
+    limite: int
+    tentativas: int
+    permissoes: tuple | None
+
+    @property
+    def limite_efetivo(self) -> int:
+        return settings.ESCOLA_TAREFAS_LIMITES.get(self.nome, self.limite)
+
+
+TIPOS: dict[str, Tipo] = {}
+
+
+def tipo(nome: str, limite: int = 1, tentativas: int = 3, permissoes: tuple | None = None):
+    """PT: Registra a função como tipo de tarefa; ela recebe a `Tarefa` e devolve o resultado (JSON).
+    EN: Registers the function as a job type; it takes the `Tarefa` and returns the (JSON) result.
+    """
+    def registrar(funcao):
+        TIPOS[nome] = Tipo(nome, funcao, limite, tentativas, permissoes)
+        return funcao
+    return registrar
+
+
+def pode_enfileirar(usuario, nome: str) -> bool:
+    permissoes = TIPOS[nome].permissoes
+    return usuario.is_superuser or (permissoes is not None and usuario.has_perms(permissoes))
+
+
+def enfileirar(nome: str, parametros: dict | None = None, usuario=None, executar_em=None) -> Tarefa:
+    """PT: Grava uma tarefa pendente. EN: Stores a pending job."""
+    if nome not in TIPOS:
+        raise ValueError(f'Tipo de tarefa desconhecido: {nome}')
+    return Tarefa.objects.create(
+        tipo=nome, parametros=parametros or {}, max_tentativas=TIPOS[nome].tentativas,
+        criado_por=usuario if usuario is not None and usuario.is_authenticated else None,
+        executar_em=executar_em or timezone.now(),
+    )
+
+
+def cancelar(tarefa: Tarefa) -> bool:
+    """PT: Cancela se ainda está pendente. EN: Cancels it if still pending."""
+    cancelada = Tarefa.objects.filter(pk=tarefa.pk, estado=PENDENTE).update(estado=CANCELADA,
+                                                                            concluida_em=timezone.now())
+    tarefa.refresh_from_db()
+    return bool(cancelada)
+
+
+def backoff(tentativa: int) -> float:
+    """PT: Segundos até a próxima tentativa; o jitter evita que as falhas voltem todas juntas.
+    EN: Seconds until the next attempt; jitter keeps failures from coming back all at once.
+    """
+    teto = min(settings.ESCOLA_TAREFAS_BACKOFF * 2 ** (tentativa - 1), settings.ESCOLA_TAREFAS_BACKOFF_MAX)
+    return teto * random.uniform(0.5, 1)
+
+
+def _prazo():
+    return timezone.now() + timedelta(seconds=settings.ESCOLA_TAREFAS_PRAZO)
+
+
+def recuperar_expiradas() -> int:
+    """PT: Tarefas `E` cujo trabalhador parou de renovar o prazo voltam para a fila (ou falham, sem tentativas).
+    EN: `E` jobs whose worker stopped renewing the lease go back to the queue (or fail, when out of attempts).
+    """
+    agora = timezone.now()
+    erro = 'Prazo esgotado: o trabalhador parou de renovar a tarefa.'
+    expiradas = Tarefa.objects.filter(estado=EXECUTANDO, expira_em__lt=agora)
+    voltaram = expiradas.filter(tentativas__lt=F('max_tentativas')).update(
+        estado=PENDENTE, executar_em=agora, trabalhador='', expira_em=None, erro=erro)
+    falharam = expiradas.update(estado=FALHOU, concluida_em=agora, expira_em=None, erro=erro)
+    return voltaram + falharam
+
+
+def limpar_arquivos() -> int:
+    """PT: Apaga arquivos de tarefas (e `.parcial` abandonados) mais velhos que `ESCOLA_TAREFAS_RETENCAO`.
+    EN: Deletes job files (and abandoned `.parcial` ones) older than `ESCOLA_TAREFAS_RETENCAO`.
+    """
+    pasta = Path(settings.ESCOLA_TAREFAS_ARQUIVOS)
+    if not pasta.is_dir():
+        return 0
+    limite = time.time() - settings.ESCOLA_TAREFAS_RETENCAO
+    apagados = 0
+    for caminho in pasta.glob('tarefa-*'):
+        try:
+            if caminho.stat().st_mtime < limite:
+                caminho.unlink()
+                apagados += 1
+        except FileNotFoundError:
+            pass  # PT/EN: outro trabalhador apagou antes | another worker got there first
+    return apagados
+
+
+def reservar(trabalhador: str, tipos=None) -> Tarefa | None:
+    """PT: Reserva a próxima tarefa pronta de um tipo com vaga (None se não há).
+    EN: Claims the next ready job of a type with a free slot (None if there is none).
+    """
+    nomes = [nome for nome in (tipos or TIPOS) if nome in TIPOS]
+    agora = timezone.now()
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_xact_lock(%s)', [_TRAVA_RESERVA])
+        em_execucao = dict(Tarefa.objects.filter(estado=EXECUTANDO, tipo__in=nomes).order_by()
+                           .values_list('tipo').annotate(Count('pk')))
+        livres = [nome for nome in nomes if em_execucao.get(nome, 0) < TIPOS[nome].limite_efetivo]
+        if not livres:
+            return None
+        pk = (Tarefa.objects.filter(estado=PENDENTE, executar_em__lte=agora, tipo__in=livres)
+              .order_by('executar_em', 'pk').values_list('pk', flat=True).first())
+        if pk is None:
+            return None
+        # PT: Condicional: sem IMMEDIATE (SQLITE_OTIMIZADO desligado, o padrão) outra reserva pode ter chegado antes
+        # EN: Conditional: without IMMEDIATE (SQLITE_OTIMIZADO off, the default) another claim may have got there first
+        reservada = Tarefa.objects.filter(pk=pk, estado=PENDENTE).update(
+            estado=EXECUTANDO, tentativas=F('tentativas') + 1, trabalhador=trabalhador,
+            iniciada_em=agora, expira_em=_prazo())
+    return Tarefa.objects.get(pk=pk) if reservada else None
+
+
+class _Renovacao(threading.Thread):
+    """PT: Renova o prazo da tarefa enquanto ela roda. EN: Renews the job's lease while it runs."""
+
+    def __init__(self, tarefa: Tarefa):
+        super().__init__(daemon=True, name=f'renovacao-{tarefa.pk}')
+        self.tarefa = tarefa
+        self.parar = threading.Event()
+
+    def run(self):
+        try:
+            while not self.parar.wait(settings.ESCOLA_TAREFAS_PRAZO / 3):
+                Tarefa.objects.filter(pk=self.tarefa.pk, estado=EXECUTANDO,
+                                      trabalhador=self.tarefa.trabalhador).update(expira_em=_prazo())
+        finally:
+            # PT/EN: Conexão própria desta thread | this thread's own connection
+            connection.close()
+
+
+def executar(tarefa: Tarefa) -> Tarefa:
+    """PT: Roda uma tarefa reservada e grava o desfecho. EN: Runs a claimed job and stores the outcome."""
+    renovacao = _Renovacao(tarefa)
+    renovacao.start()
+    try:
+        resultado, erro = TIPOS[tarefa.tipo].funcao(tarefa), None
+    except Exception as excecao:
+        resultado, erro = None, excecao
+    finally:
+        renovacao.parar.set()
+        renovacao.join()
+
+    agora = timezone.now()
+    if erro is None:
+        campos = {'estado': CONCLUIDA, 'resultado': resultado, 'erro': '', 'concluida_em': agora}
+    elif isinstance(erro, TarefaInvalida) or tarefa.tentativas >= tarefa.max_tentativas:
+        texto = str(erro) if isinstance(erro, TarefaInvalida) else ''.join(traceback.format_exception(erro))
+        campos = {'estado': FALHOU, 'erro': texto, 'concluida_em': agora}
+    else:
+        campos = {'estado': PENDENTE, 'erro': ''.join(traceback.format_exception(erro)), 'trabalhador': '',
+                  'executar_em': agora + timedelta(seconds=backoff(tarefa.tentativas))}
+    # PT: Se o prazo venceu e outra reserva pegou a tarefa, este desfecho não vale mais
+    # EN: If the lease ran out and another claim took the job, this outcome no longer counts
+    Tarefa.objects.filter(pk=tarefa.pk, estado=EXECUTANDO, trabalhador=tarefa.trabalhador).update(
+        expira_em=None, **campos)
+    tarefa.refresh_from_db()
+    return tarefa
+
+
+def identificador() -> str:
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def trabalhar(tipos=None, parar: threading.Event | None = None, ate_esvaziar: bool = False,
+              ao_terminar: Callable[[Tarefa, float], None] | None = None) -> int:
+    """PT: Laço de um trabalhador: reserva, executa e repete até `parar` (ou, com `ate_esvaziar`,
+    até não haver tarefa pronta). Devolve quantas tarefas executou.
+    EN: Worker loop: claims, runs and repeats until `parar` (or, with `ate_esvaziar`, until
+    no job is ready). Returns how many jobs it ran.
+    """
+    parar = parar or threading.Event()
+    trabalhador = identificador()
+    executadas, proxima_recuperacao = 0, 0.0
+    while not parar.is_set():
+        close_old_connections()
+        if time.monotonic() >= proxima_recuperacao:
+            recuperar_expiradas()
+            limpar_arquivos()
+            proxima_recuperacao = time.monotonic() + settings.ESCOLA_TAREFAS_PRAZO / 3
+        tarefa = reservar(trabalhador, tipos)
+        if tarefa is None:
+            if ate_esvaziar:
+                break
+            parar.wait(settings.ESCOLA_TAREFAS_INTERVALO)
+            continue
+        inicio = time.perf_counter()
+        executar(tarefa)
+        executadas += 1
+        if ao_terminar:
+            ao_terminar(tarefa, time.perf_counter() - inicio)
+    return executadas
+
+
+# PT: Tipos de tarefa | EN: Job types
+
+def _comando(nome: str, **opcoes) -> dict:
+    saida = StringIO()
+    call_command(nome, stdout=saida, **opcoes)
+    return {'saida': saida.getvalue().strip()}
+
+
+def _ids(parametros: dict, campo: str) -> list[int] | None:
+    valor = parametros.get(campo)
+    if valor is not None and not (isinstance(valor, list) and all(isinstance(pk, int) for pk in valor)):
+        raise TarefaInvalida(f'{campo}: informe uma lista de ids.')
+    return valor
+
+
+@tipo('reconstruir_resumos', permissoes=('escola.change_curso',))
+def _reconstruir_resumos(tarefa):
+    """PT: {"cursos": [ids]} opcional. EN: Optional {"cursos": [ids]}."""
+    return {'resumos': resumo.atualizar_resumos(_ids(tarefa.parametros, 'cursos'))}
+
+
+@tipo('exportar_notas', limite=2, permissoes=())
+def _exportar_notas(tarefa):
+    """PT: CSV de `/notas/export/` gravado em arquivo ({"curso"|"estudante": id} filtram); baixe em
+    `/tarefas/{id}/arquivo/`.
+    EN: `/notas/export/` CSV written to a file ({"curso"|"estudante": id} filter); download it at
+    `/tarefas/{id}/arquivo/`.
+    """
+    filtros = {}
+    for campo in ('curso', 'estudante'):
+        valor = tarefa.parametros.get(campo)
+        if valor is not None:
+            if not isinstance(valor, int):
+                raise TarefaInvalida(f'{campo}: use o id (número inteiro).')
+            filtros[f'{campo}_id'] = valor
+    pasta = Path(settings.ESCOLA_TAREFAS_ARQUIVOS)
+    pasta.mkdir(parents=True, exist_ok=True)
+    nome = f'tarefa-{tarefa.pk}-notas.csv'
+    parcial = pasta / f'{nome}.parcial'
+    linhas = -1  # PT/EN: sem o cabeçalho | header excluded
+    try:
+        with open(parcial, 'w', encoding='utf-8', newline='') as arquivo:
+            for linha in linhas_csv(Nota.objects.filter(**filtros).order_by('pk'), COLUNAS_NOTAS):
+                arquivo.write(linha)
+                linhas += 1
+    except BaseException:
+        parcial.unlink(missing_ok=True)
+        raise
+    # PT: Só aparece completo (uma nova tentativa sobrescreve) | EN: Only shows up complete (a retry overwrites it)
+    os.replace(parcial, pasta / nome)
+    return {'arquivo': nome, 'linhas': linhas}
+
+
+@tipo('importar_matriculas', permissoes=('escola.add_matricula', 'escola.change_matricula'))
+def _importar_matriculas(tarefa):
+    """PT: {"itens": [{estudante, curso, periodo}]} pelo upsert de `/matriculas/upsert/`, sem limite de itens.
+    EN: {"itens": [{estudante, curso, periodo}]} through the `/matriculas/upsert/` upsert, no item limit.
+    """
+    entrada = MatriculaUpsertSerializer(data=tarefa.parametros.get('itens'), many=True)
+    if not entrada.is_valid():
+        raise TarefaInvalida(f'itens: {json.dumps(entrada.errors, ensure_ascii=False)}')
+    resultado = matriculas.upsert([
+        Matricula(estudante_id=dados['estudante'], curso_id=dados['curso'], periodo=dados['periodo'])
+        for dados in entrada.validated_data
+    ])
+    return {chave: len(lista) for chave, lista in resultado.items()}
+
+
+@tipo('compactar_alteracoes')
+def _compactar_alteracoes(tarefa):
+    """PT: {"dias": 30} opcional. EN: Optional {"dias": 30}."""
+    dias = tarefa.parametros.get('dias', 30)
+    if not isinstance(dias, int) or dias < 0:
+        raise TarefaInvalida('dias: use um inteiro >= 0.')
+    return _comando('compactar_alteracoes', dias=dias)
+
+
+@tipo('seed_escola')
+def _seed_escola(tarefa):
+    return _comando('seed_escola')
+
+
+@tipo('bootstrap_roles')
+def _bootstrap_roles(tarefa):
+    return _comando('bootstrap_roles')
@@ -1,3 +1,1042 @@
-from django.test import TestCase
+import asyncio
+import csv
+import datetime
+import gzip
+import importlib
+import io
+import json
+import math
+import os
+import shutil
+import tempfile
+import time
+from decimal import Decimal
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connection, connections, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+
+from escola import alteracoes, authentication, banco, eventos, resumo, tarefas
+from escola.leitura import mapeador_para
+from escola.management.commands import bench_api
+from escola.exportacao import COLUNAS_NOTAS
+from escola.middleware import CompressaoMiddleware, aceita, brotli
+from escola.models import Alteracao, Curso, Estudante, Matricula, Nota, Professor, ResumoCurso, Tarefa
+from escola.renderers import FastJSONRenderer, colunar
+from escola.serializers import CursoSerializer, ListaMatriculasEstudanteSerializer, NotaSerializer
+from escola.throttling import ScopedTokenBucketThrottle, TokenBucketThrottle
+from setup.testes import CACHES_TESTE
+
+# PT: Um segundo SQLite faz o papel de réplica: os mesmos registros com outro conteúdo
+#     mostram de qual banco cada resposta veio. Com DATABASE_REPLICA_URLS a réplica
+#     configurada é usada no lugar.
+# EN: A second SQLite plays the replica: the same rows with different content show
+#     which database each response came from. With DATABASE_REPLICA_URLS the
+#     configured replica is used instead.
+if settings.ESCOLA_REPLICAS:
+    REPLICA = settings.ESCOLA_REPLICAS[0]
+else:
+    REPLICA = 'replica_teste'
+    _padrao = connections.settings[DEFAULT_DB_ALIAS]
+    settings.DATABASES[REPLICA] = {
+        **_padrao,
+        'NAME': f"{_padrao['NAME']}_replica",
+        'TEST': {**_padrao['TEST'], 'NAME': None, 'MIRROR': None},
+    }
+
+
+def _limpar_caches():
+    """PT: Zera todos os caches, inclusive o balde do throttling. EN: Clears every cache, throttling bucket included."""
+    for alias in settings.CACHES:
+        caches[alias].clear()
+
+
+def _popular(quantidade, inicio=0):
+    """PT: Estudante, curso, matrícula, nota e professor por número. EN: One of each per number."""
+    for numero in range(inicio, inicio + quantidade):
+        estudante = Estudante.objects.create(nome=f'Estudante {numero}', email=f'e{numero}@example.com',
+                                             cpf=f'{numero:011d}', data_nascimento=datetime.date(2000, 1, 1),
+                                             celular='11 99999-9999')
+        curso = Curso.objects.create(codigo=f'C{numero}', descricao=f'Curso {numero}')
+        Matricula.objects.create(estudante=estudante, curso=curso)
+        Nota.objects.create(estudante=estudante, curso=curso, valor=8, data=datetime.date(2024, 1, 1))
+        Professor.objects.create(nome=f'Professor {numero}', email=f'p{numero}@example.com').cursos.add(curso)
+
+
+@override_settings(
+    ESCOLA_REPLICAS=[REPLICA],
+    CACHES=CACHES_TESTE,
+)
+class RoteadorReplicasTests(TransactionTestCase):
+    # PT: TransactionTestCase: dentro do atomic do TestCase toda leitura ficaria no primário
+    # EN: TransactionTestCase: inside TestCase's atomic every read would stay on the primary
+    databases = '__all__'
+
+    def setUp(self):
+        banco._atrasos.clear()
+        Curso.objects.bulk_create([Curso(pk=1, codigo='C1', descricao='primario')])
+        Curso.objects.using(REPLICA).bulk_create([Curso(pk=1, codigo='C1', descricao='replica')])
+        usuario = User.objects.create_superuser('admin', 'admin@example.com', 'senha')
+        self.token = Token.objects.create(user=usuario).key
+
+    def _descricao(self, **cabecalhos):
+        resposta = self.client.get('/cursos/1/', headers=cabecalhos)
+        self.assertEqual(resposta.status_code, 200)
+        return resposta.json()['descricao']
+
+    def test_get_le_da_replica(self):
+        self.assertEqual(self._descricao(), 'replica')
+
+    def test_escrita_vai_para_o_primario(self):
+        resposta = self.client.post('/cursos/', {'codigo': 'C2', 'descricao': 'novo', 'nivel': 'B'},
+                                    headers={'Authorization': f'Token {self.token}'})
+        self.assertEqual(resposta.status_code, 201)
+        self.assertTrue(Curso.objects.filter(codigo='C2').exists())
+        self.assertFalse(Curso.objects.using(REPLICA).filter(codigo='C2').exists())
+
+    def test_quem_escreveu_le_do_primario(self):
+        autorizacao = {'Authorization': f'Token {self.token}'}
+        resposta = self.client.patch('/cursos/1/', {'descricao': 'editado'}, content_type='application/json',
+                                     headers=autorizacao)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(self._descricao(**autorizacao), 'editado')
+        # PT/EN: Outros clientes seguem na réplica | other clients stay on the replica
+        self.assertEqual(self._descricao(), 'replica')
+
+    def test_fixacao_expira(self):
+        autorizacao = {'Authorization': f'Token {self.token}'}
+        with self.settings(ESCOLA_REPLICA_FIXACAO=0.05):
+            self.client.patch('/cursos/1/', {'descricao': 'editado'}, content_type='application/json',
+                              headers=autorizacao)
+        time.sleep(0.1)
+        self.assertEqual(self._descricao(**autorizacao), 'replica')
+
+    def test_replica_atrasada_cai_no_primario(self):
+        with mock.patch('escola.banco.medir_atraso', return_value=settings.ESCOLA_REPLICA_ATRASO_MAX + 1):
+            self.assertEqual(self._descricao(), 'primario')
+
+    def test_replica_fora_do_ar_cai_no_primario(self):
+        with mock.patch('escola.banco.medir_atraso', return_value=math.inf):
+            self.assertEqual(self._descricao(), 'primario')
+
+    def test_atraso_medido_com_intervalo(self):
+        with mock.patch('escola.banco.medir_atraso', return_value=0.0) as medir:
+            for _ in range(3):
+                self._descricao()
+        self.assertEqual(medir.call_count, 1)
+
+    def test_outros_modelos_ficam_fora_da_replica(self):
+        with self.settings(ESCOLA_REPLICA_MODELOS={'estudante'}):
+            self.assertEqual(self._descricao(), 'primario')
+
+
+@override_settings(CACHES=CACHES_TESTE)
+class TokenEmCacheTests(TestCase):
+    # PT: Uma geração descartada pelo cache não pode reviver entradas de antes da invalidação
+    # EN: A generation culled by the cache must not revive entries from before the invalidation
+    def setUp(self):
+        cache.clear()
+        self.usuario = User.objects.create_superuser('admin', 'admin@example.com', 'senha')
+        self.cabecalhos = {'Authorization': f'Token {Token.objects.create(user=self.usuario).key}'}
+
+    def test_geracao_descartada_nao_ressuscita_usuario(self):
+        cache.delete(authentication.CHAVE_GERACAO)
+        self.assertEqual(self.client.get('/cursos/', headers=self.cabecalhos).status_code, 200)
+        self.usuario.is_active = False
+        self.usuario.save()
+        self.assertEqual(self.client.get('/cursos/', headers=self.cabecalhos).status_code, 401)
+        cache.delete(authentication.CHAVE_GERACAO)
+        self.assertEqual(self.client.get('/cursos/', headers=self.cabecalhos).status_code, 401)
+
+    def test_acerto_nao_consulta_o_banco(self):
+        autenticacao = authentication.CachedTokenAuthentication()
+        key = self.cabecalhos['Authorization'].split()[1]
+        autenticacao.authenticate_credentials(key)
+        with self.assertNumQueries(0):
+            usuario, _ = autenticacao.authenticate_credentials(key)
+            self.assertTrue(usuario.has_perm('escola.view_curso'))
+        self.assertEqual(usuario, self.usuario)
+        # PT/EN: Sem a opção, nenhum contador é gravado | counters are off by default
+        self.assertIsNone(cache.get(authentication.CHAVE_ACERTOS))
+
+    def test_excluir_token_invalida_o_cache(self):
+        self.assertEqual(self.client.get('/cursos/', headers=self.cabecalhos).status_code, 200)
+        Token.objects.get(user=self.usuario).delete()
+        self.assertEqual(self.client.get('/cursos/', headers=self.cabecalhos).status_code, 401)
+
+    @override_settings(ESCOLA_AUTH_ESTATISTICAS=True)
+    def test_contadores_com_a_opcao(self):
+        for _ in range(3):
+            self.client.get('/cursos/', headers=self.cabecalhos)
+        self.assertEqual(authentication.estatisticas()['acertos'], 2)
+        self.assertEqual(authentication.estatisticas()['falhas'], 1)
+
+
+class AdminEscalaTests(TestCase):
+    # PT: Listas e formulários do admin cujo número de consultas não pode crescer com as tabelas
+    # EN: Admin lists and forms whose query count must not grow with the tables
+    URLS = [
+        '/admin/escola/estudante/', '/admin/escola/curso/', '/admin/escola/matricula/',
+        '/admin/escola/professor/', '/admin/escola/nota/', '/admin/escola/matricula/add/',
+        '/admin/escola/nota/add/', '/admin/escola/professor/add/',
+    ]
+    ORCAMENTO = 6
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_superuser('admin', 'admin@example.com', 'senha')
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def _consultas(self, url):
+        with CaptureQueriesContext(connection) as contexto:
+            resposta = self.client.get(url)
+        self.assertEqual(resposta.status_code, 200)
+        return [consulta['sql'] for consulta in contexto.captured_queries]
+
+    def test_consultas_nao_crescem_com_as_tabelas(self):
+        _popular(3)
+        for url in self.URLS:
+            # PT/EN: Aquece caches por processo (ContentType etc.) | warms per-process caches (ContentType etc.)
+            self._consultas(url)
+        antes = {url: len(self._consultas(url)) for url in self.URLS}
+        _popular(20, inicio=3)
+        for url in self.URLS:
+            with self.subTest(url=url):
+                consultas = len(self._consultas(url))
+                self.assertEqual(consultas, antes[url])
+                self.assertLessEqual(consultas, self.ORCAMENTO)
+
+    def test_formularios_usam_autocomplete(self):
+        _popular(3)
+        for url in ('/admin/escola/matricula/add/', '/admin/escola/nota/add/', '/admin/escola/professor/add/'):
+            with self.subTest(url=url):
+                resposta = self.client.get(url)
+                self.assertContains(resposta, 'admin-autocomplete')
+                self.assertNotContains(resposta, 'Estudante 0')
+                self.assertNotContains(resposta, '>C0<')
+
+    @override_settings(ESCOLA_ADMIN_CONTAGEM_EXATA=5)
+    def test_lista_grande_usa_contagem_estimada(self):
+        _popular(8)
+        consultas = self._consultas('/admin/escola/matricula/')
+        self.assertFalse([sql for sql in consultas if 'COUNT(' in sql.upper()])
+        self.assertEqual(self.client.get('/admin/escola/matricula/').context['cl'].result_count,
+                         Matricula.objects.order_by('-pk').values_list('pk', flat=True).first())
+
+    @override_settings(ESCOLA_ADMIN_CONTAGEM_EXATA=5)
+    def test_busca_conta_com_limite(self):
+        _popular(8)
+        resposta = self.client.get('/admin/escola/estudante/', {'q': 'estudante'})
+        self.assertEqual(resposta.context['cl'].result_count, 6)
+
+    def test_busca_ignora_maiusculas(self):
+        _popular(3)
+        for url, termo, esperados in (('/admin/escola/estudante/', 'E2@EXAMPLE.COM', ['Estudante 2']),
+                                      ('/admin/escola/estudante/', '"estudante 1"', ['Estudante 1']),
+                                      ('/admin/escola/curso/', 'c0', ['C0']),
+                                      ('/admin/escola/matricula/', '"ESTUDANTE 0"', ['Estudante 0'])):
+            with self.subTest(url=url, termo=termo):
+                resposta = self.client.get(url, {'q': termo})
+                linhas = resposta.context['cl'].result_list
+                self.assertEqual([str(getattr(linha, 'estudante', linha)) for linha in linhas], esperados)
+
+    def test_indices_funcionais_so_no_postgres(self):
+        migracao = importlib.import_module('escola.migrations.0009_indices_busca_maiusculas')
+        for vendor, criados in (('sqlite', 0), ('postgresql', len(migracao.INDICES))):
+            with self.subTest(vendor=vendor):
+                editor = mock.Mock(connection=mock.Mock(vendor=vendor))
+                migracao.criar_indices(None, editor)
+                self.assertEqual(editor.execute.call_count, criados)
+        self.assertIn('ON "escola_estudante" (UPPER("nome") text_pattern_ops)', editor.execute.call_args_list[0].args[0])
+
+    def test_lista_pequena_conta_de_verdade(self):
+        _popular(3)
+        Matricula.objects.filter(pk=Matricula.objects.order_by('pk').values_list('pk', flat=True).first()).delete()
+        resposta = self.client.get('/admin/escola/matricula/')
+        self.assertEqual(resposta.context['cl'].result_count, 2)
+
+
+class RenderizadoresTests(SimpleTestCase):
+    # PT: orjson e o formato colunar têm que devolver o mesmo JSON que o DRF
+    # EN: orjson and the columnar format must return the same JSON as DRF
+    def test_fast_json_igual_ao_drf(self):
+        dados = {'valor': Decimal('8.50'), 'data': datetime.date(2024, 1, 2), 'texto': 'a\u2028b', 1: [None, True]}
+        self.assertEqual(json.loads(FastJSONRenderer().render(dados)), json.loads(JSONRenderer().render(dados)))
+        self.assertIn(b'\\u2028', FastJSONRenderer().render(dados))
+        # PT/EN: Inteiro fora de 64 bits cai no encoder do DRF | >64-bit integer falls back to DRF's encoder
+        self.assertEqual(FastJSONRenderer().render({'n': 2 ** 70}), JSONRenderer().render({'n': 2 ** 70}))
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_colunar(self):
+        linhas = [{'id': 1, 'codigo': 'C1'}, {'id': 2, 'codigo': 'C2'}]
+        self.assertEqual(colunar(linhas), {'columns': ['id', 'codigo'], 'rows': [[1, 'C1'], [2, 'C2']]})
+        paginada = colunar({'count': 2, 'next': None, 'previous': None, 'results': linhas})
+        self.assertEqual((paginada['count'], paginada['rows']), (2, [[1, 'C1'], [2, 'C2']]))
+        self.assertEqual(colunar([]), {'columns': [], 'rows': []})
+        self.assertEqual(colunar({'detail': 'x'}), {'detail': 'x'})
+
+
+@override_settings(ESCOLA_COMPRESSAO_MIN_BYTES=100)
+class CompressaoMiddlewareTests(SimpleTestCase):
+    # PT: Brotli/GZip só acima do limite, e nunca em streams de eventos
+    # EN: Brotli/GZip only above the threshold, and never on event streams
+    CORPO = b'{"nome": "estudante"}' * 50
+
+    def _processar(self, resposta, accept_encoding='gzip, br'):
+        requisicao = RequestFactory().get('/', headers={'Accept-Encoding': accept_encoding})
+        return CompressaoMiddleware(lambda r: resposta)(requisicao)
+
+    def test_resposta_pequena_nao_e_comprimida(self):
+        resposta = self._processar(HttpResponse(b'{}', content_type='application/json'))
+        self.assertFalse(resposta.has_header('Content-Encoding'))
+
+    @skipUnless(brotli, 'brotli não instalado | brotli not installed')
+    def test_prefere_brotli(self):
+        resposta = self._processar(HttpResponse(self.CORPO, content_type='application/json', headers={'ETag': '"v1"'}))
+        self.assertEqual(resposta['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(resposta.content), self.CORPO)
+        self.assertEqual(resposta['Content-Length'], str(len(resposta.content)))
+        self.assertEqual(resposta['ETag'], 'W/"v1"')
+        self.assertIn('Accept-Encoding', resposta['Vary'])
+
+    def test_gzip_quando_brotli_recusado(self):
+        resposta = self._processar(HttpResponse(self.CORPO, content_type='application/json'), 'gzip, br;q=0')
+        self.assertEqual(resposta['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(resposta.content), self.CORPO)
+
+    def test_stream_de_eventos_nunca_e_comprimido(self):
+        resposta = self._processar(StreamingHttpResponse(iter([self.CORPO]), content_type='text/event-stream'))
+        self.assertFalse(resposta.has_header('Content-Encoding'))
+        self.assertEqual(b''.join(resposta.streaming_content), self.CORPO)
+
+    def test_aceita(self):
+        self.assertTrue(aceita('gzip, br', 'br'))
+        self.assertFalse(aceita('gzip, br;q=0', 'br'))
+        self.assertTrue(aceita('br; q=0.5', 'br'))
+        self.assertFalse(aceita('gzip', 'br'))
+
+
+class ProjecaoTests(TestCase):
+    # PT: `?fields=` / `?exclude=` cortam a resposta e também as colunas do SELECT
+    # EN: `?fields=` / `?exclude=` trim the response and the SELECT columns too
+    @classmethod
+    def setUpTestData(cls):
+        _popular(3)
+        cls.token = Token.objects.create(user=User.objects.create_superuser('admin', 'admin@example.com', 'senha'))
+
+    def setUp(self):
+        _limpar_caches()  # PT/EN: Throttling zerado por teste | fresh throttling per test
+
+    def _get(self, url):
+        with CaptureQueriesContext(connection) as contexto:
+            resposta = self.client.get(url, headers={'Authorization': f'Token {self.token.key}'})
+        # PT/EN: Só as consultas da lista (sem autenticação) | only the list's queries (no authentication)
+        return resposta, ' '.join(consulta['sql'] for consulta in contexto.captured_queries
+                                  if '"escola_' in consulta['sql'])
+
+    def test_fields_e_exclude(self):
+        for rapida in (True, False):
+            with self.subTest(rapida=rapida), self.settings(ESCOLA_LEITURA_RAPIDA=rapida):
+                resposta, sql = self._get('/estudantes/?fields=id,nome')
+                self.assertEqual(set(resposta.json()['results'][0]), {'id', 'nome'})
+                self.assertNotIn('"email"', sql)
+                resposta, sql = self._get('/estudantes/?exclude=cpf,celular')
+                self.assertEqual(set(resposta.json()['results'][0]), {'id', 'nome', 'email', 'data_nascimento'})
+                self.assertNotIn('"cpf"', sql)
+
+    def test_relacao_lida_sem_n_mais_1(self):
+        _, antes = self._get('/notas/?fields=id,estudante_nome')
+        _popular(5, inicio=3)
+        resposta, depois = self._get('/notas/?fields=id,estudante_nome')
+        self.assertEqual(len(resposta.json()['results']), 8)
+        self.assertEqual(antes.count('SELECT'), depois.count('SELECT'))
+        self.assertNotIn('"escola_nota"."curso_id"', depois)
+
+    def test_campo_desconhecido_devolve_400(self):
+        resposta, _ = self._get('/estudantes/?fields=id,senha')
+        self.assertEqual(resposta.status_code, 400)
+        self.assertIn('senha', str(resposta.json()))
+
+    def test_escrita_usa_o_serializer_completo(self):
+        resposta = self.client.post('/cursos/?fields=id', {'codigo': 'NOVO', 'descricao': 'Novo curso', 'nivel': 'B'},
+                                    headers={'Authorization': f'Token {self.token.key}'})
+        self.assertEqual(resposta.status_code, 201)
+        self.assertEqual(resposta.json()['descricao'], 'Novo curso')
+
+
+class LeituraRapidaTests(TestCase):
+    # PT: O mapeador compilado tem que devolver exatamente o mesmo JSON do serializer
+    # EN: The compiled mapper must return exactly the same JSON as the serializer
+    @classmethod
+    def setUpTestData(cls):
+        _popular(4)
+        Matricula.objects.filter(pk=Matricula.objects.order_by('pk')[0].pk).update(periodo='N')
+        Nota.objects.update(valor=Decimal('7.25'))
+        cls.token = Token.objects.create(user=User.objects.create_superuser('admin', 'admin@example.com', 'senha'))
+        estudante, curso = Estudante.objects.order_by('pk')[0].pk, Curso.objects.order_by('pk')[0].pk
+        cls.urls = [
+            '/estudantes/', '/cursos/', '/matriculas/', '/professores/', '/notas/', '/notas/?format=columns',
+            f'/estudantes/{estudante}/matriculas/', f'/cursos/{curso}/matriculas/',
+            f'/estudantes/{estudante}/notas/', f'/cursos/{curso}/notas/',
+            '/notas/?fields=id,valor,data', '/matriculas/?exclude=estudante',
+        ]
+
+    def setUp(self):
+        _limpar_caches()  # PT/EN: Throttling zerado por teste | fresh throttling per test
+
+    def _json(self, url, rapida):
+        with self.settings(ESCOLA_LEITURA_RAPIDA=rapida):
+            resposta = self.client.get(url, headers={'Authorization': f'Token {self.token.key}'})
+        self.assertEqual(resposta.status_code, 200, url)
+        return resposta.content
+
+    def test_mesma_saida_do_serializer(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertEqual(self._json(url, True), self._json(url, False))
+
+    def test_o_que_compila(self):
+        self.assertIsNotNone(mapeador_para(NotaSerializer()))
+        self.assertIsNotNone(mapeador_para(ListaMatriculasEstudanteSerializer()))
+        # PT/EN: Muitos-para-muitos segue pelo DRF | many-to-many stays on DRF
+        self.assertIsNone(mapeador_para(CursoSerializer()))
+
+
+class BatchTests(TestCase):
+    # PT: Cada item do /batch/ responde como o GET direto; erros ficam no item
+    # EN: Each /batch/ item answers like the direct GET; errors stay in the item
+    @classmethod
+    def setUpTestData(cls):
+        _popular(2)
+        cls.token = Token.objects.create(user=User.objects.create_superuser('admin', 'admin@example.com', 'senha'))
+
+    def setUp(self):
+        _limpar_caches()  # PT/EN: Throttling zerado por teste | fresh throttling per test
+        self.cabecalhos = {'Authorization': f'Token {self.token.key}'}
+
+    def _lote(self, itens):
+        resposta = self.client.post('/batch/', {'requests': itens}, content_type='application/json',
+                                    headers=self.cabecalhos)
+        self.assertEqual(resposta.status_code, 200)
+        return resposta.json()['responses']
+
+    def test_itens_iguais_ao_get_direto(self):
+        respostas = self._lote([{'path': '/cursos/'}, {'path': 'estudantes/', 'params': {'fields': 'id,nome'}}])
+        self.assertEqual(respostas[0], {'status': 200, 'body': self.client.get('/cursos/', headers=self.cabecalhos).json()})
+        self.assertEqual(respostas[1]['body'],
+                         self.client.get('/estudantes/?fields=id,nome', headers=self.cabecalhos).json())
+
+    def test_itens_invalidos(self):
+        respostas = self._lote([
+            {'path': '/cursos/', 'params': ['page', 2]},
+            {'path': '/cursos/', 'params': 'page=2'},
+            {'params': {}},
+            {'path': '/inexistente/'},
+            {'path': '/batch/'},
+            {'path': '/cursos/'},
+        ])
+        self.assertEqual([r['status'] for r in respostas], [400, 400, 400, 404, 400, 200])
+
+    def test_resposta_em_stream_e_fechada(self):
+        class Linhas:
+            fechado = False
+
+            def __iter__(self):
+                yield 'id\n'
+
+            def close(self):
+                Linhas.fechado = True
+
+        with mock.patch('escola.exportacao.linhas_csv', lambda *args: Linhas()):
+            respostas = self._lote([{'path': '/notas/export/'}])
+        self.assertEqual(respostas[0]['status'], 400)
+        self.assertTrue(Linhas.fechado)
+
+    def test_corpo_invalido(self):
+        for corpo in ({}, {'requests': []}, {'requests': [{'path': '/cursos/'}] * 1000}, ['x']):
+            with self.subTest(corpo=corpo):
+                resposta = self.client.post('/batch/', corpo, content_type='application/json', headers=self.cabecalhos)
+                self.assertEqual(resposta.status_code, 400)
+
+
+class OrdemAlteracoesTests(TestCase):
+    # PT: No Postgres a trava vem antes da escrita da linha e dura até o COMMIT
+    # EN: On Postgres the lock comes before the row write and lasts until COMMIT
+    def test_trava_antes_da_escrita_no_postgres(self):
+        ordem = []
+        conexao = mock.MagicMock(vendor='postgresql', in_atomic_block=True)
+        conexao.cursor.return_value.__enter__.return_value.execute.side_effect = \
+            lambda sql, params: ordem.append(sql.split('(')[0])
+
+        def registrar_sql(execute, sql, params, many, context):
+            ordem.append(' '.join(sql.split()[:3:2]))
+            return execute(sql, params, many, context)
+
+        with mock.patch.object(alteracoes, 'connections', {'default': conexao}), \
+                connection.execute_wrapper(registrar_sql), transaction.atomic():
+            Curso.objects.create(codigo='C1', descricao='Curso')
+        self.assertEqual([passo for passo in ordem if not passo.startswith(('SAVEPOINT', 'RELEASE'))], [
+            'SELECT pg_advisory_xact_lock', 'INSERT "escola_curso"',
+            'SELECT pg_advisory_xact_lock', 'INSERT "escola_alteracao"',
+        ])
+
+    def test_sqlite_nao_precisa_de_trava(self):
+        with CaptureQueriesContext(connection) as contexto:
+            Curso.objects.create(codigo='C1', descricao='Curso')
+        self.assertNotIn('advisory', ' '.join(c['sql'] for c in contexto.captured_queries))
+        self.assertEqual(Alteracao.objects.get().operacao, alteracoes.CRIACAO)
+
+
+@override_settings(ESCOLA_SSE_FILA=3, ESCOLA_SSE_INTERVALO=0.01, ESCOLA_SSE_PING=5, ESCOLA_SSE_DURACAO=5)
+class StreamNotasTests(TransactionTestCase):
+    # PT: Caminho ASGI do SSE: reenvio pelo Last-Event-ID, reset e entrega ao vivo pelo poller
+    # EN: ASGI SSE path: replay from Last-Event-ID, reset and live delivery through the poller
+    def setUp(self):
+        _popular(1)
+        self.curso, self.estudante = Curso.objects.get(), Estudante.objects.get()
+
+    def _notas(self, quantidade):
+        for numero in range(quantidade):
+            Nota.objects.create(estudante=self.estudante, curso=self.curso, valor=numero,
+                                avaliacao=f'Prova {Nota.objects.count()}', data=datetime.date(2024, 2, 1))
+        return list(Alteracao.objects.filter(modelo='nota').order_by('seq').values_list('seq', flat=True))
+
+    def _ler(self, desde, quantos, antes_de_ler=None):
+        async def ler():
+            stream = eventos._stream_async(self.curso.pk, desde)
+            try:
+                quadros = [await anext(stream)]
+                if antes_de_ler:
+                    await sync_to_async(antes_de_ler)()
+                while len(quadros) < quantos:
+                    quadros.append(await asyncio.wait_for(anext(stream), 5))
+                return quadros
+            finally:
+                await stream.aclose()
+        return asyncio.run(ler())
+
+    def test_reenvia_o_que_o_cliente_perdeu(self):
+        seqs = self._notas(1)
+        quadros = self._ler(seqs[0] - 1, 3)
+        self.assertEqual([q.split('\n')[0] for q in quadros],
+                         [f'id: {seqs[0]}', f'id: {seqs[1]}', 'retry: 3000'])
+        self.assertIn(f'"seq": {Alteracao.objects.latest("seq").seq}', quadros[-1])
+
+    def test_atraso_grande_pede_reset(self):
+        seqs = self._notas(3)
+        self.assertEqual(self._ler(seqs[0] - 1, 1), [eventos.RESET])
+
+    def test_entrega_ao_vivo_pelo_poller(self):
+        quadros = self._ler(None, 2, antes_de_ler=lambda: self._notas(1))
+        self.assertIn('event: hello', quadros[0])
+        self.assertIn('event: nota', quadros[1])
+        self.assertIn('"valor": "0.00"', quadros[1])
+
+    def test_fila_cheia_vira_reset(self):
+        quadros = self._ler(None, 2, antes_de_ler=lambda: self._notas(4))
+        self.assertEqual(quadros[1], eventos.RESET)
+
+
+class PerfilEstudanteTests(TestCase):
+    # PT: `/estudantes/{pk}/perfil/`: só autenticado, 4 consultas com qualquer histórico e cache invalidado
+    # EN: `/estudantes/{pk}/perfil/`: authenticated only, 4 queries for any history and an invalidated cache
+    @classmethod
+    def setUpTestData(cls):
+        _popular(3)
+        cls.estudante = Estudante.objects.order_by('pk').first()
+        cls.url = f'/estudantes/{cls.estudante.pk}/perfil/'
+        cls.token = Token.objects.create(user=User.objects.create_superuser('admin', 'admin@example.com', 'senha'))
+
+    def setUp(self):
+        _limpar_caches()
+        self.cabecalhos = {'Authorization': f'Token {self.token.key}'}
+        # PT/EN: Aquece o cache de tokens: só as consultas do perfil contam | warm the token cache
+        authentication.CachedTokenAuthentication().authenticate_credentials(self.token.key)
+
+    def _perfil(self):
+        resposta = self.client.get(self.url, headers=self.cabecalhos)
+        self.assertEqual(resposta.status_code, 200)
+        return resposta.json()
+
+    def _matricular(self, curso):
+        Matricula.objects.create(estudante=self.estudante, curso=curso)
+        Nota.objects.create(estudante=self.estudante, curso=curso, valor=6, data=datetime.date(2024, 2, 1))
+        Professor.objects.create(nome=f'Prof {curso.codigo}', email='p@example.com').cursos.add(curso)
+
+    def test_exige_autenticacao(self):
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_quatro_consultas_com_qualquer_historico(self):
+        with self.assertNumQueries(4):
+            self._perfil()
+        with self.assertNumQueries(0):
+            self._perfil()
+        for curso in Curso.objects.exclude(matricula__estudante=self.estudante):
+            self._matricular(curso)
+        with self.assertNumQueries(4):
+            perfil = self._perfil()
+        self.assertEqual(len(perfil['matriculas']), 3)
+        self.assertEqual(len(perfil['notas_por_curso']), 3)
+
+    def test_nota_e_matricula_invalidam_o_cache(self):
+        curso = Curso.objects.get(matricula__estudante=self.estudante)
+        self.assertEqual(self._perfil()['notas_por_curso'][0]['media'], '8.00')
+        Nota.objects.create(estudante=self.estudante, curso=curso, valor=6, data=datetime.date(2024, 2, 1))
+        self.assertEqual(self._perfil()['notas_por_curso'][0]['media'], '7.00')
+        Matricula.objects.filter(estudante=self.estudante).delete()
+        self.assertEqual(self._perfil()['matriculas'], [])
+
+
+class ExportacaoNotasTests(TestCase):
+    # PT: `/notas/export/`: CSV por streaming com cabeçalho, filtros validados e escopo `export`
+    # EN: `/notas/export/`: streamed CSV with a header, validated filters and the `export` scope
+    @classmethod
+    def setUpTestData(cls):
+        _popular(3)
+        cls.notas = list(Nota.objects.select_related('estudante', 'curso').order_by('pk'))
+        cls.token = Token.objects.create(user=User.objects.create_user('leitor', 'leitor@example.com', 'senha'))
+
+    def setUp(self):
+        _limpar_caches()
+        self.cabecalhos = {'Authorization': f'Token {self.token.key}'}
+
+    def _csv(self, consulta=''):
+        resposta = self.client.get(f'/notas/export/{consulta}', headers=self.cabecalhos)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta['Content-Disposition'], 'attachment; filename="notas.csv"')
+        return list(csv.reader(io.StringIO(b''.join(resposta.streaming_content).decode())))
+
+    def test_cabecalho_e_linhas(self):
+        cabecalho, *linhas = self._csv()
+        self.assertEqual(cabecalho, [coluna for coluna, _ in COLUNAS_NOTAS])
+        nota = self.notas[0]
+        self.assertEqual(linhas[0], [str(nota.pk), str(nota.estudante_id), nota.estudante.nome, str(nota.curso_id),
+                                     nota.curso.codigo, nota.avaliacao, '2024-01-01', '8.00'])
+        self.assertEqual([int(linha[0]) for linha in linhas], [n.pk for n in self.notas])
+
+    def test_filtros(self):
+        nota = self.notas[1]
+        self.assertEqual([linha[0] for linha in self._csv(f'?curso={nota.curso_id}')[1:]], [str(nota.pk)])
+        self.assertEqual([linha[0] for linha in self._csv(f'?estudante={nota.estudante_id}')[1:]], [str(nota.pk)])
+        self.assertEqual(self._csv(f'?curso={nota.curso_id}&estudante={self.notas[0].estudante_id}')[1:], [])
+
+    def test_ids_nao_numericos(self):
+        for consulta, campo in (('?curso=abc', 'curso'), ('?estudante=1%3B', 'estudante')):
+            resposta = self.client.get(f'/notas/export/{consulta}', headers=self.cabecalhos)
+            self.assertEqual(resposta.status_code, 400)
+            self.assertIn(campo, resposta.json())
+
+    def test_exige_autenticacao(self):
+        self.assertEqual(self.client.get('/notas/export/').status_code, 401)
+
+    def test_escopo_export(self):
+        taxas = {**ScopedTokenBucketThrottle.THROTTLE_RATES, 'export': '1/min'}
+        with mock.patch.object(ScopedTokenBucketThrottle, 'THROTTLE_RATES', taxas):
+            self._csv()
+            self.assertEqual(self.client.get('/notas/export/', headers=self.cabecalhos).status_code, 429)
+            url = f'/estudantes/{self.notas[0].estudante_id}/notas/'
+            self.assertEqual(self.client.get(url, headers=self.cabecalhos).status_code, 200)
+
+
+class ResumoCursoTests(TestCase):
+    # PT: Resumo materializado: upsert, recálculo pelos sinais (um por transação) e `reconstruir_resumos`
+    # EN: Materialized summary: upsert, signal-driven recompute (one per transaction) and `reconstruir_resumos`
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            _popular(3)
+        self.cursos = list(Curso.objects.order_by('pk'))
+        self.estudante = Estudante.objects.order_by('pk').first()
+
+    def test_upsert_atualiza_a_mesma_linha(self):
+        self.assertEqual(resumo.atualizar_resumos(), 3)
+        Nota.objects.filter(curso=self.cursos[0]).update(valor=6)  # PT/EN: sem sinais | no signals
+        self.assertEqual(resumo.atualizar_resumos([self.cursos[0].pk, self.cursos[0].pk]), 1)
+        self.assertEqual(ResumoCurso.objects.count(), 3)
+        self.assertEqual(ResumoCurso.objects.get(curso=self.cursos[0]).media, Decimal('6.00'))
+        self.assertEqual(ResumoCurso.objects.get(curso=self.cursos[1]).media, Decimal('8.00'))
+
+    def test_sinais_recalculam_uma_vez_por_transacao(self):
+        with self.captureOnCommitCallbacks() as callbacks, transaction.atomic():
+            for curso in self.cursos[1:]:
+                Nota.objects.create(estudante=self.estudante, curso=curso, valor=3, avaliacao='Prova 2',
+                                    data=datetime.date(2024, 2, 1))
+            Matricula.objects.create(estudante=self.estudante, curso=self.cursos[1], periodo='N')
+        self.assertEqual(len(callbacks), 1)
+        with CaptureQueriesContext(connection) as contexto:
+            callbacks[0]()
+        self.assertEqual(sum('INSERT INTO "escola_resumocurso"' in c['sql'] for c in contexto.captured_queries), 1)
+
+        resumos = {r.curso_id: r for r in ResumoCurso.objects.all()}
+        self.assertEqual(resumos[self.cursos[1].pk].total_matriculas, 2)
+        self.assertEqual(resumos[self.cursos[1].pk].matriculas_noturno, 1)
+        self.assertEqual(resumos[self.cursos[1].pk].media, Decimal('5.50'))
+        self.assertEqual(resumos[self.cursos[2].pk].total_notas, 2)
+        self.assertEqual(resumos[self.cursos[0].pk].total_notas, 1)
+
+    def test_savepoint_desfeito_nao_perde_o_proximo_agendamento(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            try:
+                with transaction.atomic():
+                    resumo.agendar(self.cursos[0].pk)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            resumo.agendar(self.cursos[1].pk)
+            resumo.agendar(self.cursos[2].pk)
+        self.assertEqual(len(callbacks), 1)
+        with mock.patch.object(resumo, 'atualizar_resumos') as atualizar:
+            callbacks[0]()
+        atualizar.assert_called_once_with({self.cursos[1].pk, self.cursos[2].pk})
+
+    def test_trocar_de_curso_e_professor(self):
+        matricula = Matricula.objects.get(curso=self.cursos[0])
+        professor = Professor.objects.get(cursos=self.cursos[0])
+        with self.captureOnCommitCallbacks(execute=True):
+            matricula.curso = self.cursos[1]
+            matricula.save()
+            professor.nome = 'Ana'
+            professor.save()
+        self.assertEqual(ResumoCurso.objects.get(curso=self.cursos[0]).total_matriculas, 0)
+        self.assertEqual(ResumoCurso.objects.get(curso=self.cursos[1]).total_matriculas, 2)
+        self.assertEqual(ResumoCurso.objects.get(curso=self.cursos[0]).professores,
+                         [{'id': professor.pk, 'nome': 'Ana'}])
+
+    def test_reconstruir_resumos(self):
+        ResumoCurso.objects.all().delete()
+        Nota.objects.filter(curso=self.cursos[2]).update(valor=4)
+        saida = io.StringIO()
+        call_command('reconstruir_resumos', '--curso', str(self.cursos[2].pk), stdout=saida)
+        self.assertIn('1 resumos', saida.getvalue())
+        self.assertEqual(list(ResumoCurso.objects.values_list('curso_id', 'media')),
+                         [(self.cursos[2].pk, Decimal('4.00'))])
+
+        call_command('reconstruir_resumos', stdout=saida)
+        self.assertEqual(ResumoCurso.objects.count(), 3)
+        self.assertEqual(ResumoCurso.objects.get(curso=self.cursos[0]).professores[0]['nome'], 'Professor 0')
+
+
+class UpsertMatriculasTests(TestCase):
+    # PT: `POST /matriculas/upsert/`: repetir não grava; o feed e os resumos acompanham
+    # EN: `POST /matriculas/upsert/`: repeating writes nothing; feed and summaries follow along
+    @classmethod
+    def setUpTestData(cls):
+        with cls.captureOnCommitCallbacks(execute=True):
+            _popular(2)
+        cls.token = Token.objects.create(user=User.objects.create_superuser('admin', 'admin@example.com', 'senha'))
+        cls.estudante = Estudante.objects.order_by('pk').first()
+        cls.cursos = list(Curso.objects.order_by('pk'))
+
+    def setUp(self):
+        _limpar_caches()  # PT/EN: Throttling zerado por teste | fresh throttling per test
+        self.cabecalhos = {'Authorization': f'Token {self.token.key}'}
+
+    def _upsert(self, itens):
+        with self.captureOnCommitCallbacks(execute=True):
+            resposta = self.client.post('/matriculas/upsert/', itens, content_type='application/json',
+                                        headers=self.cabecalhos)
+        self.assertEqual(resposta.status_code, 200)
+        return resposta.json()
+
+    def _feed(self, since):
+        resposta = self.client.get(f'/changes/?since={since}&models=matricula', headers=self.cabecalhos)
+        return [(a['objeto_id'], a['operacao'], a['dados']['periodo']) for a in resposta.json()['results']]
+
+    def test_repetir_o_pedido_nao_grava(self):
+        inicio = eventos.ultimo_seq()
+        itens = [{'estudante': self.estudante.pk, 'curso': self.cursos[0].pk, 'periodo': 'V'},
+                 {'estudante': self.estudante.pk, 'curso': self.cursos[1].pk, 'periodo': 'N'}]
+        corpo = self._upsert(itens)
+        self.assertEqual((corpo['criadas'], corpo['atualizadas'], corpo['inalteradas']), (1, 1, 0))
+        nova, existente = (r['id'] for r in corpo['results'])
+        self.assertEqual(self._feed(inicio), [(nova, 'C', 'N'), (existente, 'U', 'V')])
+        self.assertEqual(ResumoCurso.objects.get(curso=self.cursos[0]).matriculas_vespertino, 1)
+        self.assertEqual(ResumoCurso.objects.get(curso=self.cursos[1]).matriculas_noturno, 1)
+
+        meio = eventos.ultimo_seq()
+        with CaptureQueriesContext(connection) as contexto:
+            corpo = self._upsert(itens)
+        self.assertEqual((corpo['criadas'], corpo['atualizadas'], corpo['inalteradas']), (0, 0, 2))
+        escritas = [c['sql'] for c in contexto.captured_queries
+                    if c['sql'].startswith(('INSERT', 'UPDATE', 'DELETE')) and '"escola_' in c['sql']]
+        self.assertEqual(escritas, [])
+        self.assertEqual(self._feed(meio), [])
+        self.assertEqual(Matricula.objects.filter(estudante=self.estudante).count(), 2)
+
+    def test_par_repetido_vale_o_ultimo(self):
+        corpo = self._upsert([{'estudante': self.estudante.pk, 'curso': self.cursos[1].pk, 'periodo': p}
+                              for p in ('M', 'V', 'N')])
+        self.assertEqual((corpo['criadas'], corpo['atualizadas']), (1, 0))
+        self.assertEqual(Matricula.objects.get(estudante=self.estudante, curso=self.cursos[1]).periodo, 'N')
+
+
+class MigracaoMatriculaUnicaTests(TransactionTestCase):
+    # PT: 0006 mescla as matrículas duplicadas (e registra no feed) antes de criar a restrição única
+    # EN: 0006 merges duplicate enrollments (and records them in the feed) before adding the unique constraint
+    antes = [('escola', '0005_resumocurso')]
+    depois = [('escola', '0006_matricula_unica')]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def _migrar(self, alvo):
+        executor = MigrationExecutor(connection)
+        executor.migrate(alvo)
+        return executor.loader.project_state(alvo).apps
+
+    def test_mescla_duplicadas(self):
+        apps = self._migrar(self.antes)
+        Estudante, Curso, Matricula = (apps.get_model('escola', nome) for nome in ('Estudante', 'Curso', 'Matricula'))
+        estudante = Estudante.objects.create(nome='Ana', email='ana@example.com', cpf='00000000001',
+                                             data_nascimento=datetime.date(2000, 1, 1), celular='11 99999-9999')
+        cursos = [Curso.objects.create(codigo=f'C{numero}', descricao='Curso') for numero in range(2)]
+        mantida, *duplicadas = (Matricula.objects.create(estudante=estudante, curso=cursos[0], periodo=periodo)
+                                for periodo in ('M', 'V', 'N'))
+        unica = Matricula.objects.create(estudante=estudante, curso=cursos[1], periodo='V')
+
+        apps = self._migrar(self.depois)
+        Matricula, Alteracao = apps.get_model('escola', 'Matricula'), apps.get_model('escola', 'Alteracao')
+        self.assertEqual(set(Matricula.objects.values_list('pk', 'periodo')), {(mantida.pk, 'N'), (unica.pk, 'V')})
+        self.assertEqual(list(Alteracao.objects.order_by('seq').values_list('modelo', 'objeto_id', 'operacao')), [
+            ('matricula', mantida.pk, 'U'),
+            ('matricula', duplicadas[0].pk, 'D'),
+            ('matricula', duplicadas[1].pk, 'D'),
+        ])
+        self.assertEqual(Alteracao.objects.get(operacao='U').dados['periodo'], 'N')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Matricula.objects.create(estudante_id=estudante.pk, curso_id=cursos[1].pk)
+
+
+class BaldeTokensTests(TestCase):
+    # PT: Balde de tokens com relógio simulado: capacidade, reabastecimento, escopos e Retry-After
+    # EN: Token bucket under a mocked clock: capacity, refill, scopes and Retry-After
+    TAXAS = {'anon': '60/min', 'user': '120/min', 'bulk': '3/min', 'export': '2/min'}
+
+    @classmethod
+    def setUpTestData(cls):
+        _popular(1)
+        cls.token = Token.objects.create(user=User.objects.create_superuser('admin', 'admin@example.com', 'senha'))
+
+    def setUp(self):
+        _limpar_caches()
+        self.agora = 1000.0
+        self.cabecalhos = {'Authorization': f'Token {self.token.key}'}
+        for alvo in (mock.patch.object(TokenBucketThrottle, 'timer', mock.Mock(side_effect=lambda: self.agora)),
+                     mock.patch.object(ScopedTokenBucketThrottle, 'THROTTLE_RATES', self.TAXAS)):
+            alvo.start()
+            self.addCleanup(alvo.stop)
+
+    def _balde(self):
+        class Balde(TokenBucketThrottle):
+            rate = '3/min'
+
+            def get_cache_key(self, request, view):
+                return 'teste:balde'
+
+        return Balde()
+
+    def _permitir(self):
+        return self._balde().allow_request(None, None)
+
+    def test_capacidade_e_reabastecimento(self):
+        self.assertEqual([self._permitir() for _ in range(4)], [True, True, True, False])
+        # PT/EN: 3/min = um token a cada 20 s | one token every 20 s
+        self.agora += 10
+        balde = self._balde()
+        self.assertFalse(balde.allow_request(None, None))
+        self.assertAlmostEqual(balde.wait(), 10)
+        self.agora += 10
+        self.assertEqual([self._permitir() for _ in range(2)], [True, False])
+
+    def test_balde_parado_nao_passa_da_capacidade(self):
+        self._permitir()
+        self.agora += 3600
+        self.assertEqual([self._permitir() for _ in range(4)], [True, True, True, False])
+
+    def _exportar(self):
+        resposta = self.client.get('/notas/export/', headers=self.cabecalhos)
+        if resposta.status_code == 200:
+            b''.join(resposta.streaming_content)
+        return resposta
+
+    def test_export_responde_429_com_retry_after(self):
+        self.assertEqual([self._exportar().status_code for _ in range(2)], [200, 200])
+        resposta = self._exportar()
+        self.assertEqual(resposta.status_code, 429)
+        self.assertEqual(resposta['Retry-After'], '30')
+        # PT/EN: Outras rotas não gastam o escopo | other routes do not spend the scope
+        self.assertEqual(self.client.get('/cursos/', headers=self.cabecalhos).status_code, 200)
+        self.agora += 30
+        self.assertEqual(self._exportar().status_code, 200)
+
+    def test_bulk_tem_balde_proprio(self):
+        def upsert():
+            return self.client.post('/matriculas/upsert/', [], content_type='application/json',
+                                    headers=self.cabecalhos)
+
+        self.assertEqual([upsert().status_code for _ in range(4)], [200, 200, 200, 429])
+        self.assertEqual(upsert()['Retry-After'], '20')
+        self.assertEqual(self._exportar().status_code, 200)
+
+
+@override_settings(ESCOLA_TAREFAS_LIMITES={}, ESCOLA_TAREFAS_BACKOFF=10, ESCOLA_TAREFAS_BACKOFF_MAX=15)
+class FilaTarefasTests(TransactionTestCase):
+    # PT: Reserva com limite por tipo, UPDATE condicional, prazo vencido, backoff e visibilidade por usuário
+    # EN: Claiming with per-type limits, conditional UPDATE, expired lease, backoff and per-user visibility
+    def setUp(self):
+        _limpar_caches()  # PT/EN: Throttling zerado por teste | fresh throttling per test
+        tipos = mock.patch.dict(tarefas.TIPOS)
+        tipos.start()
+        self.addCleanup(tipos.stop)
+        self.execucoes = []
+
+        @tarefas.tipo('teste', limite=2, tentativas=2)
+        def _teste(tarefa):
+            self.execucoes.append(tarefa.pk)
+            if tarefa.parametros.get('erro') == 'invalida':
+                raise tarefas.TarefaInvalida('parâmetros ruins')
+            if tarefa.parametros.get('erro'):
+                raise RuntimeError('falha temporária')
+            return {'ok': tarefa.pk}
+
+    def test_reserva_respeita_o_limite_do_tipo(self):
+        fila = [tarefas.enfileirar('teste') for _ in range(3)]
+        reservadas = [tarefas.reservar('w1', ['teste']) for _ in range(3)]
+        self.assertEqual([t.pk if t else None for t in reservadas], [fila[0].pk, fila[1].pk, None])
+        self.assertEqual((reservadas[0].estado, reservadas[0].tentativas, reservadas[0].trabalhador),
+                         (tarefas.EXECUTANDO, 1, 'w1'))
+        self.assertIsNotNone(reservadas[0].expira_em)
+
+        with override_settings(ESCOLA_TAREFAS_LIMITES={'teste': 3}):
+            self.assertEqual(tarefas.reservar('w2', ['teste']).pk, fila[2].pk)
+        # PT/EN: Agendada para depois não é reservada | scheduled for later is not claimed
+        tarefas.enfileirar('teste', executar_em=timezone.now() + datetime.timedelta(hours=1))
+        Tarefa.objects.filter(estado=tarefas.EXECUTANDO).update(estado=tarefas.CONCLUIDA)
+        self.assertIsNone(tarefas.reservar('w1', ['teste']))
+
+    def test_update_condicional_nao_pega_tarefa_ja_reservada(self):
+        tarefa = tarefas.enfileirar('teste')
+        prazo = tarefas._prazo
+
+        def concorrente():
+            # PT: Outro trabalhador reserva entre a escolha e o UPDATE | EN: Another worker claims between pick and UPDATE
+            Tarefa.objects.filter(pk=tarefa.pk).update(estado=tarefas.EXECUTANDO, trabalhador='outro', tentativas=1)
+            return prazo()
+
+        with mock.patch.object(tarefas, '_prazo', concorrente):
+            self.assertIsNone(tarefas.reservar('w1', ['teste']))
+        tarefa.refresh_from_db()
+        self.assertEqual((tarefa.trabalhador, tarefa.tentativas), ('outro', 1))
+
+    def test_recuperar_expiradas(self):
+        passado = timezone.now() - datetime.timedelta(seconds=1)
+        volta, falha, viva = (tarefas.enfileirar('teste') for _ in range(3))
+        Tarefa.objects.update(estado=tarefas.EXECUTANDO, trabalhador='morto', tentativas=1, expira_em=passado)
+        Tarefa.objects.filter(pk=falha.pk).update(tentativas=2)
+        Tarefa.objects.filter(pk=viva.pk).update(expira_em=tarefas._prazo())
+
+        self.assertEqual(tarefas.recuperar_expiradas(), 2)
+        estados = dict(Tarefa.objects.values_list('pk', 'estado'))
+        self.assertEqual(estados, {volta.pk: tarefas.PENDENTE, falha.pk: tarefas.FALHOU, viva.pk: tarefas.EXECUTANDO})
+        volta.refresh_from_db()
+        self.assertEqual((volta.trabalhador, volta.expira_em), ('', None))
+        self.assertIn('Prazo esgotado', volta.erro)
+        self.assertEqual(tarefas.reservar('w1', ['teste']).pk, volta.pk)
+
+    def test_backoff_e_tarefa_invalida(self):
+        for tentativa, minimo, maximo in ((1, 5, 10), (2, 7.5, 15), (6, 7.5, 15)):
+            with self.subTest(tentativa=tentativa):
+                self.assertTrue(all(minimo <= tarefas.backoff(tentativa) <= maximo for _ in range(20)))
+
+        tarefa = tarefas.enfileirar('teste', {'erro': 'temporaria'})
+        antes = timezone.now()
+        tarefa = tarefas.executar(tarefas.reservar('w1', ['teste']))
+        self.assertEqual((tarefa.estado, tarefa.tentativas, tarefa.trabalhador), (tarefas.PENDENTE, 1, ''))
+        self.assertIn('falha temporária', tarefa.erro)
+        self.assertGreaterEqual(tarefa.executar_em, antes + datetime.timedelta(seconds=5))
+        self.assertIsNone(tarefas.reservar('w1', ['teste']))  # PT/EN: ainda no backoff | still backing off
+
+        Tarefa.objects.filter(pk=tarefa.pk).update(executar_em=timezone.now())
+        tarefa = tarefas.executar(tarefas.reservar('w1', ['teste']))
+        self.assertEqual((tarefa.estado, tarefa.tentativas), (tarefas.FALHOU, 2))
+
+        invalida = tarefas.enfileirar('teste', {'erro': 'invalida'})
+        invalida = tarefas.executar(tarefas.reservar('w1', ['teste']))
+        self.assertEqual((invalida.estado, invalida.tentativas, invalida.erro), (tarefas.FALHOU, 1, 'parâmetros ruins'))
+
+        ok = tarefas.enfileirar('teste')
+        self.assertEqual(tarefas.trabalhar(['teste'], ate_esvaziar=True), 1)
+        ok.refresh_from_db()
+        self.assertEqual((ok.estado, ok.resultado), (tarefas.CONCLUIDA, {'ok': ok.pk}))
+
+    def _pasta_arquivos(self):
+        pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, pasta)
+        arquivos = override_settings(ESCOLA_TAREFAS_ARQUIVOS=pasta)
+        arquivos.enable()
+        self.addCleanup(arquivos.disable)
+        return pasta
+
+    def test_exportacao_com_erro_nao_deixa_parcial(self):
+        pasta = self._pasta_arquivos()
+
+        def linhas_quebradas(queryset, colunas):
+            yield 'id\r\n'
+            raise RuntimeError('conexão perdida')
+
+        tarefa = tarefas.enfileirar('exportar_notas')
+        with mock.patch.object(tarefas, 'linhas_csv', linhas_quebradas), self.assertRaises(RuntimeError):
+            tarefas.TIPOS['exportar_notas'].funcao(tarefa)
+        self.assertEqual(os.listdir(pasta), [])
+
+    @override_settings(ESCOLA_TAREFAS_RETENCAO=3600)
+    def test_arquivos_antigos_expiram(self):
+        pasta = self._pasta_arquivos()
+        for nome in ('tarefa-1-notas.csv', 'tarefa-2-notas.csv.parcial', 'tarefa-3-notas.csv', 'outro.txt'):
+            open(os.path.join(pasta, nome), 'w').close()
+        velho = time.time() - 7200
+        for nome in ('tarefa-1-notas.csv', 'tarefa-2-notas.csv.parcial', 'outro.txt'):
+            os.utime(os.path.join(pasta, nome), (velho, velho))
+        self.assertEqual(tarefas.limpar_arquivos(), 2)
+        self.assertEqual(sorted(os.listdir(pasta)), ['outro.txt', 'tarefa-3-notas.csv'])
+
+    def test_cada_usuario_ve_as_suas(self):
+        ana, bia = (User.objects.create_user(nome, f'{nome}@example.com', 'senha') for nome in ('ana', 'bia'))
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'senha')
+        da_ana = tarefas.enfileirar('teste', usuario=ana)
+        da_bia = tarefas.enfileirar('teste', usuario=bia)
+        Tarefa.objects.filter(pk=da_bia.pk).update(estado=tarefas.CONCLUIDA)
+
+        def pedir(usuario, url):
+            return self.client.get(url, headers={'Authorization': f'Token {Token.objects.get_or_create(user=usuario)[0].key}'})
+
+        self.assertEqual([t['id'] for t in pedir(ana, '/tarefas/').json()['results']], [da_ana.pk])
+        self.assertEqual(pedir(ana, f'/tarefas/{da_bia.pk}/').status_code, 404)
+        self.assertEqual([t['id'] for t in pedir(admin, '/tarefas/').json()['results']], [da_bia.pk, da_ana.pk])
+        self.assertEqual([t['id'] for t in pedir(admin, '/tarefas/?estado=C').json()['results']], [da_bia.pk])
+
+
+class BenchApiRotasTests(TestCase):
+    # PT: `bench_api` pula viewsets sem `queryset` (tarefas) e tabelas vazias
+    # EN: `bench_api` skips viewsets without `queryset` (jobs) and empty tables
+    def test_rotas(self):
+        _popular(2)
+        Nota.objects.all().delete()
+        comando = bench_api.Command()
+        comando.filtro = ''
+        rotas = comando._rotas()
+        self.assertIn('/estudantes/', rotas)
+        self.assertFalse([rota for rota in rotas if rota.startswith(('/tarefas/', '/notas/'))])
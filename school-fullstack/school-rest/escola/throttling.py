@@ -0,0 +1,89 @@
+"""
+PT: Throttling por balde de tokens (memória fixa, O(1) por verificação).
+- Os throttles padrão do DRF guardam a lista de timestamps de cada cliente e a
+  regravam inteira a cada requisição; aqui cada chave guarda só `(tokens, instante)`.
+- A taxa `N/período` vira um balde com capacidade N que se reabastece
+  continuamente (N tokens por período); cada requisição consome um token.
+- Usa o alias de cache `throttle`: com Redis o limite vale para todos os workers;
+  sem Redis cada processo tem o seu balde em memória (ver CACHES no settings).
+
+EN: Token-bucket throttling (fixed memory, O(1) per check).
+- DRF's stock throttles keep each client's timestamp list and rewrite all of it on
+  every request; here each key only stores `(tokens, timestamp)`.
+- A `N/period` rate becomes a bucket of capacity N that refills continuously
+  (N tokens per period); each request spends one token.
+- Uses the `throttle` cache alias: with Redis the limit holds across every worker;
+  without Redis each process keeps its own in-memory bucket (see CACHES in settings).
+"""
+
+import math
+
+from django.core.cache import caches
+from django.utils.connection import ConnectionProxy
+from rest_framework.throttling import (
+    AnonRateThrottle,
+    ScopedRateThrottle,
+    SimpleRateThrottle,
+    UserRateThrottle,
+)
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """PT: Base dos throttles por balde; subclasses definem `get_cache_key`.
+    EN: Base for bucket throttles; subclasses define `get_cache_key`.
+
+    PT: Leitura e escrita não são atômicas: sob concorrência extrema alguns
+    pedidos a mais podem passar, o mesmo compromisso dos throttles do DRF.
+    EN: Read and write are not atomic: under heavy concurrency a few extra
+    requests may get through, the same trade-off as DRF's throttles.
+    """
+    cache = ConnectionProxy(caches, 'throttle')
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        capacidade = self.num_requests
+        reabastecimento = capacidade / self.duration  # PT/EN: tokens por segundo | tokens per second
+        self.now = self.timer()
+
+        estado = self.cache.get(self.key)
+        if estado is None:
+            tokens = float(capacidade)
+        else:
+            tokens, instante = estado
+            tokens = min(capacidade, tokens + (self.now - instante) * reabastecimento)
+
+        if tokens < 1:
+            self.espera = (1 - tokens) / reabastecimento
+            return False
+
+        self.espera = None
+        # PT: Após `duration` sem uso o balde estaria cheio; a entrada pode expirar
+        # EN: After `duration` idle the bucket would be full; the entry may expire
+        self.cache.set(self.key, (tokens - 1, self.now), math.ceil(self.duration))
+        return True
+
+    def wait(self):
+        """PT: Segundos até haver um token livre (cabeçalho Retry-After).
+        EN: Seconds until a token is available (Retry-After header).
+        """
+        return getattr(self, 'espera', None)
+
+
+class AnonTokenBucketThrottle(AnonRateThrottle, TokenBucketThrottle):
+    """PT: Limite por IP para anônimos (escopo `anon`). EN: Per-IP limit for anonymous users (`anon` scope)."""
+
+
+class UserTokenBucketThrottle(UserRateThrottle, TokenBucketThrottle):
+    """PT: Limite por usuário autenticado (escopo `user`). EN: Per-user limit (`user` scope)."""
+
+
+class ScopedTokenBucketThrottle(ScopedRateThrottle, TokenBucketThrottle):
+    """PT: Limite por `throttle_scope` da view (ex.: `bulk`, `export`); views sem escopo passam direto.
+    EN: Limit per view `throttle_scope` (e.g. `bulk`, `export`); views without a scope pass through.
+    """
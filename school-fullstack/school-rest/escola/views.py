@@ -1,31 +1,65 @@
 """
 PT: Views da API da aplicação escola.
-- ViewSets para Estudante, Curso e Matricula (CRUD completo).
+- ViewSets para Estudante, Curso e Matricula (CRUD completo; upsert idempotente em `/matriculas/upsert/`).
 - ListAPIView para listar matrículas por estudante e por curso.
+- Leituras projetam o queryset conforme `?fields=` / `?exclude=` (`ProjecaoMixin`).
+- Listas saem direto de `values()` quando o serializer permite (`LeituraRapidaMixin`).
+- `BatchView` multiplexa vários GETs numa chamada só.
+- `/notas/export/` exporta as notas em CSV por streaming (`escola.exportacao`).
+- `/cursos/{pk}/resumo/` lê o resumo materializado do curso (`escola.resumo`).
+- `/tarefas/` enfileira e acompanha tarefas em segundo plano (`escola.tarefas`).
 
 EN: API views for the escola app.
-- ViewSets for Estudante, Curso and Matricula (full CRUD).
+- ViewSets for Estudante, Curso and Matricula (full CRUD; idempotent upsert at `/matriculas/upsert/`).
 - ListAPIView to list enrollments by student and by course.
+- Reads project the queryset to `?fields=` / `?exclude=` (`ProjecaoMixin`).
+- Lists are built straight from `values()` when the serializer allows it (`LeituraRapidaMixin`).
+- `BatchView` multiplexes several GETs into one call.
+- `/notas/export/` streams the grades as CSV (`escola.exportacao`).
+- `/cursos/{pk}/resumo/` reads the course's materialized summary (`escola.resumo`).
+- `/tarefas/` enqueues and tracks background jobs (`escola.tarefas`).
 """
 
-from escola.models import Estudante, Curso, Matricula, Professor, Nota
+import copy
+from pathlib import Path
+from urllib.parse import urlencode
+
+from escola.models import Estudante, Curso, Matricula, Professor, Nota, Alteracao, Tarefa
 from escola.serializers import (
     EstudanteSerializer,
     CursoSerializer,
     MatriculaSerializer,
+    MatriculaUpsertSerializer,
     ListaMatriculasEstudanteSerializer,
     ListaMatriculasCursoSerializer,
     ProfessorSerializer,
     NotaSerializer,
+    AlteracaoSerializer,
+    ResumoCursoSerializer,
+    TarefaSerializer,
 )
+from escola import matriculas, tarefas
+from escola.alteracoes import MODELOS, nome_modelo
+from escola.exportacao import COLUNAS_NOTAS, resposta_csv
+from escola.leitura import LeituraRapidaMixin, mapeador_para
+from escola.perfil import perfil_em_cache
+from escola.projecao import ProjecaoMixin
+from escola.resumo import resumo_do_curso
 
-from rest_framework import viewsets, generics
-from rest_framework.permissions import IsAuthenticated
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from django.http import FileResponse, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework import mixins, status, viewsets, generics
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+from rest_framework.permissions import AllowAny, DjangoModelPermissions, IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
-class EstudanteViewSet(viewsets.ModelViewSet):
+class EstudanteViewSet(LeituraRapidaMixin, ProjecaoMixin, viewsets.ModelViewSet):
     """PT: CRUD de estudantes com filtros por nome e curso.
     EN: Student CRUD with filters by name and course.
     """
@@ -41,30 +75,70 @@ class EstudanteViewSet(viewsets.ModelViewSet):
         # Filter by enrolled course (id or code)
         curso_id = params.get('curso') or params.get('curso_id')
         curso_codigo = params.get('curso_codigo') or params.get('codigo')
+        # PT: Códigos podem se repetir entre cursos: EXISTS em vez de join | EN: Codes may repeat across courses: EXISTS instead of a join
+        def matriculado_em(codigo):
+            return Exists(Matricula.objects.filter(estudante=OuterRef('pk'), curso__codigo__iexact=codigo))
+
         if curso_id:
             try:
+                # PT: (estudante, curso) é único: o join devolve cada estudante uma vez, sem DISTINCT
+                # EN: (student, course) is unique: the join yields each student once, no DISTINCT
                 qs = qs.filter(matricula__curso_id=int(curso_id))
             except ValueError:
                 # Not an int; fall back to code
-                qs = qs.filter(matricula__curso__codigo__iexact=str(curso_id))
+                qs = qs.filter(matriculado_em(str(curso_id)))
         if curso_codigo:
-            qs = qs.filter(matricula__curso__codigo__iexact=curso_codigo)
-        return qs.distinct()
+            qs = qs.filter(matriculado_em(curso_codigo))
+        return qs
 
 
-class CursoViewSet(viewsets.ModelViewSet):
+class CursoViewSet(LeituraRapidaMixin, ProjecaoMixin, viewsets.ModelViewSet):
     """PT: CRUD de cursos. EN: Course CRUD."""
     queryset = Curso.objects.all()
     serializer_class = CursoSerializer
 
 
-class MatriculaViewSet(viewsets.ModelViewSet):
-    """PT: CRUD de matrículas. EN: Enrollment CRUD."""
+class PermissaoUpsert(DjangoModelPermissions):
+    """PT: Upsert cria e altera: exige as duas permissões. EN: Upsert creates and changes: requires both permissions."""
+    perms_map = {
+        **DjangoModelPermissions.perms_map,
+        'POST': ['%(app_label)s.add_%(model_name)s', '%(app_label)s.change_%(model_name)s'],
+    }
+
+
+class MatriculaViewSet(LeituraRapidaMixin, ProjecaoMixin, viewsets.ModelViewSet):
+    """PT: CRUD de matrículas e upsert em lote (`POST /matriculas/upsert/`).
+    EN: Enrollment CRUD and bulk upsert (`POST /matriculas/upsert/`).
+    """
     queryset = Matricula.objects.all()
     serializer_class = MatriculaSerializer
+    throttle_scope = None
+
+    @action(detail=False, methods=['post'], url_path='upsert', throttle_scope='bulk',
+            permission_classes=[PermissaoUpsert])
+    def upsert(self, request):
+        """PT: Recebe uma matrícula ou uma lista; o par (estudante, curso) existente tem o
+        período atualizado. Repetir o pedido não grava nada.
+        EN: Takes one enrollment or a list; an existing (student, course) pair gets its
+        period updated. Repeating the request writes nothing.
+        """
+        itens = request.data if isinstance(request.data, list) else [request.data]
+        if len(itens) > settings.ESCOLA_UPSERT_MAX:
+            raise ValidationError({'detail': f'Máximo de {settings.ESCOLA_UPSERT_MAX} matrículas por chamada.'})
+        entrada = MatriculaUpsertSerializer(data=itens, many=True)
+        entrada.is_valid(raise_exception=True)
+        resultado = matriculas.upsert([
+            Matricula(estudante_id=dados['estudante'], curso_id=dados['curso'], periodo=dados['periodo'])
+            for dados in entrada.validated_data
+        ])
+        todas = resultado['criadas'] + resultado['atualizadas'] + resultado['inalteradas']
+        return Response({
+            **{chave: len(lista) for chave, lista in resultado.items()},
+            'results': MatriculaSerializer(todas, many=True).data,
+        })
 
 
-class ListaMatriculasEstudante(generics.ListAPIView):
+class ListaMatriculasEstudante(LeituraRapidaMixin, ProjecaoMixin, generics.ListAPIView):
     """PT: Lista matrículas de um estudante.
     EN: Lists a student's enrollments.
     """
@@ -78,7 +152,7 @@ class ListaMatriculasEstudante(generics.ListAPIView):
         return Matricula.objects.filter(estudante_id=self.kwargs['pk'])
 
 
-class ListaMatriculasCurso(generics.ListAPIView):
+class ListaMatriculasCurso(LeituraRapidaMixin, ProjecaoMixin, generics.ListAPIView):
     """PT: Lista estudantes matriculados em um curso.
     EN: Lists students enrolled in a course.
     """
@@ -91,19 +165,104 @@ class ListaMatriculasCurso(generics.ListAPIView):
         return Matricula.objects.filter(curso_id=self.kwargs['pk'])
 
 
-class ProfessorViewSet(viewsets.ModelViewSet):
+class ProfessorViewSet(LeituraRapidaMixin, ProjecaoMixin, viewsets.ModelViewSet):
     """PT: CRUD de professores. EN: Teacher CRUD."""
     queryset = Professor.objects.all()
     serializer_class = ProfessorSerializer
 
 
-class NotaViewSet(viewsets.ModelViewSet):
+class NotaViewSet(LeituraRapidaMixin, ProjecaoMixin, viewsets.ModelViewSet):
     """PT: CRUD de notas. EN: Grade CRUD."""
     queryset = Nota.objects.all()
     serializer_class = NotaSerializer
+    # PT: Só a exportação define escopo (ver `exportar`) | EN: Only the export sets a scope (see `exportar`)
+    throttle_scope = None
+
+    @action(detail=False, url_path='export', throttle_scope='export', permission_classes=[IsAuthenticated])
+    def exportar(self, request):
+        """PT: Todas as notas em CSV por streaming (`?curso=` / `?estudante=` filtram).
+        EN: Every grade as streamed CSV (`?curso=` / `?estudante=` filter).
+        """
+        queryset = Nota.objects.order_by('pk')
+        for param in ('curso', 'estudante'):
+            valor = request.query_params.get(param)
+            if valor is not None:
+                if not valor.isdigit():
+                    raise ValidationError({param: 'Use o id (número inteiro).'})
+                queryset = queryset.filter(**{f'{param}_id': int(valor)})
+        return resposta_csv(queryset, COLUNAS_NOTAS, 'notas.csv')
+
+
+class TarefaViewSet(mixins.CreateModelMixin, mixins.ListModelMixin, mixins.RetrieveModelMixin,
+                    viewsets.GenericViewSet):
+    """PT: Tarefas em segundo plano (`escola.tarefas`).
+
+    `POST /tarefas/` com `{"tipo": ..., "parametros": {...}}` enfileira e responde
+    202 com a tarefa; `GET /tarefas/{id}/` acompanha o estado, `GET
+    /tarefas/{id}/arquivo/` baixa o arquivo gerado e `POST /tarefas/{id}/cancelar/`
+    cancela uma pendente. Cada usuário vê as suas; superusuários veem todas.
+    `?estado=` e `?tipo=` filtram a lista.
 
+    EN: Background jobs (`escola.tarefas`).
 
-class ListaNotasEstudante(generics.ListAPIView):
+    `POST /tarefas/` with `{"tipo": ..., "parametros": {...}}` enqueues and answers
+    202 with the job; `GET /tarefas/{id}/` tracks its state, `GET
+    /tarefas/{id}/arquivo/` downloads the generated file and `POST
+    /tarefas/{id}/cancelar/` cancels a pending one. Each user sees their own;
+    superusers see all. `?estado=` and `?tipo=` filter the list.
+    """
+    serializer_class = TarefaSerializer
+    permission_classes = [IsAuthenticated]
+    throttle_scope = None
+
+    def get_queryset(self):
+        queryset = Tarefa.objects.order_by('-pk')
+        if not self.request.user.is_superuser:
+            queryset = queryset.filter(criado_por=self.request.user)
+        for param in ('estado', 'tipo'):
+            valor = self.request.query_params.get(param)
+            if valor:
+                queryset = queryset.filter(**{param: valor})
+        return queryset
+
+    def get_throttles(self):
+        # PT: Só enfileirar gasta do escopo `bulk`; consultar o estado não
+        # EN: Only enqueueing spends the `bulk` scope; polling the state does not
+        self.throttle_scope = 'bulk' if self.action == 'create' else None
+        return super().get_throttles()
+
+    def create(self, request, *args, **kwargs):
+        entrada = self.get_serializer(data=request.data)
+        entrada.is_valid(raise_exception=True)
+        nome = entrada.validated_data['tipo']
+        if nome not in tarefas.TIPOS:
+            raise ValidationError({'tipo': f'Tipos válidos: {", ".join(sorted(tarefas.TIPOS))}.'})
+        if not tarefas.pode_enfileirar(request.user, nome):
+            raise PermissionDenied('Sem permissão para este tipo de tarefa.')
+        tarefa = tarefas.enfileirar(nome, entrada.validated_data['parametros'], usuario=request.user,
+                                    executar_em=entrada.validated_data.get('executar_em'))
+        return Response(self.get_serializer(tarefa).data, status=status.HTTP_202_ACCEPTED,
+                        headers={'Location': request.build_absolute_uri(f'/tarefas/{tarefa.pk}/')})
+
+    @action(detail=True, methods=['post'])
+    def cancelar(self, request, pk=None):
+        tarefa = self.get_object()
+        if not tarefas.cancelar(tarefa):
+            return Response({'detail': 'Só tarefas pendentes podem ser canceladas.'}, status=status.HTTP_409_CONFLICT)
+        return Response(self.get_serializer(tarefa).data)
+
+    @action(detail=True)
+    def arquivo(self, request, pk=None):
+        tarefa = self.get_object()
+        nome = tarefa.resultado.get('arquivo') if tarefa.estado == tarefas.CONCLUIDA and isinstance(
+            tarefa.resultado, dict) else None
+        caminho = Path(settings.ESCOLA_TAREFAS_ARQUIVOS) / Path(nome).name if nome else None
+        if caminho is None or not caminho.is_file():
+            raise NotFound('Arquivo indisponível.')
+        return FileResponse(caminho.open('rb'), as_attachment=True, filename=caminho.name)
+
+
+class ListaNotasEstudante(LeituraRapidaMixin, ProjecaoMixin, generics.ListAPIView):
     """PT: Lista notas de um estudante. EN: Lists a student's grades."""
     serializer_class = NotaSerializer
 
@@ -111,7 +270,7 @@ class ListaNotasEstudante(generics.ListAPIView):
         return Nota.objects.filter(estudante_id=self.kwargs['pk']).order_by('-data')
 
 
-class ListaNotasCurso(generics.ListAPIView):
+class ListaNotasCurso(LeituraRapidaMixin, ProjecaoMixin, generics.ListAPIView):
     """PT: Lista notas de um curso. EN: Lists grades for a course."""
     serializer_class = NotaSerializer
 
@@ -119,6 +278,79 @@ class ListaNotasCurso(generics.ListAPIView):
         return Nota.objects.filter(curso_id=self.kwargs['pk']).order_by('-data')
 
 
+class PerfilEstudante(APIView):
+    """PT: Estudante, matrículas (com curso) e notas por curso numa resposta só (em cache).
+    EN: Student, enrollments (with course) and grades by course in one cached response.
+    """
+    # PT: Email, CPF e notas de uma pessoa: só com autenticação | EN: A person's email, CPF and grades: authenticated only
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        perfil = perfil_em_cache(pk)
+        if perfil is None:
+            raise NotFound()
+        return Response(perfil)
+
+
+class ResumoCursoView(APIView):
+    """PT: Matrículas por período, professores e média de um curso, de uma linha mantida pelos sinais.
+    EN: A course's enrollments per period, teachers and average, from a row kept up to date by signals.
+    """
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    def get(self, request, pk):
+        resumo = resumo_do_curso(pk)
+        if resumo is None:
+            raise NotFound()
+        return Response(ResumoCursoSerializer(resumo, context={'request': request}).data)
+
+
+class AlteracoesView(APIView):
+    """PT: Feed de mudanças (`/changes/?since=<seq>`) com paginação por chave.
+
+    Devolve as entradas com `seq > since` em ordem; o cliente guarda `next_since`
+    e repete enquanto `has_more` for verdadeiro. `?models=nota,curso` filtra por
+    modelo e `?limit=` ajusta o tamanho da página.
+
+    EN: Change feed (`/changes/?since=<seq>`) with keyset pagination.
+
+    Returns entries with `seq > since` in order; the client keeps `next_since`
+    and repeats while `has_more` is true. `?models=nota,curso` filters by model
+    and `?limit=` sets the page size.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            since = int(params.get('since', 0))
+            limite = max(1, min(int(params.get('limit', settings.ESCOLA_ALTERACOES_PAGINA)),
+                                settings.ESCOLA_ALTERACOES_MAX))
+        except ValueError:
+            raise ValidationError({'since': 'Use números inteiros em since/limit.'})
+
+        queryset = Alteracao.objects.filter(seq__gt=since).order_by('seq')
+        modelos = [m.strip().lower() for m in params.get('models', '').split(',') if m.strip()]
+        if modelos:
+            validos = {nome_modelo(m) for m in MODELOS}
+            if set(modelos) - validos:
+                raise ValidationError({'models': f'Modelos válidos: {", ".join(sorted(validos))}.'})
+            queryset = queryset.filter(modelo__in=modelos)
+
+        mapeador = mapeador_para(AlteracaoSerializer(context={'request': request}))
+        linhas = list(queryset.values(*mapeador.lookups)[:limite + 1])
+        mais = len(linhas) > limite
+        linhas = linhas[:limite]
+        proximo = linhas[-1]['seq'] if linhas else since
+        return Response({
+            'since': since,
+            'next_since': proximo,
+            'has_more': mais,
+            'next': replace_query_param(request.build_absolute_uri(), 'since', proximo) if mais else None,
+            'results': mapeador.lista(linhas),
+        })
+
+
 class MeView(APIView):
     """PT: Retorna informações do usuário autenticado.
     EN: Returns the authenticated user's info.
@@ -127,7 +359,11 @@ class MeView(APIView):
 
     def get(self, request):
         u = request.user
-        groups = list(u.groups.values_list('name', flat=True))
+        # PT: Grupos pré-carregados pelo CachedTokenAuthentication, quando houver
+        # EN: Groups preloaded by CachedTokenAuthentication, when present
+        groups = getattr(u, '_escola_grupos', None)
+        if groups is None:
+            groups = list(u.groups.values_list('name', flat=True))
         return Response({
             'username': u.get_username(),
             'email': u.email,
@@ -135,3 +371,67 @@ class MeView(APIView):
             'is_staff': bool(u.is_staff),
             'groups': groups,
         })
+
+
+class BatchView(APIView):
+    """PT: Executa vários GETs da própria API numa requisição só (multiplexação).
+
+    Corpo: `{"requests": [{"path": "/cursos/", "params": {"page": 2}}, ...]}`.
+    Cada item roda em processo, na mesma conexão de banco, reaproveitando o
+    usuário já autenticado (sem nova autenticação, HTTP ou middlewares por item);
+    permissões e throttles de cada view continuam valendo. A resposta traz
+    `{"responses": [{"status": 200, "body": {...}}, ...]}` na mesma ordem.
+    Rotas que respondem em stream (CSV de notas, arquivos de tarefas) voltam 400.
+
+    EN: Runs several GETs of this API in a single request (multiplexing).
+
+    Body: `{"requests": [{"path": "/cursos/", "params": {"page": 2}}, ...]}`.
+    Each item runs in-process, on the same DB connection, reusing the already
+    authenticated user (no extra auth, HTTP or middleware pass per item); each
+    view's permissions and throttles still apply. The response holds
+    `{"responses": [{"status": 200, "body": {...}}, ...]}` in the same order.
+    Routes that answer with a stream (grade CSV, job files) come back as 400.
+    """
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        itens = request.data.get('requests') if isinstance(request.data, dict) else None
+        if not isinstance(itens, list) or not itens:
+            raise ValidationError({'requests': 'Informe uma lista de sub-requisições.'})
+        if len(itens) > settings.ESCOLA_BATCH_MAX:
+            raise ValidationError({'requests': f'Máximo de {settings.ESCOLA_BATCH_MAX} sub-requisições.'})
+        return Response({'responses': [self._executar(request, item) for item in itens]})
+
+    def _executar(self, request, item):
+        if not isinstance(item, dict) or not isinstance(item.get('path'), str):
+            return {'status': 400, 'body': {'detail': 'Item inválido: informe "path".'}}
+        if not isinstance(item.get('params') or {}, dict):
+            return {'status': 400, 'body': {'detail': 'Item inválido: "params" deve ser um objeto.'}}
+        path = '/' + item['path'].lstrip('/')
+        try:
+            match = resolve(path)
+        except Resolver404:
+            return {'status': 404, 'body': {'detail': 'Rota não encontrada.'}}
+        classe = getattr(match.func, 'cls', None)
+        if classe is None or not issubclass(classe, APIView) or issubclass(classe, BatchView):
+            return {'status': 400, 'body': {'detail': 'Rota não suportada em lote.'}}
+
+        # PT: Cópia rasa do request original: mesmo ambiente (host, esquema), só muda rota e query
+        # EN: Shallow copy of the original request: same environment (host, scheme), only route and query change
+        sub = copy.copy(request._request)
+        sub.method = 'GET'
+        sub.path = sub.path_info = path
+        sub.GET = QueryDict(urlencode(item.get('params') or {}, doseq=True))
+        sub.META = {k: v for k, v in sub.META.items() if k not in ('CONTENT_TYPE', 'CONTENT_LENGTH')}
+        sub.META.update(REQUEST_METHOD='GET', PATH_INFO=path, QUERY_STRING=sub.GET.urlencode())
+        sub.resolver_match = match
+        sub._force_auth_user = request.user
+        sub._force_auth_token = request.auth
+
+        resposta = match.func(sub, *match.args, **match.kwargs)
+        if resposta.streaming:
+            # PT: Fecha o iterador/arquivo: o corpo não cabe no JSON do lote
+            # EN: Close the iterator/file: the body does not fit in the batch JSON
+            resposta.close()
+            return {'status': 400, 'body': {'detail': 'Rota com resposta em stream não suportada em lote.'}}
+        return {'status': resposta.status_code, 'body': getattr(resposta, 'data', None)}
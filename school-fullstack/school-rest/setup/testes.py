@@ -0,0 +1,28 @@
+"""
+PT: Executor de testes do projeto: troca os caches por locmem durante `manage.py test`,
+para que os testes não leiam nem apaguem o `.cache/` (ou o Redis) do ambiente de dev.
+
+EN: Project test runner: swaps the caches for locmem during `manage.py test`, so tests
+never read or wipe the dev environment's `.cache/` (or Redis).
+"""
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+CACHES_TESTE = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'throttle': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'escola-throttle'},
+}
+
+
+class ExecutorTestes(DiscoverRunner):
+    """PT: `DiscoverRunner` com `CACHES_TESTE` aplicado. EN: `DiscoverRunner` with `CACHES_TESTE` applied."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._caches = override_settings(CACHES=CACHES_TESTE)
+        self._caches.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._caches.disable()
+        super().teardown_test_environment(**kwargs)
@@ -15,10 +15,16 @@ from escola.views import (
     ListaMatriculasCurso,
     ProfessorViewSet,
     NotaViewSet,
+    TarefaViewSet,
     ListaNotasEstudante,
     ListaNotasCurso,
+    PerfilEstudante,
+    ResumoCursoView,
     MeView,
+    BatchView,
+    AlteracoesView,
 )
+from escola.eventos import stream_notas_curso
 from rest_framework import routers
 from rest_framework.authtoken.views import obtain_auth_token
 
@@ -28,6 +34,7 @@ router.register(r'cursos', CursoViewSet, basename='Cursos')
 router.register(r'matriculas', MatriculaViewSet, basename='Matriculas')
 router.register(r'professores', ProfessorViewSet, basename='Professores')
 router.register(r'notas', NotaViewSet, basename='Notas')
+router.register(r'tarefas', TarefaViewSet, basename='Tarefas')
 
 urlpatterns = [
     path('admin/', admin.site.urls),  # PT/EN: Admin
@@ -37,6 +44,11 @@ urlpatterns = [
     path('cursos/<int:pk>/matriculas/', ListaMatriculasCurso.as_view()),  # PT/EN: Matrículas por curso
     path('estudantes/<int:pk>/notas/', ListaNotasEstudante.as_view()),  # PT/EN: Notas por estudante
     path('cursos/<int:pk>/notas/', ListaNotasCurso.as_view()),  # PT/EN: Notas por curso
+    path('cursos/<int:pk>/notas/stream/', stream_notas_curso),  # PT/EN: Notas do curso ao vivo (SSE) | live course grades (SSE)
+    path('estudantes/<int:pk>/perfil/', PerfilEstudante.as_view()),  # PT/EN: Perfil completo do estudante
+    path('cursos/<int:pk>/resumo/', ResumoCursoView.as_view()),  # PT: Resumo do curso | EN: Course summary
     path('api-token-auth/', obtain_auth_token),  # PT: Obtenção de token | EN: Token obtain endpoint
     path('me/', MeView.as_view()),  # PT/EN: Info do usuário autenticado
+    path('batch/', BatchView.as_view()),  # PT: Vários GETs numa chamada | EN: Several GETs in one call
+    path('changes/', AlteracoesView.as_view()),  # PT: Feed de mudanças | EN: Change feed
 ]
@@ -1,13 +1,41 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.utils.text import slugify
+from galeria.lote import atualizar_em_lote
 from galeria.models import Fotografia
 
 class ListandoFotos(admin.ModelAdmin):
     list_display = ('id', 'publicada','nome', 'legenda', 'categoria')
     list_display_links = ('id', 'nome')
-    list_filter = ('categoria',)
+    list_filter = ('categoria', 'publicada')
     list_editable = ('publicada',)
     search_fields = ('nome', 'legenda', 'categoria')
     list_per_page = 10
+    # PT: Ações em lote com UPDATE por blocos | EN: Bulk actions with block-wise UPDATE
+    actions = ('publicar', 'despublicar')
+
+    def _aplicar(self, request, queryset, descricao, **campos):
+        total = atualizar_em_lote(queryset, **campos)
+        self.message_user(request, f'{total} fotografias {descricao}.', messages.SUCCESS)
+
+    @admin.action(description='Publicar selecionadas')
+    def publicar(self, request, queryset):
+        self._aplicar(request, queryset, 'publicadas', publicada=True)
+
+    @admin.action(description='Despublicar selecionadas')
+    def despublicar(self, request, queryset):
+        self._aplicar(request, queryset, 'despublicadas', publicada=False)
+
+    def get_actions(self, request):
+        """PT: Uma ação "Mover para <categoria>" por categoria. EN: One "move to <category>" action per category."""
+        acoes = super().get_actions(request)
+        if not acoes or not self.has_change_permission(request):
+            return acoes
+        for valor, rotulo in Fotografia.OPCOES_CATEGORIA:
+            def recategorizar(modeladmin, request, queryset, valor=valor, rotulo=rotulo):
+                modeladmin._aplicar(request, queryset, f'movidas para {rotulo}', categoria=valor)
+            nome = f'categoria_{slugify(valor)}'
+            acoes[nome] = (recategorizar, nome, f'Mover para {rotulo}')
+        return acoes
     
     
 # Register your models here.
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class GaleriaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'galeria'
+
+    def ready(self):
+        # PT/EN: Registra sinais de invalidação de cache | registers cache invalidation signals
+        from galeria import signals  # noqa: F401
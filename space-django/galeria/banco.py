@@ -0,0 +1,71 @@
+"""
+PT: Leituras das páginas (GET/HEAD) pela conexão SQLite somente leitura.
+- `LeituraMiddleware` marca a requisição; `RoteadorLeitura` usa o alias
+  `leitura` (com `SQLITE_LEITURA=True`) só para ela, e só fora de transação.
+- Uploads, ações em lote e o processamento em segundo plano escrevem no `default`.
+
+EN: Page reads (GET/HEAD) go through the read-only SQLite connection.
+- `LeituraMiddleware` flags the request; `RoteadorLeitura` uses the `leitura`
+  alias (with `SQLITE_LEITURA=True`) only for it, and only outside a transaction.
+- Uploads, bulk actions and background processing write to `default`.
+"""
+
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+LEITURA = 'leitura'
+METODOS_LEITURA = frozenset({'GET', 'HEAD'})
+
+_somente_leitura: ContextVar[bool] = ContextVar('galeria_somente_leitura', default=False)
+
+
+class LeituraMiddleware:
+    """PT: Marca GET/HEAD como somente leitura. EN: Flags GET/HEAD as read-only."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        marca = _somente_leitura.set(request.method in METODOS_LEITURA)
+        try:
+            return self.get_response(request)
+        finally:
+            _somente_leitura.reset(marca)
+
+    async def __acall__(self, request):
+        marca = _somente_leitura.set(request.method in METODOS_LEITURA)
+        try:
+            return await self.get_response(request)
+        finally:
+            _somente_leitura.reset(marca)
+
+
+class RoteadorLeitura:
+    """PT: Leituras de GET no alias `leitura`; escritas e migrações no `default`.
+    EN: GET reads on the `leitura` alias; writes and migrations on `default`.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (_somente_leitura.get() and LEITURA in settings.DATABASES
+                and not connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return LEITURA
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
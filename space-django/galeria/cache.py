@@ -0,0 +1,29 @@
+"""
+PT: Versão do cache da galeria (invalidação em O(1)).
+- Fragmentos cacheados incluem `versao_galeria()` na chave; trocar a versão
+  invalida todos de uma vez, sem varrer chaves.
+
+EN: Gallery cache version (O(1) invalidation).
+- Cached fragments include `versao_galeria()` in their key; bumping the
+  version invalidates all of them at once, without scanning keys.
+"""
+
+import time
+
+from django.core.cache import cache
+
+CHAVE_VERSAO = 'galeria:versao'
+
+
+def versao_galeria() -> int:
+    """PT: Versão atual (criada na primeira leitura). EN: Current version (created on first read)."""
+    versao = cache.get(CHAVE_VERSAO)
+    if versao is None:
+        cache.add(CHAVE_VERSAO, time.time_ns(), None)
+        versao = cache.get(CHAVE_VERSAO)
+    return versao
+
+
+def invalidar_cache_galeria() -> None:
+    """PT: Troca a versão; fragmentos antigos expiram sozinhos. EN: Bumps the version; old fragments just expire."""
+    cache.set(CHAVE_VERSAO, time.time_ns(), None)
@@ -0,0 +1,185 @@
+"""
+PT: Operações de imagem da galeria baseadas em Pillow.
+- `ler_cabecalho`: formato e dimensões (já com a orientação do EXIF) lidos só do
+  cabeçalho, sem decodificar.
+- `sem_exif`: grava ao lado do blob uma cópia sem EXIF (orientação aplicada) e
+  devolve o hash dela; roda no pool de `galeria.tarefas`, fora da requisição.
+- `processar_imagem`: decodifica, gera variantes redimensionadas e calcula cor
+  dominante e placeholder (LQIP) para pintura imediata. O original não é alterado.
+
+Este módulo não importa Django: as funções rodam em processos do pool de
+`galeria.tarefas` sem precisar configurar o projeto.
+
+EN: Pillow-based image operations for the gallery.
+- `ler_cabecalho`: format and dimensions (already EXIF-oriented) read from the
+  header only, without decoding.
+- `sem_exif`: writes an EXIF-free copy (orientation applied) next to the blob and
+  returns its hash; runs in the `galeria.tarefas` pool, outside the request.
+- `processar_imagem`: decodes, generates resized variants and computes dominant
+  colour and placeholder (LQIP) for immediate painting. The original is left untouched.
+
+This module does not import Django: functions run in `galeria.tarefas` pool
+processes without setting up the project.
+"""
+
+import base64
+import hashlib
+import io
+import os
+import tempfile
+from pathlib import Path
+
+from PIL import ExifTags, Image, ImageOps, UnidentifiedImageError, features
+
+# PT: Orientações do EXIF que giram 90°/270° (largura e altura trocam)
+# EN: EXIF orientations that rotate by 90°/270° (width and height swap)
+ORIENTACOES_GIRADAS = {5, 6, 7, 8}
+BLOCO = 1024 * 1024
+
+
+class ImagemInvalida(ValueError):
+    """PT: Arquivo enviado não é uma imagem aceitável. EN: Uploaded file is not an acceptable image."""
+
+
+def ler_cabecalho(arquivo) -> tuple[str, int, int]:
+    """PT: Lê formato e dimensões sem decodificar os pixels.
+    EN: Reads format and dimensions without decoding pixels.
+
+    `Image.open` é preguiçoso: consome apenas os primeiros bytes do arquivo.
+    As dimensões já seguem a orientação do EXIF, como a imagem é exibida
+    (e como `processar_imagem` as mede).
+
+    Args:
+        arquivo: objeto tipo arquivo posicionável (ex.: `UploadedFile`).
+
+    Returns:
+        tuple[str, int, int]: (formato, largura, altura).
+    """
+    arquivo.seek(0)
+    try:
+        with Image.open(arquivo) as img:
+            if img.getexif().get(ExifTags.Base.Orientation) in ORIENTACOES_GIRADAS:
+                return img.format, img.height, img.width
+            return img.format, img.width, img.height
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as exc:
+        raise ImagemInvalida('Arquivo não é uma imagem válida.') from exc
+    finally:
+        arquivo.seek(0)
+
+
+def sem_exif(caminho: str) -> tuple[str, str] | None:
+    """PT: Grava uma cópia da imagem sem EXIF ao lado de `caminho`, ou None se não houver o que remover.
+    EN: Writes an EXIF-free copy of the image next to `caminho`, or None if there is nothing to strip.
+
+    Roda no pool de `galeria.tarefas`: a cópia vai direto para um temporário
+    `.tmp-*` na pasta do blob (o coletor remove os órfãos) e o hash é calculado
+    relendo o arquivo em blocos, sem guardar o conteúdo codificado na memória.
+    Imagens com vários quadros (GIF/WebP animados) e arquivos que não são imagem
+    voltam None, para não perderem a animação.
+
+    Args:
+        caminho: caminho absoluto do blob em MEDIA_ROOT.
+
+    Returns:
+        tuple[str, str] | None: (caminho do temporário, SHA-256 do conteúdo).
+    """
+    try:
+        with Image.open(caminho) as original:
+            formato = original.format
+            tem_exif = bool(original.getexif()) or 'exif' in original.info
+            # PT: Regravar achataria a animação no primeiro quadro | EN: Rewriting would flatten the animation to one frame
+            if not tem_exif or getattr(original, 'n_frames', 1) > 1:
+                return None
+            img = ImageOps.exif_transpose(original)
+            img.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        return None
+
+    fd, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho), prefix='.tmp-')
+    try:
+        opcoes = {'quality': 90, 'optimize': True} if formato == 'JPEG' else {}
+        with os.fdopen(fd, 'wb') as destino:
+            img.save(destino, format=formato, **opcoes)
+        sha = hashlib.sha256()
+        with open(temporario, 'rb') as copia:
+            for bloco in iter(lambda: copia.read(BLOCO), b''):
+                sha.update(bloco)
+    except BaseException:
+        os.unlink(temporario)
+        raise
+    return temporario, sha.hexdigest()
+
+
+def nome_variante(caminho: str, largura: int, extensao: str) -> str:
+    """PT: Caminho da variante `<nome>.<largura>w.<ext>` ao lado do original.
+    EN: Variant path `<name>.<width>w.<ext>` next to the original.
+    """
+    base, _ = os.path.splitext(caminho)
+    return f'{base}.{largura}w.{extensao}'
+
+
+def cor_dominante(img: Image.Image) -> str:
+    """PT: Cor média da imagem em `#rrggbb` (redução para 1x1 pixel).
+    EN: Average image colour as `#rrggbb` (reduced to 1x1 pixel).
+    """
+    r, g, b = img.convert('RGB').resize((1, 1), Image.BOX).getpixel((0, 0))
+    return f'#{r:02x}{g:02x}{b:02x}'
+
+
+def placeholder(img: Image.Image, largura: int = 16) -> str:
+    """PT: Miniatura borrada como data URI (poucas centenas de bytes) para uso inline.
+    EN: Blurred thumbnail as a data URI (a few hundred bytes) for inline use.
+    """
+    altura = max(1, round(img.height * largura / img.width))
+    miniatura = img.convert('RGB').resize((largura, altura), Image.BOX)
+    saida = io.BytesIO()
+    if features.check('webp'):
+        miniatura.save(saida, format='WEBP', quality=40)
+        tipo = 'image/webp'
+    else:
+        miniatura.save(saida, format='JPEG', quality=40)
+        tipo = 'image/jpeg'
+    return f'data:{tipo};base64,{base64.b64encode(saida.getvalue()).decode()}'
+
+
+def processar_imagem(caminho: str, larguras=()) -> dict:
+    """PT: Decodifica a imagem, gera variantes e calcula cor e placeholder.
+    EN: Decodes the image, generates variants and computes colour and placeholder.
+
+    O original só é lido: blobs são nomeados pelo hash e servidos como
+    `immutable` (`galeria.storage`), então regravá-los quebraria o nome; a cópia
+    sem EXIF vira um blob novo (`sem_exif`). A função é idempotente.
+
+    Args:
+        caminho: caminho absoluto do arquivo em MEDIA_ROOT.
+        larguras: larguras (px) das variantes; maiores que o original são ignoradas.
+
+    Returns:
+        dict: `largura`, `altura`, `cor_dominante`, `placeholder` e
+        `variantes` (caminhos absolutos gerados).
+    """
+    destino = Path(caminho)
+    with Image.open(destino) as original:
+        # PT: Orientação aplicada só em memória (animações e blobs antigos mantêm o EXIF)
+        # EN: Orientation applied in memory only (animations and older blobs keep their EXIF)
+        img = ImageOps.exif_transpose(original)
+        img.load()
+
+    extensao, formato_variante = ('webp', 'WEBP') if features.check('webp') else ('png', 'PNG')
+    variantes = []
+    for largura in sorted(set(larguras)):
+        if largura >= img.width:
+            continue
+        altura = max(1, round(img.height * largura / img.width))
+        reduzida = img.resize((largura, altura), Image.LANCZOS)
+        saida = nome_variante(str(destino), largura, extensao)
+        reduzida.save(saida, format=formato_variante, quality=82)
+        variantes.append(saida)
+
+    return {
+        'largura': img.width,
+        'altura': img.height,
+        'cor_dominante': cor_dominante(img),
+        'placeholder': placeholder(img),
+        'variantes': variantes,
+    }
@@ -0,0 +1,42 @@
+"""
+PT: Operações em lote sobre fotografias (publicar, despublicar, recategorizar).
+- Um `UPDATE` por bloco de chaves primárias, sem `save()` nem sinais por linha.
+- Cada bloco roda na sua própria transação (travas curtas no SQLite).
+- O cache da galeria é invalidado uma única vez ao final.
+
+EN: Bulk operations on photographs (publish, unpublish, re-categorise).
+- One `UPDATE` per block of primary keys, no per-row `save()` or signals.
+- Each block runs in its own transaction (short locks on SQLite).
+- The gallery cache is invalidated only once at the end.
+"""
+
+from django.conf import settings
+from django.db import transaction
+
+from galeria.cache import invalidar_cache_galeria
+from galeria.models import Fotografia
+
+
+def atualizar_em_lote(queryset, tamanho_lote: int | None = None, **campos) -> int:
+    """PT: Aplica `campos` a todas as fotografias do queryset, em blocos.
+    EN: Applies `campos` to every photograph in the queryset, in blocks.
+
+    Args:
+        queryset: seleção de `Fotografia` (ex.: do admin ou de filtros).
+        tamanho_lote: chaves por `UPDATE` (padrão `GALERIA_TAMANHO_LOTE`).
+        **campos: valores a gravar (ex.: `publicada=True`).
+
+    Returns:
+        int: total de linhas atualizadas.
+    """
+    tamanho_lote = tamanho_lote or settings.GALERIA_TAMANHO_LOTE
+    # PT: Só as chaves (inteiros) são materializadas; a escrita não interfere na leitura
+    # EN: Only keys (integers) are materialised; writing never interferes with reading
+    chaves = list(queryset.order_by('pk').values_list('pk', flat=True))
+    total = 0
+    for inicio in range(0, len(chaves), tamanho_lote):
+        with transaction.atomic():
+            total += Fotografia.objects.filter(pk__in=chaves[inicio:inicio + tamanho_lote]).update(**campos)
+    if total:
+        invalidar_cache_galeria()
+    return total
@@ -0,0 +1,53 @@
+"""
+PT: Calcula dimensões, cor dominante e placeholder das fotografias que ainda não os têm.
+EN: Computes size, dominant colour and placeholder for photographs missing them.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from galeria.imagens import processar_imagem
+from galeria.models import Fotografia
+from galeria.tarefas import salvar_metadados
+
+
+class Command(BaseCommand):
+    help = (
+        "Preenche largura/altura/cor/placeholder em lote usando um pool de processos.\n"
+        "Backfills width/height/colour/placeholder in bulk using a process pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--todas', action='store_true', help='Recalcula também as que já têm placeholder.')
+        parser.add_argument('--processos', type=int, default=settings.GALERIA_PROCESSOS)
+
+    def handle(self, *args, **options):
+        fotos = Fotografia.objects.exclude(imagem='')
+        if not options['todas']:
+            fotos = fotos.filter(placeholder='')
+        storage = Fotografia._meta.get_field('imagem').storage
+        pendentes = [
+            (pk, nome)
+            for pk, nome in fotos.values_list('pk', 'imagem')
+            if storage.exists(nome)
+        ]
+
+        larguras = settings.GALERIA_VARIANTES_LARGURAS
+        concluidas = 0
+        # PT: spawn como em `galeria.tarefas`: nada de conexões/threads herdadas de um fork
+        # EN: spawn as in `galeria.tarefas`: no connections/threads inherited from a fork
+        with ProcessPoolExecutor(max_workers=options['processos'],
+                                 mp_context=multiprocessing.get_context('spawn')) as pool:
+            futuros = {(pk, nome): pool.submit(processar_imagem, storage.path(nome), larguras)
+                       for pk, nome in pendentes}
+            for (pk, nome), futuro in futuros.items():
+                try:
+                    if salvar_metadados(pk, nome, futuro.result()):
+                        concluidas += 1
+                except Exception as exc:
+                    self.stderr.write(f'Fotografia {pk}: {exc}')
+
+        self.stdout.write(self.style.SUCCESS(f'{concluidas}/{len(pendentes)} fotografias atualizadas.'))
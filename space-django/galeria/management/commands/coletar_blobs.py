@@ -0,0 +1,100 @@
+"""
+PT: Coleta de lixo do armazenamento deduplicado da galeria.
+- Remove blobs (e suas variantes) que nenhuma `Fotografia` referencia.
+- `--importar` converte arquivos legados (`fotos/...`) em blobs deduplicados.
+
+EN: Garbage collection for the gallery's deduplicated storage.
+- Removes blobs (and their variants) no `Fotografia` references.
+- `--importar` converts legacy files (`fotos/...`) into deduplicated blobs.
+"""
+
+import os
+import time
+
+from django.core.files import File
+from django.core.management.base import BaseCommand
+
+from galeria.models import Fotografia
+from galeria.storage import NOME_BLOB, PREFIXO_BLOBS
+
+
+class Command(BaseCommand):
+    help = (
+        "Remove blobs de imagem não referenciados (e importa arquivos legados com --importar).\n"
+        "Removes unreferenced image blobs (and imports legacy files with --importar)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Apenas lista o que seria removido.')
+        parser.add_argument(
+            '--idade-minima', type=int, default=3600,
+            help='Ignora arquivos mais novos que N segundos (uploads em andamento).',
+        )
+        parser.add_argument(
+            '--importar', action='store_true',
+            help='Move referências fora de blobs/ para o armazenamento deduplicado.',
+        )
+        parser.add_argument(
+            '--remover-legado', action='store_true',
+            help='Com --importar, apaga os arquivos legados que deixaram de ser referenciados.',
+        )
+
+    def handle(self, *args, **options):
+        storage = Fotografia._meta.get_field('imagem').storage
+        dry_run = options['dry_run']
+
+        if options['importar']:
+            self._importar(storage, dry_run, options['remover_legado'])
+
+        referenciados = {
+            os.path.basename(nome).split('.', 1)[0]
+            for nome in Fotografia.objects.exclude(imagem='').values_list('imagem', flat=True)
+            if nome.startswith(PREFIXO_BLOBS + '/')
+        }
+        limite = time.time() - options['idade_minima']
+        removidos = liberados = 0
+        for pasta, _subpastas, arquivos in os.walk(storage.path(PREFIXO_BLOBS)):
+            for arquivo in arquivos:
+                caminho = os.path.join(pasta, arquivo)
+                stat = os.stat(caminho)
+                if stat.st_mtime > limite:
+                    continue
+                casamento = NOME_BLOB.match(arquivo)
+                # PT: Temporários órfãos (.tmp-*) também são removidos
+                # EN: Orphan temp files (.tmp-*) are removed as well
+                if casamento and casamento['digest'] in referenciados:
+                    continue
+                removidos += 1
+                liberados += stat.st_size
+                self.stdout.write(f'{"[dry-run] " if dry_run else ""}remover {caminho}')
+                if not dry_run:
+                    os.unlink(caminho)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{removidos} arquivos não referenciados ({liberados / 1024 / 1024:.1f} MB) '
+            f'{"seriam removidos" if dry_run else "removidos"}; {len(referenciados)} blobs em uso.'
+        ))
+
+    def _importar(self, storage, dry_run, remover_legado):
+        """PT: Regrava imagens legadas como blobs e atualiza as referências com `update()`.
+        EN: Rewrites legacy images as blobs and updates references with `update()`.
+        """
+        legados = (
+            Fotografia.objects.exclude(imagem='')
+            .exclude(imagem__startswith=PREFIXO_BLOBS + '/')
+            .values_list('imagem', flat=True)
+            .distinct()
+        )
+        for nome in list(legados):
+            if not storage.exists(nome):
+                self.stderr.write(f'ausente: {nome}')
+                continue
+            if dry_run:
+                self.stdout.write(f'[dry-run] importar {nome}')
+                continue
+            with storage.open(nome) as origem:
+                novo = storage.save(nome, File(origem))
+            Fotografia.objects.filter(imagem=nome).update(imagem=novo)
+            self.stdout.write(f'importado {nome} -> {novo}')
+            if remover_legado:
+                storage.delete(nome)
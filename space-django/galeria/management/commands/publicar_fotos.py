@@ -0,0 +1,63 @@
+"""
+PT: Publica, despublica ou recategoriza fotografias em lote.
+EN: Publishes, unpublishes or re-categorises photographs in bulk.
+
+Exemplos | Examples:
+    python manage.py publicar_fotos publicar --todas
+    python manage.py publicar_fotos despublicar --ids 3,4,5
+    python manage.py publicar_fotos categorizar --categoria NEBULOSA --busca carina
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from galeria.lote import atualizar_em_lote
+from galeria.models import Fotografia
+
+
+class Command(BaseCommand):
+    help = (
+        "Aplica publicar/despublicar/categorizar a um conjunto de fotos com UPDATE em blocos.\n"
+        "Applies publish/unpublish/categorise to a set of photos with block-wise UPDATE."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('acao', choices=['publicar', 'despublicar', 'categorizar'])
+        parser.add_argument('--categoria', help='Categoria de destino (ação categorizar).')
+        parser.add_argument('--ids', help='Lista de IDs separados por vírgula.')
+        parser.add_argument('--de-categoria', help='Filtra pela categoria atual.')
+        parser.add_argument('--busca', help='Filtra por nome/legenda (icontains).')
+        parser.add_argument('--todas', action='store_true', help='Seleciona todas as fotografias.')
+        parser.add_argument('--lote', type=int, help='Chaves por UPDATE (padrão GALERIA_TAMANHO_LOTE).')
+
+    def handle(self, *args, **options):
+        fotos = Fotografia.objects.all()
+        filtrou = False
+        if options['ids']:
+            try:
+                ids = [int(i) for i in options['ids'].split(',') if i.strip()]
+            except ValueError:
+                raise CommandError('--ids deve conter apenas números.')
+            fotos = fotos.filter(pk__in=ids)
+            filtrou = True
+        if options['de_categoria']:
+            fotos = fotos.filter(categoria=options['de_categoria'])
+            filtrou = True
+        if options['busca']:
+            termo = options['busca']
+            fotos = fotos.filter(Q(nome__icontains=termo) | Q(legenda__icontains=termo))
+            filtrou = True
+        if not filtrou and not options['todas']:
+            raise CommandError('Informe um filtro (--ids, --de-categoria, --busca) ou --todas.')
+
+        acao = options['acao']
+        if acao == 'categorizar':
+            categorias = dict(Fotografia.OPCOES_CATEGORIA)
+            if options['categoria'] not in categorias:
+                raise CommandError(f'--categoria deve ser uma de: {", ".join(categorias)}.')
+            campos = {'categoria': options['categoria']}
+        else:
+            campos = {'publicada': acao == 'publicar'}
+
+        total = atualizar_em_lote(fotos, tamanho_lote=options['lote'], **campos)
+        self.stdout.write(self.style.SUCCESS(f'{total} fotografias atualizadas ({acao}).'))
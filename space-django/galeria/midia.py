@@ -0,0 +1,203 @@
+"""
+PT: Entrega eficiente de arquivos de mídia (uploads) para o site público.
+- Usa `FileResponse` (o servidor WSGI pode aplicar `wsgi.file_wrapper`/sendfile).
+- Cabeçalhos ETag/Last-Modified e respostas 304 para requisições condicionais.
+- Suporte a `Range: bytes=...` (respostas 206) para downloads parciais.
+- Cache imutável para nomes com hash de conteúdo (ex.: `3fa2...9c.png`).
+- Modo `X-Accel-Redirect` para delegar a entrega a um proxy reverso (nginx).
+
+EN: Efficient delivery of media files (uploads) for the public site.
+- Uses `FileResponse` (the WSGI server may apply `wsgi.file_wrapper`/sendfile).
+- ETag/Last-Modified headers and 304 responses for conditional requests.
+- `Range: bytes=...` support (206 responses) for partial downloads.
+- Immutable caching for content-hashed names (e.g. `3fa2...9c.png`).
+- `X-Accel-Redirect` mode to hand delivery off to a reverse proxy (nginx).
+"""
+
+import mimetypes
+import os
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+
+# PT: Nomes com hash hexadecimal longo nunca mudam de conteúdo
+# EN: Names carrying a long hex hash never change content
+_NOME_COM_HASH = re.compile(r'(^|[._-])[0-9a-f]{16,}([._-]|$)')
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+_TAMANHO_BLOCO = 64 * 1024
+# PT/EN: Como o FileResponse do Django | like Django's FileResponse
+_TIPO_COMPACTADO = {'bzip2': 'application/x-bzip', 'gzip': 'application/gzip', 'xz': 'application/x-xz'}
+
+
+def _cache_control(nome: str) -> str:
+    """PT: Política de cache conforme o nome do arquivo.
+    EN: Cache policy based on the file name.
+    """
+    if _NOME_COM_HASH.search(nome):
+        return 'public, max-age=31536000, immutable'
+    return f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}'
+
+
+def _etag(stat: os.stat_result) -> str:
+    """PT: ETag forte derivado de mtime (ns) e tamanho, como o do nginx (sem ler o arquivo).
+    Precisa ser forte para valer no If-Range (RFC 7233).
+    EN: Strong ETag derived from mtime (ns) and size, like nginx's (no file read).
+    It must be strong to count in If-Range (RFC 7233).
+    """
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def _nao_modificado(request, etag: str, mtime: float) -> bool:
+    """PT: Avalia If-None-Match (prioritário) e If-Modified-Since.
+    EN: Evaluates If-None-Match (takes precedence) and If-Modified-Since.
+    """
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match is not None:
+        # PT: Comparação fraca: `W/"x"` casa com `"x"` | EN: Weak comparison: `W/"x"` matches `"x"`
+        candidatos = [c.strip().removeprefix('W/') for c in if_none_match.split(',')]
+        return '*' in candidatos or etag in candidatos
+    desde = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return desde is not None and int(mtime) <= desde
+
+
+def _intervalo(request, etag: str, mtime: float, tamanho: int):
+    """PT: Interpreta um único intervalo `bytes=inicio-fim`.
+    EN: Parses a single `bytes=start-end` range.
+
+    Returns:
+        tuple[int, int] | None | False: (inicio, fim) inclusivo; None para
+        resposta completa; False quando o intervalo não é satisfazível.
+    """
+    cabecalho = request.headers.get('Range')
+    if not cabecalho or tamanho == 0:
+        return None
+    # PT: If-Range desatualizado → envia o arquivo inteiro. Comparação forte: um ETag
+    #     fraco (`W/...`) nunca casa; uma data precisa ser igual ao Last-Modified.
+    # EN: Stale If-Range → send the full file. Strong comparison: a weak ETag
+    #     (`W/...`) never matches; a date must equal Last-Modified.
+    if_range = request.headers.get('If-Range', '').strip()
+    if if_range:
+        if if_range.startswith(('"', 'W/')):
+            if if_range != etag:
+                return None
+        elif parse_http_date_safe(if_range) != int(mtime):
+            return None
+    casamento = _RANGE.match(cabecalho.strip())
+    if not casamento:
+        return None  # PT/EN: Múltiplos intervalos ou sintaxe inválida → 200
+    inicio, fim = casamento.groups()
+    if inicio == '':
+        if fim == '':
+            return None
+        sufixo = int(fim)
+        if sufixo == 0:
+            return False
+        return max(tamanho - sufixo, 0), tamanho - 1
+    inicio = int(inicio)
+    fim = int(fim) if fim else tamanho - 1
+    if inicio >= tamanho or fim < inicio:
+        return False
+    return inicio, min(fim, tamanho - 1)
+
+
+def _ler_trecho(caminho: Path, inicio: int, fim: int):
+    """PT: Gera blocos do arquivo entre `inicio` e `fim` (inclusivos).
+    EN: Yields file chunks between `start` and `end` (inclusive).
+    """
+    restante = fim - inicio + 1
+    with open(caminho, 'rb') as arquivo:
+        arquivo.seek(inicio)
+        while restante > 0:
+            bloco = arquivo.read(min(_TAMANHO_BLOCO, restante))
+            if not bloco:
+                break
+            restante -= len(bloco)
+            yield bloco
+
+
+def _resolver(caminho_relativo: str) -> Path:
+    """PT: Resolve o caminho dentro de MEDIA_ROOT (bloqueia `..`/symlinks para fora).
+    EN: Resolves the path inside MEDIA_ROOT (blocks `..`/symlinks escaping it).
+    """
+    raiz = Path(settings.MEDIA_ROOT).resolve()
+    caminho = (raiz / caminho_relativo).resolve()
+    if raiz not in caminho.parents or not caminho.is_file():
+        raise Http404('Arquivo não encontrado.')
+    return caminho
+
+
+@require_safe
+def servir_midia(request, caminho: str):
+    """PT: Entrega um arquivo de MEDIA_ROOT com cache, condicionais e Range.
+    EN: Serves a MEDIA_ROOT file with caching, conditionals and Range.
+    """
+    arquivo = _resolver(caminho)
+    stat = arquivo.stat()
+    etag = _etag(stat)
+    # PT: A codificação (ex.: `.tar.gz` → gzip) não vira Content-Encoding, senão o navegador
+    #     descompacta o download; como o FileResponse do Django, o arquivo sai como está.
+    # EN: The encoding (e.g. `.tar.gz` → gzip) does not become Content-Encoding, otherwise the
+    #     browser decompresses the download; like Django's FileResponse, the file goes out as is.
+    tipo, codificacao = mimetypes.guess_type(arquivo.name)
+    if codificacao:
+        tipo = _TIPO_COMPACTADO.get(codificacao, 'application/octet-stream')
+    tipo = tipo or 'application/octet-stream'
+
+    comuns = {
+        'ETag': etag,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Cache-Control': _cache_control(arquivo.name),
+        'Accept-Ranges': 'bytes',
+    }
+
+    if _nao_modificado(request, etag, stat.st_mtime):
+        resposta = HttpResponseNotModified()
+        for chave, valor in comuns.items():
+            resposta[chave] = valor
+        return resposta
+
+    # PT: Modo proxy: o nginx lê o disco (sendfile, Range e condicionais nativos)
+    # EN: Proxy mode: nginx reads the disk (native sendfile, Range and conditionals)
+    prefixo = settings.MEDIA_ACCEL_REDIRECT_PREFIX
+    if prefixo:
+        resposta = HttpResponse(content_type=tipo)
+        relativo = arquivo.relative_to(Path(settings.MEDIA_ROOT).resolve()).as_posix()
+        resposta['X-Accel-Redirect'] = prefixo.rstrip('/') + '/' + relativo
+        resposta['X-Accel-Buffering'] = 'no'
+        for chave, valor in comuns.items():
+            resposta[chave] = valor
+        return resposta
+
+    intervalo = _intervalo(request, etag, stat.st_mtime, stat.st_size)
+    if intervalo is False:
+        resposta = HttpResponse(status=416)
+        resposta['Content-Range'] = f'bytes */{stat.st_size}'
+        return resposta
+
+    if intervalo is None:
+        # PT: FileResponse expõe o arquivo ao `wsgi.file_wrapper` (zero-copy quando suportado)
+        # EN: FileResponse exposes the file to `wsgi.file_wrapper` (zero-copy when supported)
+        resposta = FileResponse(open(arquivo, 'rb'), content_type=tipo)
+        resposta['Content-Length'] = str(stat.st_size)
+    else:
+        inicio, fim = intervalo
+        resposta = StreamingHttpResponse(
+            _ler_trecho(arquivo, inicio, fim), status=206, content_type=tipo
+        )
+        resposta['Content-Range'] = f'bytes {inicio}-{fim}/{stat.st_size}'
+        resposta['Content-Length'] = str(fim - inicio + 1)
+
+    for chave, valor in comuns.items():
+        resposta[chave] = valor
+    return resposta
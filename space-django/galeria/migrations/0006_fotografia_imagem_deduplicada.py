@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-19 00:10
+
+import galeria.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('galeria', '0005_alter_fotografia_imagem'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='fotografia',
+            name='imagem',
+            field=models.ImageField(blank=True, storage=galeria.storage.armazenamento_imagens, upload_to='fotos/%Y/%m/%d/'),
+        ),
+    ]
@@ -6,6 +6,8 @@ EN: Models for the space gallery application.
 from django.db import models
 from datetime import datetime
 
+from galeria.storage import armazenamento_imagens
+
 
 class Fotografia(models.Model):
     """PT: Representa uma fotografia com metadados e arquivo de imagem.
@@ -29,8 +31,15 @@ class Fotografia(models.Model):
     categoria = models.CharField(max_length=100, choices=OPCOES_CATEGORIA, default="")
     # PT: Descrição longa opcional | EN: Optional long description
     descricao = models.TextField(null=True, blank=True)
-    # PT: Arquivo da imagem; armazenado em pasta por data | EN: Image file; stored by date path
-    imagem = models.ImageField(upload_to='fotos/%Y/%m/%d/', blank=True)
+    # PT: Arquivo da imagem; gravado como blob SHA-256 deduplicado (ver galeria.storage)
+    # EN: Image file; stored as a deduplicated SHA-256 blob (see galeria.storage)
+    imagem = models.ImageField(upload_to='fotos/%Y/%m/%d/', blank=True, storage=armazenamento_imagens)
+    # PT: Dimensões reais, cor dominante e placeholder (LQIP), calculados uma vez por imagem
+    # EN: Intrinsic size, dominant colour and placeholder (LQIP), computed once per image
+    largura = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    altura = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    cor_dominante = models.CharField(max_length=7, blank=True, default='', editable=False)
+    placeholder = models.TextField(blank=True, default='', editable=False)
     # PT: Data/hora associada à imagem | EN: Datetime associated to the image
     data_imagem = models.DateTimeField(default=datetime.now, blank=False)
     # PT: Controle de publicação | EN: Publish toggle
@@ -0,0 +1,19 @@
+"""
+PT: Sinais da galeria: invalida o cache quando uma fotografia muda individualmente.
+Atualizações em lote (`galeria.lote`) usam `update()` e invalidam uma única vez.
+
+EN: Gallery signals: invalidate the cache when a single photograph changes.
+Bulk updates (`galeria.lote`) use `update()` and invalidate only once.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from galeria.cache import invalidar_cache_galeria
+from galeria.models import Fotografia
+
+
+@receiver(post_save, sender=Fotografia)
+@receiver(post_delete, sender=Fotografia)
+def fotografia_alterada(sender, **kwargs):
+    invalidar_cache_galeria()
@@ -0,0 +1,133 @@
+"""
+PT: Armazenamento endereçado por conteúdo (SHA-256) para imagens da galeria.
+- Cada conteúdo é gravado uma única vez em `blobs/ab/cd/<sha256>.<ext>`.
+- Uploads idênticos reutilizam o mesmo blob (várias linhas referenciam o nome).
+- O upload é gravado como chegou, sem decodificar (o hash é dos bytes enviados).
+  A cópia sem EXIF é feita depois, no pool de `galeria.tarefas`, e entra como
+  um blob novo via `adotar`: um blob nunca é regravado, então o conteúdo sempre
+  confere com o nome servido como `immutable`.
+- Blobs nunca são apagados por `delete()`; a limpeza é feita pelo comando
+  `coletar_blobs`, que remove o que não é mais referenciado.
+
+EN: Content-addressed (SHA-256) storage for gallery images.
+- Each content is written once at `blobs/ab/cd/<sha256>.<ext>`.
+- Identical uploads reuse the same blob (several rows reference the name).
+- Uploads are stored as received, without decoding (the hash covers the bytes
+  sent). The EXIF-free copy is made later in the `galeria.tarefas` pool and comes
+  in as a new blob through `adotar`: a blob is never rewritten, so its content
+  always matches the name served as `immutable`.
+- Blobs are never removed by `delete()`; cleanup is done by the
+  `coletar_blobs` command, which removes whatever is no longer referenced.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+PREFIXO_BLOBS = 'blobs'
+# PT: `<sha256>.<ext>` (blob) ou `<sha256>.<largura>w.<ext>` (variante)
+# EN: `<sha256>.<ext>` (blob) or `<sha256>.<width>w.<ext>` (variant)
+NOME_BLOB = re.compile(r'^(?P<digest>[0-9a-f]{64})(?:\.\d+w)?\.[0-9a-z]+$')
+
+
+def caminho_blob(digest: str, extensao: str) -> str:
+    """PT: Nome relativo do blob, particionado pelos 4 primeiros dígitos do hash.
+    EN: Relative blob name, sharded by the first 4 hash digits.
+    """
+    return f'{PREFIXO_BLOBS}/{digest[:2]}/{digest[2:4]}/{digest}{extensao}'
+
+
+@deconstructible
+class ArmazenamentoDeduplicado(FileSystemStorage):
+    """PT: `FileSystemStorage` que nomeia arquivos pelo SHA-256 do conteúdo.
+    EN: `FileSystemStorage` that names files by the SHA-256 of their content.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # PT: O nome final vem do hash em `_save`; colisões são deduplicação
+        # EN: The final name comes from the hash in `_save`; collisions mean dedup
+        return name
+
+    def _existente(self, digest: str) -> str | None:
+        """PT: Procura um blob já gravado com o mesmo hash (qualquer extensão).
+        EN: Looks up an already stored blob with the same hash (any extension).
+        """
+        pasta = os.path.dirname(self.path(caminho_blob(digest, '')))
+        try:
+            nomes = os.listdir(pasta)
+        except FileNotFoundError:
+            return None
+        for nome in nomes:
+            raiz, extensao = os.path.splitext(nome)
+            if raiz == digest:
+                return caminho_blob(digest, extensao)
+        return None
+
+    def _save(self, name, content):
+        """PT: Grava em arquivo temporário calculando o hash em uma só passada e
+        renomeia atomicamente; se o blob já existe, descarta a cópia.
+
+        EN: Writes to a temp file while hashing in a single pass and renames
+        atomically; if the blob already exists, the copy is discarded.
+        """
+        raiz_tmp = self.path(PREFIXO_BLOBS)
+        os.makedirs(raiz_tmp, exist_ok=True)
+        sha = hashlib.sha256()
+        fd, temporario = tempfile.mkstemp(dir=raiz_tmp, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as destino:
+                for bloco in content.chunks():
+                    sha.update(bloco)
+                    destino.write(bloco)
+            return self.adotar(temporario, sha.hexdigest(), os.path.splitext(name)[1].lower())
+        except BaseException:
+            if os.path.exists(temporario):
+                os.unlink(temporario)
+            raise
+
+    def adotar(self, temporario: str, digest: str, extensao: str) -> str:
+        """PT: Move um arquivo já gravado (com hash `digest`) para o seu blob; se o
+        blob já existe, descarta o arquivo. Usado por `_save` e pela troca do blob
+        sem EXIF em `galeria.tarefas`.
+
+        EN: Moves an already written file (hashed as `digest`) into its blob; if
+        the blob already exists, the file is discarded. Used by `_save` and by the
+        EXIF-free blob swap in `galeria.tarefas`.
+
+        Returns:
+            str: nome relativo do blob | relative blob name.
+        """
+        existente = self._existente(digest)
+        if existente:
+            os.unlink(temporario)
+            # PT: Renova o mtime: a linha que vai referenciá-lo ainda pode estar numa transação aberta,
+            #     e o `coletar_blobs` só poupa blobs novos (`--idade-minima`)
+            # EN: Refresh the mtime: the row that will reference it may still be in an open transaction,
+            #     and `coletar_blobs` only spares new blobs (`--idade-minima`)
+            os.utime(self.path(existente))
+            return existente
+        nome = caminho_blob(digest, extensao)
+        caminho = self.path(nome)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        # PT: mkstemp cria com 0600; servidores web precisam ler o blob
+        # EN: mkstemp creates 0600 files; web servers need to read the blob
+        os.chmod(temporario, self.file_permissions_mode or 0o644)
+        os.replace(temporario, caminho)
+        return nome
+
+    def delete(self, name):
+        # PT: Blobs podem ser compartilhados; só o coletor os remove
+        # EN: Blobs may be shared; only the collector removes them
+        if not name.startswith(PREFIXO_BLOBS + '/'):
+            super().delete(name)
+
+
+def armazenamento_imagens():
+    """PT: Storage do campo `Fotografia.imagem` (callable mantém migrações estáveis).
+    EN: Storage for `Fotografia.imagem` (a callable keeps migrations stable).
+    """
+    return ArmazenamentoDeduplicado()
@@ -0,0 +1,170 @@
+"""
+PT: Fila de processamento de imagens em segundo plano (pool de processos local).
+- A view apenas enfileira; remoção do EXIF, decodificação, variantes e
+  placeholder rodam em processos separados, sem bloquear a requisição nem o GIL
+  do servidor.
+- Primeiro `sem_exif` grava uma cópia limpa; ela vira um blob novo e a
+  fotografia passa a apontar para ele (`trocar_blob`). O blob original fica
+  sem referência e o `coletar_blobs` o remove.
+- Ao concluir, dimensões, cor dominante e placeholder são gravados no modelo.
+
+EN: Background image processing queue (local process pool).
+- The view only enqueues; EXIF stripping, decoding, variants and placeholder
+  run in separate processes, without blocking the request or the server's GIL.
+- First `sem_exif` writes a clean copy; it becomes a new blob and the
+  photograph is pointed at it (`trocar_blob`). The original blob is left
+  unreferenced and `coletar_blobs` removes it.
+- On completion, size, dominant colour and placeholder are saved on the model.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from django.conf import settings
+from django.db import connection
+
+from galeria.cache import invalidar_cache_galeria
+from galeria.imagens import processar_imagem, sem_exif
+from galeria.models import Fotografia
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_trava = threading.Lock()
+
+
+def _pool() -> ProcessPoolExecutor:
+    """PT: Cria o pool sob demanda (spawn evita herdar threads/conexões do servidor).
+    EN: Lazily creates the pool (spawn avoids inheriting server threads/connections).
+    """
+    global _executor
+    with _trava:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.GALERIA_PROCESSOS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _executor
+
+
+CAMPOS_METADADOS = ('largura', 'altura', 'cor_dominante', 'placeholder')
+
+
+def salvar_metadados(foto_id: int, nome: str, resultado: dict) -> bool:
+    """PT: Grava dimensões/cor/placeholder com um único `UPDATE` (sem sinais nem `save()`).
+    EN: Stores size/colour/placeholder with a single `UPDATE` (no signals, no `save()`).
+
+    O `UPDATE` só vale se a fotografia ainda aponta para `nome`: um resultado
+    atrasado de uma imagem já trocada não sobrescreve o da imagem nova.
+
+    Returns:
+        bool: False se a imagem mudou e o resultado foi descartado.
+    """
+    atualizadas = Fotografia.objects.filter(pk=foto_id, imagem=nome).update(
+        **{campo: resultado[campo] for campo in CAMPOS_METADADOS}
+    )
+    if atualizadas:
+        invalidar_cache_galeria()
+    return bool(atualizadas)
+
+
+def _concluir(foto_id: int, nome: str, futuro, fechar_conexao: bool = True) -> None:
+    """PT: Callback executado no processo web quando o trabalho termina.
+    EN: Callback run in the web process when the job finishes.
+
+    Roda numa thread do executor: a conexão de banco aberta aqui é fechada ao final.
+    """
+    try:
+        resultado = futuro.result()
+        salva = salvar_metadados(foto_id, nome, resultado)
+    except Exception:
+        logger.exception('Falha ao processar imagem da fotografia %s', foto_id)
+    else:
+        if salva:
+            logger.info('Imagem da fotografia %s processada: %s', foto_id, resultado['variantes'])
+        else:
+            logger.info('Imagem da fotografia %s trocada durante o processamento; resultado descartado', foto_id)
+    finally:
+        if fechar_conexao:
+            connection.close()
+
+
+def trocar_blob(foto_id: int, nome: str, limpo: tuple[str, str] | None) -> str | None:
+    """PT: Aponta a fotografia para a cópia sem EXIF (`limpo`, de `sem_exif`).
+    EN: Points the photograph at the EXIF-free copy (`limpo`, from `sem_exif`).
+
+    Como em `salvar_metadados`, o `UPDATE` só vale se a fotografia ainda aponta
+    para `nome`.
+
+    Returns:
+        str | None: nome da imagem a processar, ou None se a fotografia já aponta
+        para outra | image name to process, or None if the photograph moved on.
+    """
+    if limpo is None:
+        return nome
+    temporario, digest = limpo
+    storage = Fotografia._meta.get_field('imagem').storage
+    novo = storage.adotar(temporario, digest, os.path.splitext(nome)[1].lower())
+    if not Fotografia.objects.filter(pk=foto_id, imagem=nome).update(imagem=novo):
+        return None
+    invalidar_cache_galeria()
+    return novo
+
+
+def _executar(funcao, *args) -> Future:
+    """PT: Roda no pool, ou na hora com `GALERIA_PROCESSAMENTO_SINCRONO=True` (testes/dev).
+    EN: Runs in the pool, or right away with `GALERIA_PROCESSAMENTO_SINCRONO=True` (tests/dev).
+    """
+    if not settings.GALERIA_PROCESSAMENTO_SINCRONO:
+        return _pool().submit(funcao, *args)
+    futuro = Future()
+    try:
+        futuro.set_result(funcao(*args))
+    except Exception as exc:
+        futuro.set_exception(exc)
+    return futuro
+
+
+def _exif_removido(foto_id: int, nome: str, futuro) -> None:
+    """PT: Callback da remoção do EXIF: troca o blob e enfileira o processamento.
+    EN: EXIF-stripping callback: swaps the blob and enqueues processing.
+    """
+    fechar_conexao = not settings.GALERIA_PROCESSAMENTO_SINCRONO
+    try:
+        atual = trocar_blob(foto_id, nome, futuro.result())
+    except Exception:
+        # PT/EN: Segue com o original | carries on with the original
+        logger.exception('Falha ao remover o EXIF da fotografia %s', foto_id)
+        atual = nome
+    finally:
+        if fechar_conexao:
+            connection.close()
+    if atual is None:
+        logger.info('Imagem da fotografia %s trocada antes da remoção do EXIF; nada a fazer', foto_id)
+        return
+    larguras = settings.GALERIA_VARIANTES_LARGURAS
+    caminho = Fotografia._meta.get_field('imagem').storage.path(atual)
+    _executar(processar_imagem, caminho, larguras).add_done_callback(
+        lambda f: _concluir(foto_id, atual, f, fechar_conexao=fechar_conexao))
+
+
+def enfileirar_processamento(foto_id: int, nome: str) -> Future:
+    """PT: Agenda a remoção do EXIF e o processamento da imagem de uma fotografia.
+    EN: Schedules EXIF stripping and image processing for a photograph.
+
+    Com `GALERIA_PROCESSAMENTO_SINCRONO=True` (testes/dev) executa na hora.
+
+    Args:
+        foto_id: chave da fotografia.
+        nome: nome da imagem no storage (`fotografia.imagem.name`), conferido ao salvar.
+
+    Returns:
+        Future: futuro da primeira etapa (remoção do EXIF) | first stage future (EXIF stripping).
+    """
+    caminho = Fotografia._meta.get_field('imagem').storage.path(nome)
+    futuro = _executar(sem_exif, caminho)
+    futuro.add_done_callback(lambda f: _exif_removido(foto_id, nome, f))
+    return futuro
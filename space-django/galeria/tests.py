@@ -1,3 +1,356 @@
-from django.test import TestCase
+import hashlib
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
 
-# Create your tests here.
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from PIL import Image
+
+from galeria.cache import versao_galeria
+from galeria.imagens import ler_cabecalho, processar_imagem, sem_exif
+from galeria.lote import atualizar_em_lote
+from galeria.models import Fotografia
+from galeria.storage import NOME_BLOB, ArmazenamentoDeduplicado
+from galeria.tarefas import salvar_metadados, trocar_blob
+
+
+class ServirMidiaTests(SimpleTestCase):
+    """PT: Cache, condicionais e Range de `galeria.midia.servir_midia`.
+    EN: Caching, conditionals and Range in `galeria.midia.servir_midia`.
+    """
+
+    def setUp(self):
+        self.raiz = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.raiz)
+        (self.raiz / 'nota.txt').write_bytes(b'0123456789')
+        (self.raiz / 'pacote.tar.gz').write_bytes(b'\x1f\x8b conteudo')
+        (self.raiz / 'foto.0123456789abcdef0123.jpg').write_bytes(b'jpeg')
+        configuracao = override_settings(MEDIA_ROOT=str(self.raiz), MEDIA_ACCEL_REDIRECT_PREFIX='')
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+    def _get(self, nome, **cabecalhos):
+        return self.client.get(f'/media/{nome}', headers=cabecalhos)
+
+    def test_resposta_completa_com_validadores(self):
+        resposta = self._get('nota.txt')
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(b''.join(resposta.streaming_content), b'0123456789')
+        self.assertTrue(resposta['ETag'].startswith('"'))
+        self.assertEqual(resposta['Accept-Ranges'], 'bytes')
+        self.assertIn('Last-Modified', resposta)
+
+    def test_if_none_match_devolve_304(self):
+        etag = self._get('nota.txt')['ETag']
+        self.assertEqual(self._get('nota.txt', if_none_match=etag).status_code, 304)
+        # PT/EN: Comparação fraca | weak comparison
+        self.assertEqual(self._get('nota.txt', if_none_match=f'"x", W/{etag}').status_code, 304)
+        self.assertEqual(self._get('nota.txt', if_none_match='"outro"').status_code, 200)
+
+    def test_if_modified_since_devolve_304(self):
+        ultima = self._get('nota.txt')['Last-Modified']
+        self.assertEqual(self._get('nota.txt', if_modified_since=ultima).status_code, 304)
+
+    def test_range(self):
+        resposta = self._get('nota.txt', range='bytes=2-5')
+        self.assertEqual(resposta.status_code, 206)
+        self.assertEqual(b''.join(resposta.streaming_content), b'2345')
+        self.assertEqual(resposta['Content-Range'], 'bytes 2-5/10')
+        self.assertEqual(resposta['Content-Length'], '4')
+        sufixo = self._get('nota.txt', range='bytes=-3')
+        self.assertEqual(b''.join(sufixo.streaming_content), b'789')
+
+    def test_range_fora_do_arquivo_devolve_416(self):
+        resposta = self._get('nota.txt', range='bytes=50-')
+        self.assertEqual(resposta.status_code, 416)
+        self.assertEqual(resposta['Content-Range'], 'bytes */10')
+
+    def test_if_range(self):
+        completa = self._get('nota.txt')
+        etag, ultima = completa['ETag'], completa['Last-Modified']
+        self.assertEqual(self._get('nota.txt', range='bytes=0-1', if_range=etag).status_code, 206)
+        self.assertEqual(self._get('nota.txt', range='bytes=0-1', if_range=ultima).status_code, 206)
+        self.assertEqual(self._get('nota.txt', range='bytes=0-1', if_range='"antigo"').status_code, 200)
+        # PT: ETag fraco nunca vale no If-Range | EN: A weak ETag never counts in If-Range
+        self.assertEqual(self._get('nota.txt', range='bytes=0-1', if_range=f'W/{etag}').status_code, 200)
+
+    def test_arquivo_compactado_sai_como_esta(self):
+        resposta = self._get('pacote.tar.gz')
+        self.assertNotIn('Content-Encoding', resposta)
+        self.assertEqual(resposta['Content-Type'], 'application/gzip')
+
+    def test_cache_imutavel_so_para_nomes_com_hash(self):
+        self.assertIn('immutable', self._get('foto.0123456789abcdef0123.jpg')['Cache-Control'])
+        self.assertNotIn('immutable', self._get('nota.txt')['Cache-Control'])
+
+    def test_caminho_fora_de_media_root(self):
+        self.assertEqual(self._get('../manage.py').status_code, 404)
+
+
+class UploadLimitadoTests(TestCase):
+    """PT: O limite de tamanho vale só na edição da foto. EN: The size limit applies only to the photo edit view."""
+
+    def setUp(self):
+        self.foto = Fotografia.objects.create(nome='Orion', legenda='Nebulosa')
+
+    def test_limite_nao_e_global(self):
+        self.assertNotIn('galeria.uploads.LimiteTamanhoUploadHandler', settings.FILE_UPLOAD_HANDLERS)
+
+    @override_settings(GALERIA_UPLOAD_MAX_BYTES=100)
+    def test_upload_acima_do_limite_devolve_413(self):
+        arquivo = SimpleUploadedFile('grande.png', b'x' * 1000, content_type='image/png')
+        resposta = self.client.post(f'/imagem/{self.foto.pk}/editar/',
+                                    {'nome': 'Orion', 'legenda': 'Nebulosa', 'imagem': arquivo})
+        self.assertEqual(resposta.status_code, 413)
+
+    def test_csrf_continua_valendo(self):
+        resposta = Client(enforce_csrf_checks=True).post(f'/imagem/{self.foto.pk}/editar/',
+                                                         {'nome': 'Orion', 'legenda': 'Nebulosa'})
+        self.assertEqual(resposta.status_code, 403)
+
+
+def _imagem(formato, quadros=1, exif=True, orientacao=None) -> bytes:
+    """PT: Imagem pequena em memória, com EXIF opcional. EN: Small in-memory image, optional EXIF."""
+    imagens = [Image.new('RGB', (40, 20), cor) for cor in ('red', 'blue', 'green')[:quadros]]
+    opcoes = {}
+    if exif:
+        opcoes['exif'] = Image.Exif()
+        opcoes['exif'][0x010E] = 'descricao'
+        if orientacao:
+            opcoes['exif'][0x0112] = orientacao
+    if quadros > 1:
+        opcoes.update(save_all=True, append_images=imagens[1:])
+    saida = io.BytesIO()
+    imagens[0].save(saida, format=formato, **opcoes)
+    return saida.getvalue()
+
+
+class ArmazenamentoDeduplicadoTests(SimpleTestCase):
+    """PT: Blobs endereçados por conteúdo em `galeria.storage`. EN: Content-addressed blobs in `galeria.storage`."""
+
+    def setUp(self):
+        self.raiz = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.raiz)
+        self.storage = ArmazenamentoDeduplicado(location=str(self.raiz))
+
+    def _conferir_hash(self, nome):
+        conteudo = (self.raiz / nome).read_bytes()
+        self.assertEqual(NOME_BLOB.match(Path(nome).name)['digest'], hashlib.sha256(conteudo).hexdigest())
+        return conteudo
+
+    def test_conteudo_identico_reutiliza_o_blob(self):
+        conteudo = _imagem('PNG', exif=False)
+        primeiro = self.storage.save('a.png', ContentFile(conteudo))
+        segundo = self.storage.save('b.png', ContentFile(conteudo))
+        self.assertEqual(primeiro, segundo)
+        self.assertEqual(self._conferir_hash(primeiro), conteudo)
+        self.assertEqual(len(list(self.raiz.rglob('*.png'))), 1)
+
+    def test_upload_gravado_como_chegou(self):
+        # PT: Sem decodificar na requisição; o EXIF sai depois, no worker
+        # EN: No decoding in the request; EXIF comes off later, in the worker
+        conteudo = _imagem('JPEG')
+        nome = self.storage.save('foto.jpg', ContentFile(conteudo))
+        self.assertEqual(self._conferir_hash(nome), conteudo)
+
+    def test_imagem_animada_fica_intacta(self):
+        conteudo = _imagem('WEBP', quadros=3)
+        nome = self.storage.save('animada.webp', ContentFile(conteudo))
+        self.assertEqual(self._conferir_hash(nome), conteudo)
+
+    def test_delete_nao_remove_blob(self):
+        nome = self.storage.save('a.png', ContentFile(_imagem('PNG', exif=False)))
+        self.storage.delete(nome)
+        self.assertTrue(self.storage.exists(nome))
+
+
+class ColetaBlobsTests(TestCase):
+    """PT: `coletar_blobs` contra uploads em andamento. EN: `coletar_blobs` against in-flight uploads."""
+
+    def setUp(self):
+        self.raiz = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.raiz)
+        midia = override_settings(MEDIA_ROOT=self.raiz)
+        midia.enable()
+        self.addCleanup(midia.disable)
+
+    def test_reuso_protege_blob_antigo_do_coletor(self):
+        conteudo = _imagem('PNG', exif=False)
+        storage = Fotografia._meta.get_field('imagem').storage
+        nome = storage.save('a.png', ContentFile(conteudo))
+        antigo = time.time() - 7200
+        os.utime(storage.path(nome), (antigo, antigo))
+        # PT: Upload repetido cuja linha ainda não foi gravada | EN: Repeated upload whose row is not written yet
+        self.assertEqual(storage.save('b.png', ContentFile(conteudo)), nome)
+        call_command('coletar_blobs', stdout=io.StringIO())
+        self.assertTrue(storage.exists(nome))
+
+        os.utime(storage.path(nome), (antigo, antigo))
+        call_command('coletar_blobs', stdout=io.StringIO())
+        self.assertFalse(storage.exists(nome))
+
+
+class ProcessarImagemTests(SimpleTestCase):
+    """PT: `galeria.imagens.processar_imagem`. EN: `galeria.imagens.processar_imagem`."""
+
+    def setUp(self):
+        self.pasta = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.pasta)
+
+    def test_cabecalho_segue_a_orientacao(self):
+        self.assertEqual(ler_cabecalho(io.BytesIO(_imagem('JPEG', orientacao=6))), ('JPEG', 20, 40))
+        self.assertEqual(ler_cabecalho(io.BytesIO(_imagem('JPEG', orientacao=3))), ('JPEG', 40, 20))
+
+    def test_original_nunca_e_regravado(self):
+        for formato, quadros in (('JPEG', 1), ('WEBP', 3)):
+            with self.subTest(formato=formato):
+                caminho = self.pasta / f'original.{formato.lower()}'
+                caminho.write_bytes(_imagem(formato, quadros))
+                antes = caminho.read_bytes()
+                resultado = processar_imagem(str(caminho), larguras=(20,))
+                self.assertEqual(caminho.read_bytes(), antes)
+                self.assertEqual((resultado['largura'], resultado['altura']), (40, 20))
+                self.assertEqual(len(resultado['variantes']), 1)
+
+
+@override_settings(GALERIA_PROCESSAMENTO_SINCRONO=True)
+class ExifNoWorkerTests(TestCase):
+    """PT: A cópia sem EXIF vira um blob novo no worker. EN: The EXIF-free copy becomes a new blob in the worker."""
+
+    def setUp(self):
+        self.raiz = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.raiz)
+        midia = override_settings(MEDIA_ROOT=self.raiz)
+        midia.enable()
+        self.addCleanup(midia.disable)
+        self.foto = Fotografia.objects.create(nome='Orion', legenda='Nebulosa')
+
+    def _enviar(self, conteudo):
+        arquivo = SimpleUploadedFile('foto.jpg', conteudo, content_type='image/jpeg')
+        resposta = self.client.post(f'/imagem/{self.foto.pk}/editar/',
+                                    {'nome': 'Orion', 'legenda': 'Nebulosa', 'imagem': arquivo})
+        self.assertEqual(resposta.status_code, 302)
+        self.foto.refresh_from_db()
+
+    def test_blob_trocado_pela_copia_sem_exif(self):
+        original = _imagem('JPEG', orientacao=6)
+        self._enviar(original)
+        conteudo = (Path(self.raiz) / self.foto.imagem.name).read_bytes()
+        self.assertNotEqual(conteudo, original)
+        self.assertEqual(NOME_BLOB.match(Path(self.foto.imagem.name).name)['digest'],
+                         hashlib.sha256(conteudo).hexdigest())
+        with Image.open(io.BytesIO(conteudo)) as img:
+            self.assertFalse(img.getexif())
+            self.assertEqual(img.size, (20, 40))
+        # PT/EN: Girada 90°: dimensões já trocadas | rotated 90°: dimensions already swapped
+        self.assertEqual((self.foto.largura, self.foto.altura), (20, 40))
+        self.assertTrue(self.foto.placeholder)
+        self.assertEqual(list(Path(self.raiz).rglob('.tmp-*')), [])
+
+    def test_sem_exif_mantem_o_blob(self):
+        original = _imagem('PNG', exif=False)
+        self._enviar(original)
+        self.assertEqual((Path(self.raiz) / self.foto.imagem.name).read_bytes(), original)
+
+    def test_foto_trocada_antes_da_remocao(self):
+        storage = Fotografia._meta.get_field('imagem').storage
+        nome = storage.save('foto.jpg', ContentFile(_imagem('JPEG')))
+        Fotografia.objects.filter(pk=self.foto.pk).update(imagem='blobs/aa/bb/outra.jpg')
+        self.assertIsNone(trocar_blob(self.foto.pk, nome, sem_exif(storage.path(nome))))
+        self.foto.refresh_from_db()
+        self.assertEqual(self.foto.imagem.name, 'blobs/aa/bb/outra.jpg')
+
+
+class MetadadosTests(TestCase):
+    """PT: Resultado do processamento e cards da página inicial. EN: Processing results and home page cards."""
+
+    RESULTADO = {'largura': 40, 'altura': 20, 'cor_dominante': '#ff0000', 'placeholder': 'data:,'}
+
+    def test_resultado_de_imagem_trocada_e_descartado(self):
+        foto = Fotografia.objects.create(nome='Orion', legenda='Nebulosa', imagem='blobs/aa/bb/nova.png')
+        self.assertFalse(salvar_metadados(foto.pk, 'blobs/aa/bb/antiga.png', self.RESULTADO))
+        foto.refresh_from_db()
+        self.assertEqual(foto.cor_dominante, '')
+        self.assertTrue(salvar_metadados(foto.pk, 'blobs/aa/bb/nova.png', self.RESULTADO))
+        foto.refresh_from_db()
+        self.assertEqual(foto.cor_dominante, '#ff0000')
+
+    def test_primeira_linha_carrega_sem_lazy(self):
+        for numero in range(5):
+            Fotografia.objects.create(nome=f'Foto {numero}', legenda='Galáxia', publicada=True,
+                                      imagem=f'blobs/aa/bb/{numero}.png')
+        html = self.client.get('/').content.decode()
+        self.assertEqual(html.count('loading="eager"'), 3)
+        self.assertEqual(html.count('fetchpriority="high"'), 1)
+        self.assertEqual(html.count('loading="lazy"'), 2)
+
+
+class PublicacaoEmLoteTests(TestCase):
+    """PT: `galeria.lote` com invalidação do cache dos cards. EN: `galeria.lote` with card cache invalidation."""
+
+    def setUp(self):
+        for numero in range(3):
+            Fotografia.objects.create(nome=f'Foto {numero}', legenda='Planeta', imagem=f'blobs/aa/bb/{numero}.png')
+
+    def _cards(self):
+        return self.client.get('/').content.decode().count('class="card"')
+
+    def test_publicar_em_blocos_invalida_o_cache(self):
+        self.assertEqual(self._cards(), 0)
+        versao = versao_galeria()
+        self.assertEqual(atualizar_em_lote(Fotografia.objects.all(), tamanho_lote=2, publicada=True), 3)
+        self.assertNotEqual(versao_galeria(), versao)
+        self.assertEqual(self._cards(), 3)
+
+    def test_nada_alterado_mantem_a_versao(self):
+        versao = versao_galeria()
+        self.assertEqual(atualizar_em_lote(Fotografia.objects.none(), publicada=True), 0)
+        self.assertEqual(versao_galeria(), versao)
+
+    def test_comando_publicar_fotos(self):
+        ids = list(Fotografia.objects.order_by('pk').values_list('pk', flat=True)[:2])
+        saida = io.StringIO()
+        call_command('publicar_fotos', 'publicar', '--ids', ','.join(map(str, ids)), stdout=saida)
+        self.assertIn('2 fotografias atualizadas', saida.getvalue())
+        self.assertEqual(list(Fotografia.objects.filter(publicada=True).values_list('pk', flat=True)), ids)
+        self.assertEqual(self._cards(), 2)
+
+
+class CacheCompartilhadoTests(TestCase):
+    """PT: A versão trocada por outro processo chega ao servidor web.
+    EN: A version bump from another process reaches the web server.
+    """
+
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.pasta)
+        arquivo = override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': self.pasta}})
+        arquivo.enable()
+        self.addCleanup(arquivo.disable)
+        Fotografia.objects.create(nome='Orion', legenda='Nebulosa', publicada=True, imagem='blobs/aa/bb/0.png')
+
+    def _cards(self):
+        return self.client.get('/').content.decode().count('class="card"')
+
+    def test_versao_trocada_em_outro_processo(self):
+        self.assertEqual(self._cards(), 1)
+        # PT/EN: Sem sinais, como uma escrita de outro processo | no signals, like a write from another process
+        Fotografia.objects.update(publicada=False)
+        self.assertEqual(self._cards(), 1)
+        subprocess.run(
+            [sys.executable, 'manage.py', 'shell', '-c',
+             'from galeria.cache import invalidar_cache_galeria; invalidar_cache_galeria()'],
+            cwd=settings.BASE_DIR, env={**os.environ, 'CACHE_DIR': self.pasta, 'REDIS_URL': ''},
+            check=True, capture_output=True,
+        )
+        self.assertEqual(self._cards(), 0)
@@ -0,0 +1,60 @@
+"""
+PT: Recepção de uploads da galeria com limite de tamanho e validação barata.
+- `LimiteTamanhoUploadHandler`: descarta arquivos acima do limite enquanto
+  chegam (em blocos), antes de gravá-los por inteiro.
+- `validar_imagem`: confere formato e dimensões pelo cabeçalho.
+
+EN: Gallery upload intake with a size limit and cheap validation.
+- `LimiteTamanhoUploadHandler`: drops files over the limit while they stream
+  in (in chunks), before they are fully written.
+- `validar_imagem`: checks format and dimensions from the header.
+"""
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+
+from galeria.imagens import ImagemInvalida, ler_cabecalho
+
+
+class LimiteTamanhoUploadHandler(FileUploadHandler):
+    """PT: Interrompe arquivos maiores que `GALERIA_UPLOAD_MAX_BYTES`.
+    EN: Aborts files larger than `GALERIA_UPLOAD_MAX_BYTES`.
+
+    Instalado por view (`request.upload_handlers.insert(0, ...)`, antes de ler
+    `request.POST`/`FILES`), na frente do `TemporaryFileUploadHandler`: repassa
+    cada bloco adiante e marca `request.upload_excedido` ao desistir.
+
+    Installed per view (`request.upload_handlers.insert(0, ...)`, before reading
+    `request.POST`/`FILES`), ahead of `TemporaryFileUploadHandler`: passes each
+    chunk along and sets `request.upload_excedido` when it gives up.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.recebidos = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.recebidos += len(raw_data)
+        if self.recebidos > settings.GALERIA_UPLOAD_MAX_BYTES:
+            self.request.upload_excedido = True
+            raise SkipFile()
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+
+def validar_imagem(arquivo) -> tuple[str, int, int]:
+    """PT: Valida formato e dimensões do upload sem decodificar a imagem.
+    EN: Validates upload format and dimensions without decoding the image.
+
+    Raises:
+        ImagemInvalida: formato não permitido ou dimensões fora do limite.
+    """
+    formato, largura, altura = ler_cabecalho(arquivo)
+    if formato not in settings.GALERIA_FORMATOS_PERMITIDOS:
+        raise ImagemInvalida(f'Formato {formato} não permitido.')
+    limite = settings.GALERIA_MAX_DIMENSAO
+    if largura > limite or altura > limite:
+        raise ImagemInvalida(f'Dimensões {largura}x{altura} excedem {limite}px.')
+    return formato, largura, altura
@@ -3,9 +3,15 @@ PT: Views simples para a galeria espacial (site público).
 EN: Simple views for the space gallery (public site).
 """
 
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404, redirect
 from django.db.models import Q
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from galeria.models import Fotografia
+from galeria.cache import versao_galeria
+from galeria.imagens import ImagemInvalida
+from galeria.tarefas import enfileirar_processamento
+from galeria.uploads import LimiteTamanhoUploadHandler, validar_imagem
 
 
 def index(request):
@@ -31,7 +37,13 @@ def index(request):
     else:
         fotografias = Fotografia.objects.filter(publicada=True).order_by("data_imagem")
 
-    return render(request, 'galeria/index.html', {'cards': fotografias})
+    # PT: O queryset é preguiçoso: com o fragmento em cache, nenhuma consulta é feita
+    # EN: The queryset is lazy: with the fragment cached, no query runs at all
+    return render(request, 'galeria/index.html', {
+        'cards': fotografias,
+        'termo': termo or '',
+        'versao_galeria': versao_galeria(),
+    })
 
 
 def imagem(request, foto_id):
@@ -42,10 +54,28 @@ def imagem(request, foto_id):
     return render(request, 'galeria/imagem.html', {'fotografia': fotografia})
 
 
+@csrf_exempt
 def atualizar_foto(request, foto_id):
     """PT: Formulário simples para atualizar metadados e arquivo de imagem.
     EN: Simple form to update metadata and image file.
+
+    - O upload chega em blocos direto para disco (`FILE_UPLOAD_HANDLERS`) e é
+      descartado acima de `GALERIA_UPLOAD_MAX_BYTES`.
+    - Formato/dimensões são validados pelo cabeçalho; o processamento pesado
+      (variantes, placeholder) é enfileirado e a resposta volta imediatamente.
+
+    O CSRF é conferido em `_atualizar_foto`: o middleware leria `request.POST`
+    antes de o limite de tamanho ser instalado (ver a documentação do Django
+    sobre upload handlers).
     """
+    # PT: Só esta view limita o tamanho; tem que entrar antes de qualquer leitura do corpo
+    # EN: Only this view limits the size; it must go in before anything reads the body
+    request.upload_handlers.insert(0, LimiteTamanhoUploadHandler(request))
+    return _atualizar_foto(request, foto_id)
+
+
+@csrf_protect
+def _atualizar_foto(request, foto_id):
     fotografia = get_object_or_404(Fotografia, pk=foto_id)
 
     if request.method == 'POST':
@@ -55,10 +85,32 @@ def atualizar_foto(request, foto_id):
         fotografia.legenda = request.POST.get('legenda')
         fotografia.descricao = request.POST.get('descricao')
 
-        if request.FILES.get('imagem'):
-            fotografia.imagem = request.FILES['imagem']
+        arquivo = request.FILES.get('imagem')
+        if getattr(request, 'upload_excedido', False):
+            limite_mb = settings.GALERIA_UPLOAD_MAX_BYTES // (1024 * 1024)
+            return render(request, 'galeria/atualizar.html', {
+                'fotografia': fotografia,
+                'erro': f'Arquivo maior que {limite_mb} MB.',
+            }, status=413)
+        if arquivo:
+            try:
+                _formato, largura, altura = validar_imagem(arquivo)
+            except ImagemInvalida as exc:
+                return render(request, 'galeria/atualizar.html', {
+                    'fotografia': fotografia,
+                    'erro': str(exc),
+                }, status=400)
+            fotografia.imagem = arquivo
+            # PT: Dimensões do cabeçalho (já na orientação do EXIF) evitam layout shift; cor/placeholder
+            #     e a cópia sem EXIF vêm do worker
+            # EN: Header dimensions (already EXIF-oriented) prevent layout shift; colour/placeholder
+            #     and the EXIF-free copy come from the worker
+            fotografia.largura, fotografia.altura = largura, altura
+            fotografia.cor_dominante = fotografia.placeholder = ''
 
         fotografia.save()
+        if arquivo:
+            enfileirar_processamento(fotografia.pk, fotografia.imagem.name)
         return redirect('index')
 
     return render(request, 'galeria/atualizar.html', {'fotografia': fotografia})
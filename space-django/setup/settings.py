@@ -53,6 +53,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # PT: GETs leem pela conexão somente leitura, se houver | EN: GETs read via the read-only connection, if any
+    'galeria.banco.LeituraMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -85,9 +87,46 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # PT: Conexão persistente por thread (segundos) | EN: Persistent per-thread connection (seconds)
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# PT: WAL + pragmas de desempenho: páginas seguem lendo enquanto uploads e o processamento em
+#     segundo plano gravam; busy_timeout espera o lock e as escritas começam com BEGIN IMMEDIATE
+#     (sem "database is locked" ao promover leitura para escrita). Opcional: SQLITE_OTIMIZADO=True
+#     liga. O WAL fica gravado no db.sqlite3 e cria db.sqlite3-wal/-shm (ignorados pelo git);
+#     para voltar: `sqlite3 db.sqlite3 'PRAGMA journal_mode=DELETE'` com o servidor parado.
+# EN: WAL + performance pragmas: pages keep reading while uploads and background processing
+#     write; busy_timeout waits for the lock and writes start with BEGIN IMMEDIATE
+#     (no "database is locked" when upgrading a read to a write). Opt-in: SQLITE_OTIMIZADO=True
+#     turns it on. WAL is persisted in db.sqlite3 and creates db.sqlite3-wal/-shm (ignored by
+#     git); to revert: `sqlite3 db.sqlite3 'PRAGMA journal_mode=DELETE'` with the server stopped.
+SQLITE_OTIMIZADO = os.getenv('SQLITE_OTIMIZADO', 'False').lower() in ('1', 'true', 'yes')
+SQLITE_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL;"
+    f"PRAGMA mmap_size={int(os.getenv('SQLITE_MMAP_MB', '128')) * 1024 * 1024};"
+    f"PRAGMA cache_size=-{int(os.getenv('SQLITE_CACHE_MB', '20')) * 1024};"
+    f"PRAGMA busy_timeout={int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))};"
+    "PRAGMA temp_store=MEMORY;"
+)
+if SQLITE_OTIMIZADO:
+    DATABASES['default']['OPTIONS'] = {
+        'init_command': 'PRAGMA journal_mode=WAL;' + SQLITE_PRAGMAS,
+        'transaction_mode': 'IMMEDIATE',
+    }
+    # PT: Conexão extra somente leitura para GETs (`galeria.banco`)
+    # EN: Extra read-only connection for GETs (`galeria.banco`)
+    if os.getenv('SQLITE_LEITURA', 'False').lower() in ('1', 'true', 'yes'):
+        DATABASES['leitura'] = {
+            **DATABASES['default'],
+            'NAME': f"{Path(DATABASES['default']['NAME']).resolve().as_uri()}?mode=ro",
+            'OPTIONS': {'init_command': SQLITE_PRAGMAS + 'PRAGMA query_only=1;'},
+            'TEST': {'MIRROR': 'default'},
+        }
+DATABASE_ROUTERS = ['galeria.banco.RoteadorLeitura']
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -122,5 +161,55 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')  # Coleta para produção |
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')  # Armazenamento de mídia | Media root
 MEDIA_URL = '/media/'  # URL pública de mídia | Media URL
+# PT: Cache (segundos) para mídia sem hash no nome | EN: Cache (seconds) for non-hashed media names
+MEDIA_CACHE_MAX_AGE = int(os.getenv('MEDIA_CACHE_MAX_AGE', '3600'))
+# PT: Prefixo interno do nginx (ex.: /protected-media/); vazio = servir pelo Django
+# EN: Internal nginx location (e.g. /protected-media/); empty = serve through Django
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv('MEDIA_ACCEL_REDIRECT_PREFIX', '')
+
+# PT: Uploads vão em blocos direto para arquivo temporário (nada fica inteiro em memória).
+#     O limite de tamanho (`galeria.uploads.LimiteTamanhoUploadHandler`) entra só na view de
+#     edição da foto; o admin e o resto do site seguem com o comportamento padrão do Django.
+# EN: Uploads stream in chunks straight to a temp file (nothing is held whole in memory).
+#     The size limit (`galeria.uploads.LimiteTamanhoUploadHandler`) is added only in the photo
+#     edit view; the admin and the rest of the site keep Django's default behaviour.
+FILE_UPLOAD_HANDLERS = [
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+GALERIA_UPLOAD_MAX_BYTES = int(os.getenv('GALERIA_UPLOAD_MAX_BYTES', str(15 * 1024 * 1024)))
+GALERIA_MAX_DIMENSAO = int(os.getenv('GALERIA_MAX_DIMENSAO', '8000'))  # px por lado | px per side
+GALERIA_FORMATOS_PERMITIDOS = {'JPEG', 'PNG', 'WEBP', 'GIF'}
+# PT: Variantes geradas em segundo plano | EN: Variants generated in the background
+GALERIA_VARIANTES_LARGURAS = (300, 600, 1200)
+GALERIA_PROCESSOS = int(os.getenv('GALERIA_PROCESSOS', '2'))
+# PT: True processa na própria requisição (útil em testes) | EN: True processes inline (handy in tests)
+GALERIA_PROCESSAMENTO_SINCRONO = os.getenv('GALERIA_PROCESSAMENTO_SINCRONO', 'False').lower() in ('1', 'true', 'yes')
+# PT: Chaves por UPDATE nas ações em lote | EN: Keys per UPDATE in bulk actions
+GALERIA_TAMANHO_LOTE = int(os.getenv('GALERIA_TAMANHO_LOTE', '500'))
+
+# PT: Guarda a versão `galeria:versao` e os fragmentos `{% cache %}` dos cards (`galeria.cache`).
+#     O cache precisa ser compartilhado entre processos: a versão trocada por `publicar_fotos`,
+#     `calcular_placeholders`, pelo pool de processamento ou por outro worker do gunicorn tem que
+#     chegar ao servidor web. Sem REDIS_URL usa um cache em arquivo em CACHE_DIR (padrão `.cache/`,
+#     ignorado pelo git); nunca um cache em memória por processo.
+# EN: Holds the `galeria:versao` version and the cards' `{% cache %}` fragments (`galeria.cache`).
+#     The cache must be shared between processes: a version bump from `publicar_fotos`,
+#     `calcular_placeholders`, the processing pool or another gunicorn worker has to reach the
+#     web server. Without REDIS_URL it uses a file cache in CACHE_DIR (default `.cache/`, ignored
+#     by git); never a per-process in-memory cache.
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_DIR') or str(BASE_DIR / '.cache'),
+        }
+    }
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
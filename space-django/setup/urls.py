@@ -1,17 +1,21 @@
 """
 PT: Mapeamento de URLs do projeto space-django.
 - Inclui as rotas do app `galeria` e a interface administrativa.
+- Serve `MEDIA_URL` via `galeria.midia.servir_midia` (também com DEBUG desligado).
 
 EN: URL configuration for the space-django project.
 - Includes `galeria` app routes and the admin interface.
+- Serves `MEDIA_URL` through `galeria.midia.servir_midia` (also with DEBUG off).
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
-from django.conf.urls.static import static
+from galeria.midia import servir_midia
 
 
 urlpatterns = [
     path('admin/', admin.site.urls),  # PT: Admin | EN: Admin site
     path('', include('galeria.urls')),  # PT/EN: Rotas do app galeria | gallery routes
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    # PT/EN: Mídia com cache, Range e X-Accel-Redirect | media with caching, Range and X-Accel-Redirect
+    re_path(r'^%s(?P<caminho>.+)$' % settings.MEDIA_URL.lstrip('/'), servir_midia, name='midia'),
+]